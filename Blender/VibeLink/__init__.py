@@ -12,6 +12,7 @@ bl_info = {
 
 import bpy
 import threading
+import time
 from . import server
 
 # Estado Global del Server
@@ -43,10 +44,39 @@ class VibeLinkPanel(bpy.types.Panel):
         else:
             row.operator("vibelink.stop_server", text="Stop Server", icon='PAUSE')
 
+        # Estadisticas del dispatcher (cola -> Main Thread)
+        if is_running:
+            stats = server.dispatcher.stats()
+            box = layout.box()
+            box.label(text=f"Queue: {stats['queue_depth']} (max {stats['max_depth']})")
+            box.label(text=f"Processed: {stats['processed']}")
+            box.label(text=f"Wait avg/max: {stats['wait_avg_ms']} / {stats['wait_max_ms']} ms")
+            jobs = stats["jobs"]
+            box.label(text=f"Interactive: {jobs['interactive']}  Bulk: {jobs['bulk']}")
+            box.label(text=f"Coalesced: {jobs['coalesced']}  Cancelled: {jobs['cancelled']}  Rejected: {jobs['rejected']}")
+
+        # Percentiles por fase (últimas muestras de cada una)
+        phases = server.profiling.tracer.summary()
+        if phases:
+            box = layout.box()
+            box.label(text="Phase  p50 / p95 / p99 ms")
+            for name, h in phases.items():
+                box.label(text=f"{name}: {h['p50_ms']} / {h['p95_ms']} / {h['p99_ms']}  (n={h['count']})")
+
+        # Escena scratch y datablocks (deberían mantenerse estables)
+        scene_stats = server.scenes.stats()
+        box = layout.box()
+        box.label(text=f"Jobs: {scene_stats['jobs']}  Scratch objects: {scene_stats['scratch_objects']}")
+        box.label(text=f"Meshes: {scene_stats['meshes']}  Materials: {scene_stats['materials']}")
+        if scene_stats["rss_mb"] is not None:
+            box.label(text=f"Memory: {scene_stats['rss_mb']} MB")
+
         # Opciones
         layout.separator()
         layout.prop(context.scene, "vibelink_port")
         layout.prop(context.scene, "vibelink_host")
+        layout.prop(context.scene, "vibelink_workers")
+        layout.prop(context.scene, "vibelink_journal")
 
 class START_OT_server(bpy.types.Operator):
     """Start the VibeLink WebSocket Client"""
@@ -67,7 +97,15 @@ class START_OT_server(bpy.types.Operator):
         server_instance = server.UnityClient(host=host, port=port)
         server_instance.start() # Inicia el thread
 
+        # Journal de la cola: lo que quedó encolado antes de cerrar / crash se retoma
+        if context.scene.vibelink_journal and server.execution_queue.journal_path is None:
+            recovered = server.execution_queue.open_journal(server.journal_path(), time.perf_counter())
+            if recovered:
+                server.log(f"Recovered {recovered} queued jobs from journal")
+
         # Registrar Timer para procesar cola en Main Thread
+        server.dispatcher.reset_stats()
+        server.profiling.tracer.reset()
         if not bpy.app.timers.is_registered(server.process_queue):
             bpy.app.timers.register(server.process_queue)
             
@@ -86,6 +124,9 @@ class STOP_OT_server(bpy.types.Operator):
             server_instance.stop()
             server_instance = None
             
+        server.log(f"Dispatcher stats: {server.dispatcher.stats()}")
+        server.log(f"Scene stats: {server.scenes.stats()}")
+        server.workers.shutdown()
         if bpy.app.timers.is_registered(server.process_queue):
             bpy.app.timers.unregister(server.process_queue)
             
@@ -113,6 +154,18 @@ def register():
         default="127.0.0.1",
         description="Host IP (usually localhost/127.0.0.1)"
     )
+    bpy.types.Scene.vibelink_workers = bpy.props.IntProperty(
+        name="Workers",
+        default=0,
+        min=0,
+        max=64,
+        description="Headless Blender processes for generate_batch (0 = generate in this Blender)"
+    )
+    bpy.types.Scene.vibelink_journal = bpy.props.BoolProperty(
+        name="Journal Queue",
+        default=False,
+        description="Write queued jobs to disk so they resume after a restart or crash"
+    )
 
     for cls in classes:
         bpy.utils.register_class(cls)
@@ -122,12 +175,15 @@ def unregister():
     global server_instance
     if server_instance:
         server_instance.stop()
+    server.workers.shutdown()
 
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     
     del bpy.types.Scene.vibelink_port
     del bpy.types.Scene.vibelink_host
+    del bpy.types.Scene.vibelink_workers
+    del bpy.types.Scene.vibelink_journal
 
 if __name__ == "__main__":
     register()
@@ -0,0 +1,249 @@
+"""
+benchmark.py - Benchmark de los generadores (Blender headless)
+
+    blender -b --factory-startup --python benchmark.py -- [--out bench.json] [--repeat 3] [--quick] [--format vmesh]
+
+Ejecuta una matriz fija de casos (casas L1-L5, árbol/roca, todos los estilos
+de humanoide) con seeds fijas y guarda en JSON, por caso:
+- mediana en ms de cada fase: clear, build, join, export
+  (build = generación sin join; las fases que un generador no tiene no
+  aparecen; con --format vmesh no hay clear ni join)
+- vértices y caras del objeto exportado
+- pico de memoria Python (tracemalloc, en una pasada aparte para no
+  falsear los tiempos)
+
+Sesión larga (memoria y datablocks cada 500 assets, deberían quedarse planos):
+
+    blender -b --factory-startup --python benchmark.py -- --soak 10000 --out soak.json
+
+Solo la geometría (generators/*.build_geometry, sin Blender):
+
+    python benchmark.py --geometry --out geometry.json
+
+Comparar dos resultados (no necesita Blender):
+
+    python benchmark.py --compare antes.json despues.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SEEDS = (1, 2, 3)
+HUMANOID_STYLES = ("villager", "guard", "elder", "female_villager", "female_guard", "female_elder")
+
+def case_matrix(quick=False):
+    """[(id, cmd, params), ...] en orden estable."""
+    seeds = SEEDS[:1] if quick else SEEDS
+    cases = []
+    for level in range(1, 6):
+        for seed in seeds:
+            cases.append((f"house/L{level}/s{seed}", "generate_house",
+                          {"level": level, "width": 4 + level, "depth": 4 + level, "seed": seed}))
+    for kind in ("tree", "rock"):
+        for seed in seeds:
+            cases.append((f"nature/{kind}/s{seed}", "generate_nature", {"type": kind, "seed": seed}))
+    for style in HUMANOID_STYLES:
+        for seed in seeds:
+            cases.append((f"humanoid/{style}/s{seed}", "generate_humanoid", {"style": style, "seed": seed}))
+    for layout in ("road", "grid"):
+        for seed in seeds:
+            cases.append((f"settlement/{layout}/s{seed}", "generate_settlement",
+                          {"layout": layout, "houses": 12, "seed": seed}))
+    return cases
+
+def mesh_counts(obj):
+    """Vértices y caras del objeto y todos sus hijos."""
+    vertices = faces = 0
+    for o in [obj] + list(obj.children_recursive):
+        if o.type == 'MESH':
+            vertices += len(o.data.vertices)
+            faces += len(o.data.polygons)
+    return vertices, faces
+
+def run_case(server, profiling, cmd, params):
+    """Una ejecución completa; devuelve ({fase: segundos}, nombre del asset)."""
+    with profiling.Profile() as prof:
+        # scenes.begin_job marca la fase "clear"
+        name, _, timing = server.generate_and_export(cmd, params)
+
+    phases = dict(prof.phases)
+    phases["build"] = timing["generate_ms"] / 1000 - phases.get("join", 0.0)
+    phases["export"] = timing["export_ms"] / 1000
+    return phases, name
+
+def run(out_path, repeat, quick, fmt="fbx"):
+    import bpy
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from VibeLink import server, profiling
+    from VibeLink.scene_manager import peak_rss_mb
+
+    export_path = tempfile.mkdtemp(prefix="vibelink_bench_")
+    results = []
+    for case_id, cmd, params in case_matrix(quick):
+        params = dict(params, export_path=export_path, format=fmt)
+
+        samples = {}
+        for _ in range(repeat):
+            phases, name = run_case(server, profiling, cmd, params)
+            for phase_name, seconds in phases.items():
+                samples.setdefault(phase_name, []).append(seconds)
+        if fmt == "vmesh":
+            geometry = server.GENERATORS[cmd].build_geometry(params)
+            vertices, faces = geometry.vertex_count, geometry.face_count
+        else:
+            vertices, faces = mesh_counts(bpy.data.objects[name])
+
+        # Pasada aparte con tracemalloc (solo memoria)
+        tracemalloc.start()
+        run_case(server, profiling, cmd, params)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        phases_ms = {name: round(statistics.median(v) * 1000, 2) for name, v in sorted(samples.items())}
+        total_ms = round(sum(phases_ms.values()), 2)
+        results.append({
+            "id": case_id,
+            "cmd": cmd,
+            "params": {k: v for k, v in params.items() if k != "export_path"},
+            "phases_ms": phases_ms,
+            "total_ms": total_ms,
+            "vertices": vertices,
+            "faces": faces,
+            "peak_python_kb": round(peak / 1024, 1),
+        })
+        print(f"[VibeLink] {case_id:<28} {total_ms:>9.2f} ms  {vertices:>6} v  {faces:>6} f")
+
+    report = {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "format": fmt,
+        "peak_rss_mb": peak_rss_mb(),
+        "cases": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"[VibeLink] Benchmark written to {out_path}")
+
+def run_soak(out_path, count, fmt="fbx", every=500):
+    """Genera count assets recorriendo la matriz y muestrea scenes.stats()."""
+    import bpy
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from VibeLink import server
+
+    export_path = tempfile.mkdtemp(prefix="vibelink_soak_")
+    cases = case_matrix()
+    samples = []
+    start = time.perf_counter()
+    for i in range(count):
+        _, cmd, params = cases[i % len(cases)]
+        # seed distinta en cada vuelta: nombres y mallas nuevas, como en una sesión real
+        params = dict(params, seed=i, export_path=export_path, format=fmt)
+        server.generate_and_export(cmd, params)
+        if (i + 1) % every == 0 or i + 1 == count:
+            sample = dict(server.scenes.stats(), assets=i + 1,
+                          elapsed_s=round(time.perf_counter() - start, 1))
+            samples.append(sample)
+            print(f"[VibeLink] {i + 1:>6} assets  {sample['rss_mb']} MB  "
+                  f"{sample['meshes']} meshes  {sample['materials']} materials")
+
+    report = {
+        "blender": bpy.app.version_string,
+        "platform": platform.platform(),
+        "format": fmt,
+        "count": count,
+        "samples": samples,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"[VibeLink] Soak report written to {out_path}")
+
+def run_geometry(out_path, repeat, quick):
+    """Mide build_geometry de cada caso en CPython puro (sin subir a Blender)."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from generators import house_generator, nature_generator, humanoid_generator, settlement_generator
+    builders = {
+        "generate_house": house_generator.build_geometry,
+        "generate_nature": nature_generator.build_geometry,
+        "generate_humanoid": humanoid_generator.build_geometry,
+        "generate_settlement": settlement_generator.build_geometry,
+    }
+
+    results = []
+    for case_id, cmd, params in case_matrix(quick):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            geometry = builders[cmd](params)
+            samples.append(time.perf_counter() - start)
+
+        build_ms = round(statistics.median(samples) * 1000, 3)
+        results.append({
+            "id": case_id,
+            "cmd": cmd,
+            "params": params,
+            "phases_ms": {"build": build_ms},
+            "total_ms": build_ms,
+            "vertices": geometry.vertex_count,
+            "faces": geometry.face_count,
+        })
+        print(f"[VibeLink] {case_id:<28} {build_ms:>9.3f} ms  {geometry.vertex_count:>6} v  {geometry.face_count:>6} f")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"[VibeLink] Geometry benchmark written to {out_path}")
+
+def compare(before_path, after_path):
+    """Tabla por caso: total antes/después y cambios de vértices/caras."""
+    with open(before_path, encoding="utf-8") as f:
+        before = {c["id"]: c for c in json.load(f)["cases"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = {c["id"]: c for c in json.load(f)["cases"]}
+
+    print(f"{'case':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}  geometry")
+    for case_id, new in after.items():
+        old = before.get(case_id)
+        if old is None:
+            print(f"{case_id:<28} {'-':>10} {new['total_ms']:>10.2f}")
+            continue
+        speedup = old["total_ms"] / new["total_ms"] if new["total_ms"] else 0.0
+        same = old["vertices"] == new["vertices"] and old["faces"] == new["faces"]
+        geometry = "same" if same else f"{old['vertices']}/{old['faces']} -> {new['vertices']}/{new['faces']}"
+        print(f"{case_id:<28} {old['total_ms']:>10.2f} {new['total_ms']:>10.2f} {speedup:>7.2f}x  {geometry}")
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--out", default="vibelink_bench.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="una sola seed por caso")
+    parser.add_argument("--geometry", action="store_true", help="solo build_geometry, sin Blender")
+    parser.add_argument("--format", choices=("fbx", "vmesh"), default="fbx", help="formato de exportación")
+    parser.add_argument("--soak", type=int, metavar="N", help="sesión de N assets (memoria/datablocks)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.soak:
+        run_soak(args.out, args.soak, args.format)
+    elif args.geometry:
+        run_geometry(args.out, max(1, args.repeat), args.quick)
+    else:
+        run(args.out, max(1, args.repeat), args.quick, args.format)
+
+if __name__ == "__main__":
+    main()
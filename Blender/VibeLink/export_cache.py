@@ -0,0 +1,201 @@
+"""
+export_cache.py - Cache de exportaciones direccionada por contenido
+Clave = sha1(comando + params normalizados + version del codigo generador,
+del formato .vmesh y de las opciones de exportación FBX).
+Si el FBX de una clave ya existe (y no ha cambiado de tamaño) se reutiliza
+sin generar ni exportar. El indice vive junto a los modelos y se aplica
+expulsion LRU por numero de entradas y por tamaño total.
+
+Cada ExportCache carga el indice al crearse y lo reescribe entero en cada
+store(): dos instancias sobre la misma carpeta se pisan. Un batch usa un
+CacheSet (una instancia por carpeta) para la consulta y para el store.
+
+Comprobación sin Blender (3 fallos de un batch -> 3 entradas):
+
+    python export_cache.py
+"""
+import hashlib
+import json
+import os
+import time
+
+INDEX_NAME = ".vibelink_cache.json"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2000
+
+# Params que no afectan a la geometria
+IGNORED_PARAMS = ("export_path", "cache")
+
+GENERATORS_DIR = os.path.join(os.path.dirname(__file__), "generators")
+# vmesh.py entra en el digest entero (VERSION y formato)
+VMESH_SOURCE = os.path.join(os.path.dirname(__file__), "vmesh.py")
+
+# Subir al cambiar las opciones de bpy.ops.export_scene.fbx en server.export_objects
+EXPORT_SETTINGS_VERSION = 2
+
+_version_cache = {}
+
+def generator_version():
+    """
+    Digest de todo el codigo de generators/ y de vmesh.py (cualquier cambio
+    invalida la cache). Se recalcula solo si cambia algun mtime (ej: tras
+    "Reload Scripts").
+    """
+    sources = sorted(
+        os.path.join(GENERATORS_DIR, f)
+        for f in os.listdir(GENERATORS_DIR) if f.endswith(".py")
+    ) + [VMESH_SOURCE]
+    stamp = tuple((path, os.path.getmtime(path)) for path in sources)
+    if _version_cache.get("stamp") != stamp:
+        h = hashlib.sha1()
+        for path in sources:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _version_cache["stamp"] = stamp
+        _version_cache["digest"] = h.hexdigest()[:16]
+    return _version_cache["digest"]
+
+def normalize_params(params):
+    """Params sin claves irrelevantes y con numeros enteros/float unificados."""
+    normalized = {}
+    for key, value in params.items():
+        if key in IGNORED_PARAMS:
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized[key] = value
+    return normalized
+
+def cache_key(cmd, params):
+    payload = json.dumps(
+        {"cmd": cmd, "params": normalize_params(params), "version": generator_version(),
+         "export": EXPORT_SETTINGS_VERSION},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Indice {clave: entrada} persistido en <export_dir>/.vibelink_cache.json."""
+
+    def __init__(self, export_dir, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.export_dir = export_dir
+        self.index_path = os.path.join(export_dir, INDEX_NAME)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": self.entries}, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, key):
+        """Ruta del FBX cacheado o None si no existe / no es valido."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        path = os.path.join(self.export_dir, entry["file"])
+        try:
+            valid = os.path.getsize(path) == entry["size"]
+        except OSError:
+            valid = False
+
+        if not valid:
+            del self.entries[key]
+            self.save()
+            return None
+
+        entry["last_used"] = time.time()
+        entry["hits"] = entry.get("hits", 0) + 1
+        self.save()
+        return path
+
+    def store(self, key, path, meta=None):
+        filename = os.path.relpath(path, self.export_dir)
+        # El nombre de fichero no incluye todos los params: si otra clave
+        # apuntaba al mismo FBX, ese contenido ya se ha sobrescrito.
+        for stale in [k for k, e in self.entries.items() if e["file"] == filename]:
+            del self.entries[stale]
+
+        now = time.time()
+        self.entries[key] = {
+            "file": filename,
+            "size": os.path.getsize(path),
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+            "meta": meta or {},
+        }
+        self.evict()
+        self.save()
+
+    def total_bytes(self):
+        return sum(e["size"] for e in self.entries.values())
+
+    def evict(self):
+        """Borra los FBX menos usados hasta cumplir max_entries y max_bytes."""
+        by_age = sorted(self.entries.items(), key=lambda kv: kv[1]["last_used"])
+        total = self.total_bytes()
+        removed = []
+
+        for key, entry in by_age:
+            if len(self.entries) <= self.max_entries and total <= self.max_bytes:
+                break
+            path = os.path.join(self.export_dir, entry["file"])
+            # Unity deja un .meta junto a cada asset importado
+            for stale_path in (path, path + ".meta"):
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+            total -= entry["size"]
+            del self.entries[key]
+            removed.append(entry["file"])
+
+        return removed
+
+
+class CacheSet:
+    """Una ExportCache por carpeta de exportación, compartida durante un batch."""
+
+    def __init__(self):
+        self._caches = {}
+
+    def get(self, export_dir):
+        cache = self._caches.get(export_dir)
+        if cache is None:
+            cache = self._caches[export_dir] = ExportCache(export_dir)
+        return cache
+
+def _check_batch(count=3):
+    """Consulta todos los items y guarda después (como run_batch): no se pierde ninguno."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as export_dir:
+        caches = CacheSet()
+        misses = []
+        for i in range(count):
+            cache = caches.get(export_dir)
+            key = cache_key("generate_house", {"seed": i})
+            assert cache.lookup(key) is None
+            misses.append((cache, key, os.path.join(export_dir, f"House_basic_L1_{i}.fbx")))
+        for cache, key, path in misses:
+            with open(path, "wb") as f:
+                f.write(b"fbx")
+            cache.store(key, path)
+        entries = len(ExportCache(export_dir).entries)
+        assert entries == count, f"{entries}/{count} entries in the index"
+        print(f"[VibeLink] batch cache: {entries}/{count} entries")
+
+if __name__ == "__main__":
+    _check_batch()
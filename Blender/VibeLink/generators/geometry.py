@@ -0,0 +1,574 @@
+"""
+geometry.py - Núcleo geométrico de los generadores (sin bpy)
+Primitivas (cubo, cono, cilindro, icosfera, tejado a dos aguas), jitter y
+join como arrays NumPy de vértices / caras / materiales. Los generadores
+construyen aquí toda la pieza y solo al final la suben a Blender
+(mesh_builder.upload), así el layout se puede calcular, cachear y medir en
+CPython sin Blender:
+
+    sys.path.insert(0, "<addon>/VibeLink")
+    from generators import house_generator
+    geo = house_generator.build_geometry({"level": 3, "seed": 7})
+"""
+import hashlib
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Material por nombre + color RGBA; mesh_builder lo crea (o reutiliza) en bpy.
+# El nombre Mat_F_*_RRGGBB es el que VibeAssetImporter lee en Unity.
+# palette: colores RGBA de una textura paleta (N x 1) para un material atlas
+# (ver Geometry.palette_atlas); None en los materiales de color plano.
+Material = namedtuple("Material", "name color palette", defaults=(None,))
+
+def to_hex(color):
+    """RRGGBB del color (0-1), como lo lee VibeAssetImporter."""
+    return "".join(f"{int(c * 255):02X}" for c in color[:3])
+
+# ─────────────────────────────────────────────────────────────────
+#  CUBO UNITARIO — mismo orden que bpy.ops.mesh.primitive_cube_add
+# ─────────────────────────────────────────────────────────────────
+CUBE_VERTS = (
+    (-0.5, -0.5, -0.5), (-0.5, -0.5, 0.5), (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5),
+    (0.5, -0.5, -0.5),  (0.5, -0.5, 0.5),  (0.5, 0.5, -0.5),  (0.5, 0.5, 0.5),
+)
+
+CUBE_FACES = (
+    (0, 1, 3, 2), (2, 3, 7, 6), (6, 7, 5, 4),
+    (4, 5, 1, 0), (2, 6, 4, 0), (7, 3, 1, 5),
+)
+
+def _cube_uvs():
+    """Layout en cruz de Blender (BM_mesh_calc_uvs_cube), un UV por loop."""
+    uvs = []
+    x, y, width = 0.375, 0.0, 0.25
+    for _ in CUBE_FACES:
+        for loop_index in range(4):
+            uvs.append((x, y))
+            if loop_index == 0:
+                x += width
+            elif loop_index == 1:
+                y += width
+            elif loop_index == 2:
+                x -= width
+            else:
+                y -= width
+        if y >= 0.75 and x > 0.125:
+            x, y = 0.125, 0.5
+        elif x <= 0.125:
+            x, y = 0.625, 0.5
+        else:
+            y += 0.25
+    return tuple(uvs)
+
+CUBE_UVS = _cube_uvs()
+
+_CUBE_V = np.array(CUBE_VERTS, dtype=np.float64)
+_CUBE_LOOPS = np.array(CUBE_FACES, dtype=np.int32).ravel()
+_CUBE_UV = np.array(CUBE_UVS, dtype=np.float32).ravel()
+
+# ─────────────────────────────────────────────────────────────────
+#  ICOSAEDRO — tabla icovert de primitive_ico_sphere_add (radio 200)
+# ─────────────────────────────────────────────────────────────────
+_ICO_VERTS = np.array((
+    (0.0, 0.0, -200.0),
+    (144.72, -105.144, -89.443), (-55.277, -170.128, -89.443), (-178.885, 0.0, -89.443),
+    (-55.277, 170.128, -89.443), (144.72, 105.144, -89.443),
+    (55.277, -170.128, 89.443), (-144.72, -105.144, 89.443), (-144.72, 105.144, 89.443),
+    (55.277, 170.128, 89.443), (178.885, 0.0, 89.443),
+    (0.0, 0.0, 200.0),
+)) / 200.0
+
+def _ico_faces():
+    """Las 20 caras: tríos de vértices vecinos, orientados hacia fuera."""
+    v = _ICO_VERTS
+    dist = np.linalg.norm(v[:, None, :] - v[None, :, :], axis=2)
+    edge = dist[0][dist[0] > 0].min()
+    near = dist < edge * 1.01
+    faces = []
+    for a in range(12):
+        for b in range(a + 1, 12):
+            for c in range(b + 1, 12):
+                if near[a, b] and near[b, c] and near[a, c]:
+                    normal = np.cross(v[b] - v[a], v[c] - v[a])
+                    faces.append((a, b, c) if normal @ (v[a] + v[b] + v[c]) > 0 else (a, c, b))
+    return tuple(faces)
+
+_ICO_FACES = _ico_faces()
+
+# ─────────────────────────────────────────────────────────────────
+#  PRIMITIVAS -> (verts (N, 3), faces [tuplas de índices])
+# ─────────────────────────────────────────────────────────────────
+def cone(location, radius1, radius2, depth, segments):
+    """Equivalente a primitive_cone_add (tapas NGON), centrado en location."""
+    phi = np.arange(segments) * (2.0 * np.pi / segments)
+    ring = np.stack([-np.sin(phi), np.cos(phi)], axis=1)
+
+    # Vertices intercalados (anillo inferior, anillo superior) como Blender
+    verts = np.empty((segments * 2, 3))
+    verts[0::2, 0:2] = ring * radius1
+    verts[1::2, 0:2] = ring * radius2
+    verts[0::2, 2] = -depth / 2
+    verts[1::2, 2] = depth / 2
+    verts += location
+
+    faces = []
+    for i in range(segments):
+        j = (i + 1) % segments
+        faces.append((i * 2, j * 2, j * 2 + 1, i * 2 + 1))
+    faces.append(tuple(i * 2 for i in reversed(range(segments))))   # Tapa inferior
+    faces.append(tuple(i * 2 + 1 for i in range(segments)))         # Tapa superior
+    return verts, faces
+
+def cylinder(location, radius, depth, segments=32):
+    """Equivalente a primitive_cylinder_add (mismo generador que el cono)."""
+    return cone(location, radius, radius, depth, segments)
+
+def icosphere(location, radius, subdivisions=1):
+    """
+    Equivalente a primitive_ico_sphere_add: subdivisions=1 es el icosaedro
+    (mismo orden de vértices que Blender); cada nivel más divide cada
+    triángulo en 4 y proyecta los vértices nuevos a la esfera.
+    """
+    verts = [tuple(v) for v in _ICO_VERTS]
+    faces = list(_ICO_FACES)
+
+    for _ in range(subdivisions - 1):
+        midpoints = {}
+        def midpoint(a, b):
+            key = (a, b) if a < b else (b, a)
+            if key not in midpoints:
+                m = (np.asarray(verts[a]) + np.asarray(verts[b])) / 2
+                verts.append(tuple(m / np.linalg.norm(m)))
+                midpoints[key] = len(verts) - 1
+            return midpoints[key]
+
+        subdivided = []
+        for a, b, c in faces:
+            ab, bc, ca = midpoint(a, b), midpoint(b, c), midpoint(c, a)
+            subdivided += [(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)]
+        faces = subdivided
+
+    return np.asarray(verts) * radius + location, faces
+
+def gable_roof(width, depth, z_base, height, center=(0.0, 0.0)):
+    """
+    Prisma triangular con la cumbrera a lo largo de Y (triángulo sobre la
+    fachada frontal -Y), cerrado por abajo.
+    """
+    cx, cy = center
+    x0, x1 = cx - width / 2, cx + width / 2
+    y0, y1 = cy - depth / 2, cy + depth / 2
+    z_peak = z_base + height
+
+    verts = np.array((
+        (x0, y0, z_base),  # Front-Left
+        (x1, y0, z_base),  # Front-Right
+        (x1, y1, z_base),  # Back-Right
+        (x0, y1, z_base),  # Back-Left
+        (cx, y0, z_peak),  # Front Peak
+        (cx, y1, z_peak),  # Back Peak
+    ))
+    v_fl, v_fr, v_br, v_bl, v_fp, v_bp = range(6)
+
+    faces = [
+        (v_fl, v_fr, v_fp),        # Triangulo Frontal
+        (v_br, v_bl, v_bp),        # Triangulo Trasero
+        (v_bl, v_fl, v_fp, v_bp),  # Pendiente Izquierda
+        (v_fr, v_br, v_bp, v_fp),  # Pendiente Derecha
+        (v_fl, v_bl, v_br, v_fr),  # Base (Suelo del tejado, cierra la malla)
+    ]
+    return verts, faces
+
+def uniform_block(rng, count, low, high):
+    """
+    count valores de rng.uniform(low, high) en una sola operación NumPy.
+
+    random.Random y RandomState usan el mismo Mersenne Twister y la misma
+    construcción de doubles de 53 bits: se copia el estado, se generan los
+    valores de golpe y se devuelve el estado avanzado a rng. El resultado es
+    idéntico (bit a bit) a llamar rng.uniform count veces.
+    """
+    version, internal, gauss_next = rng.getstate()
+    state = np.random.RandomState()
+    state.set_state(("MT19937", np.array(internal[:-1], dtype=np.uint32), internal[-1]))
+    values = low + (high - low) * state.random_sample(count)
+    _, key, pos, _, _ = state.get_state()
+    rng.setstate((version, tuple(int(k) for k in key) + (int(pos),), gauss_next))
+    return values
+
+def jitter(verts, strength, rng):
+    """
+    Desplaza cada vértice un offset aleatorio en [-1, 1]^3 * strength.
+    Consume el RNG en el mismo orden (x, y, z por vértice) que el antiguo
+    distort_mesh con bmesh, así cada seed da la misma forma.
+    """
+    return verts + uniform_block(rng, len(verts) * 3, -1.0, 1.0).reshape(-1, 3) * strength
+
+# Gradientes de Perlin (aristas del cubo)
+_GRADIENTS = np.array((
+    (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+    (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+    (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1),
+), dtype=np.float64)
+
+def perlin(points, perm):
+    """
+    Ruido de gradiente 3D (Perlin mejorado) en N puntos a la vez.
+
+    Args:
+        points: (N, 3) coordenadas
+        perm: permutación de 0..255 repetida dos veces (512,)
+
+    Returns:
+        (N,) valores aproximadamente en [-1, 1]
+    """
+    cell = np.floor(points)
+    local = points - cell
+    cell = cell.astype(np.int64) & 255
+    fade = local * local * local * (local * (local * 6 - 15) + 10)
+
+    result = 0.0
+    for dx in (0, 1):
+        for dy in (0, 1):
+            for dz in (0, 1):
+                corner = perm[perm[perm[cell[:, 0] + dx] + cell[:, 1] + dy] + cell[:, 2] + dz]
+                offset = local - (dx, dy, dz)
+                value = np.einsum("ij,ij->i", _GRADIENTS[corner % 12], offset)
+                weight = ((fade[:, 0] if dx else 1 - fade[:, 0]) *
+                          (fade[:, 1] if dy else 1 - fade[:, 1]) *
+                          (fade[:, 2] if dz else 1 - fade[:, 2]))
+                result = result + weight * value
+    return result
+
+def coherent_displace(verts, strength, rng, frequency=1.5, octaves=3):
+    """
+    Desplaza los vértices en dirección radial (desde su centro) con ruido
+    coherente fBm: vértices cercanos se mueven parecido, así salen caras
+    más anchas y planas que con jitter (rocas más creíbles).
+    """
+    perm = np.array(rng.sample(range(256), 256), dtype=np.int64)
+    perm = np.concatenate([perm, perm])
+
+    center = verts.mean(axis=0)
+    offsets = verts - center
+    radius = np.linalg.norm(offsets, axis=1, keepdims=True)
+    directions = offsets / np.where(radius > 0, radius, 1.0)
+    points = offsets / (radius.max() or 1.0)
+
+    noise = np.zeros(len(verts))
+    amplitude, total = 1.0, 0.0
+    for octave in range(octaves):
+        noise += amplitude * perlin(points * frequency * 2 ** octave + 17.0 * octave, perm)
+        total += amplitude
+        amplitude *= 0.5
+    return verts + directions * (noise / total * strength)[:, None]
+
+# ─────────────────────────────────────────────────────────────────
+#  GEOMETRY
+# ─────────────────────────────────────────────────────────────────
+class Geometry:
+    """Acumula geometria de muchas piezas como una sola malla (arrays NumPy)."""
+
+    def __init__(self, name="Mesh"):
+        self.name = name       # Nombre del objeto al subirlo a Blender
+        # Buffers por bloque; se concatenan una sola vez en arrays()
+        self._verts = []       # (n, 3) float64, coordenadas absolutas
+        self._loops = []       # indices de vertice por loop (globales)
+        self._sizes = []       # numero de loops por cara
+        self._uvs = []         # u, v planos, un par por loop
+        self._mats = []        # indice de material por cara
+        self.materials = []    # slots en orden de primer uso (igual que join)
+        self.parts = []        # [(nombre, primera_cara, ultima_cara + 1), ...]
+        self._mat_slots = {}
+        self.vertex_count = 0
+        self.face_count = 0
+
+    def material_index(self, material):
+        if material is None:
+            return 0
+        slot = self._mat_slots.get(material.name)
+        if slot is None:
+            slot = len(self.materials)
+            self._mat_slots[material.name] = slot
+            self.materials.append(material)
+        return slot
+
+    def add_box(self, location, scale, material, name="Part"):
+        """Equivalente a primitive_cube_add(size=1) + scale + transform_apply."""
+        self.add_boxes([location], [scale], [material], [name])
+
+    def add_boxes(self, centers, sizes, materials, names=None):
+        """
+        Añade N cubos de una vez (operacion vectorizada).
+
+        Args:
+            centers: (N, 3) centros absolutos
+            sizes: (N, 3) dimensiones de cada cubo
+            materials: lista de N materiales (slot asignado en orden)
+            names: nombres de pieza opcionales (para self.parts)
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 3)
+        n = len(centers)
+        if n == 0:
+            return
+        faces_per_box = len(CUBE_FACES)
+
+        # Una plantilla por forma distinta (pilares, marcos... se repiten) y
+        # cada cubo = plantilla + centro, en una sola operación
+        shapes, inverse = np.unique(sizes, axis=0, return_inverse=True)
+        templates = _CUBE_V[None, :, :] * shapes[:, None, :]
+        verts = centers[:, None, :] + templates[inverse.reshape(-1)]
+        self._verts.append(verts.reshape(-1, 3))
+
+        offsets = self.vertex_count + np.arange(n, dtype=np.int32) * len(CUBE_VERTS)
+        self._loops.append((offsets[:, None] + _CUBE_LOOPS[None, :]).ravel())
+        self._sizes.append(np.full(n * faces_per_box, 4, dtype=np.int32))
+        self._uvs.append(np.tile(_CUBE_UV, n))
+
+        slots = np.array([self.material_index(m) for m in materials], dtype=np.int32)
+        self._mats.append(np.repeat(slots, faces_per_box))
+
+        names = names or ["Part"] * n
+        for i, name in enumerate(names):
+            first = self.face_count + i * faces_per_box
+            self.parts.append((name, first, first + faces_per_box))
+
+        self.vertex_count += n * len(CUBE_VERTS)
+        self.face_count += n * faces_per_box
+
+    def add_polygons(self, verts, faces, material, name="Part"):
+        """Malla arbitraria en coordenadas absolutas (sin UVs, como bmesh)."""
+        verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+        self._verts.append(verts)
+
+        loops = [self.vertex_count + i for f in faces for i in f]
+        self._loops.append(np.array(loops, dtype=np.int32))
+        self._sizes.append(np.array([len(f) for f in faces], dtype=np.int32))
+        self._uvs.append(np.zeros(len(loops) * 2, dtype=np.float32))
+
+        slot = self.material_index(material)
+        self._mats.append(np.full(len(faces), slot, dtype=np.int32))
+        self.parts.append((name, self.face_count, self.face_count + len(faces)))
+
+        self.vertex_count += len(verts)
+        self.face_count += len(faces)
+
+    def add_cone(self, location, radius1, radius2, depth, segments, material, name="Part"):
+        verts, faces = cone(location, radius1, radius2, depth, segments)
+        self.add_polygons(verts, faces, material, name)
+
+    def join(self, other):
+        """Añade otra Geometry al final (sus slots de material se reasignan)."""
+        verts, loops, sizes, uvs, mats = other.arrays()
+        remap = np.array([self.material_index(m) for m in other.materials] or [0], dtype=np.int32)
+
+        self._verts.append(verts)
+        self._loops.append(loops + self.vertex_count)
+        self._sizes.append(sizes)
+        self._uvs.append(uvs)
+        self._mats.append(remap[mats])
+        for name, first, last in other.parts:
+            self.parts.append((name, first + self.face_count, last + self.face_count))
+
+        self.vertex_count += other.vertex_count
+        self.face_count += other.face_count
+        return self
+
+    def part_mask(self, prefixes):
+        """Máscara por cara de las piezas cuyo nombre empieza por algún prefijo."""
+        mask = np.zeros(self.face_count, dtype=bool)
+        for name, first, last in self.parts:
+            if name.startswith(tuple(prefixes)):
+                mask[first:last] = True
+        return mask
+
+    def bounds(self, face_mask=None):
+        """(min, max) de los vértices de las caras marcadas (todas por defecto)."""
+        verts, loops, sizes, _, _ = self.arrays()
+        if face_mask is None:
+            return verts.min(axis=0), verts.max(axis=0)
+        loop_mask = np.repeat(face_mask, sizes)
+        used = verts[loops[loop_mask]]
+        return used.min(axis=0), used.max(axis=0)
+
+    def subset(self, face_mask, name=None):
+        """
+        Copia solo con las caras marcadas: vértices y slots de material sin
+        uso se descartan y los rangos de self.parts se reajustan.
+        """
+        verts, loops, sizes, uvs, mats = self.arrays()
+        face_mask = np.asarray(face_mask, dtype=bool)
+        loop_mask = np.repeat(face_mask, sizes)
+
+        used = np.unique(loops[loop_mask])
+        vert_remap = np.full(len(verts), -1, dtype=np.int32)
+        vert_remap[used] = np.arange(len(used), dtype=np.int32)
+
+        kept_slots = np.unique(mats[face_mask])
+        slot_remap = np.zeros(max(len(self.materials), 1), dtype=np.int32)
+        slot_remap[kept_slots] = np.arange(len(kept_slots), dtype=np.int32)
+
+        out = Geometry(name or self.name)
+        for slot in kept_slots:
+            if slot < len(self.materials):
+                out.material_index(self.materials[slot])
+        out._verts.append(verts[used])
+        out._loops.append(vert_remap[loops[loop_mask]])
+        out._sizes.append(sizes[face_mask])
+        out._uvs.append(uvs.reshape(-1, 2)[loop_mask].ravel())
+        out._mats.append(slot_remap[mats[face_mask]])
+
+        # Nuevo índice de cara = número de caras conservadas antes
+        kept_before = np.concatenate([[0], np.cumsum(face_mask)])
+        for part, first, last in self.parts:
+            new_first, new_last = int(kept_before[first]), int(kept_before[last])
+            if new_last > new_first:
+                out.parts.append((part, new_first, new_last))
+        out.vertex_count = len(used)
+        out.face_count = int(face_mask.sum())
+        return out
+
+    def placed(self, offset, yaw=0.0, name=None):
+        """Copia girada yaw radianes sobre Z (respecto al origen) y trasladada a offset."""
+        verts, loops, sizes, uvs, mats = self.arrays()
+        # Redondeo: giros de 90° exactos (cos(pi/2) = 6e-17 ensuciaría los digests)
+        c, s = round(math.cos(yaw), 12), round(math.sin(yaw), 12)
+        rotation = np.array([[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, 1.0]])
+
+        out = Geometry(name or self.name)
+        for material in self.materials:
+            out.material_index(material)
+        out._verts.append(verts @ rotation + np.asarray(offset, dtype=np.float64))
+        out._loops.append(loops)
+        out._sizes.append(sizes)
+        out._uvs.append(uvs)
+        out._mats.append(mats)
+        out.parts = list(self.parts)
+        out.vertex_count = self.vertex_count
+        out.face_count = self.face_count
+        return out
+
+    def palette_atlas(self):
+        """
+        Copia con un único material: los colores de los slots pasan a una
+        textura paleta (un texel por color) y cada cara apunta con su UV al
+        centro de su texel. Un material = una draw call por asset.
+        """
+        verts, loops, sizes, uvs, mats = self.arrays()
+        slot_colors = [tuple(m.color) for m in self.materials] or [(0.8, 0.8, 0.8, 1.0)]
+        # Texels ordenados: el mismo conjunto de colores da la misma textura
+        colors = sorted(set(slot_colors))
+        slot_texel = [colors.index(c) for c in slot_colors]
+
+        texel = np.array(slot_texel, dtype=np.int32)[mats]
+        face_uvs = np.stack([(texel + 0.5) / len(colors), np.full(len(texel), 0.5)], axis=1)
+        loop_uvs = np.repeat(face_uvs, sizes, axis=0).astype(np.float32).ravel()
+
+        # Mismo conjunto de colores -> mismo material (se comparte entre assets)
+        digest = hashlib.sha1(repr(colors).encode("utf-8")).hexdigest()[:10]
+        name = f"Mat_Palette_{digest}"
+        atlas = Geometry(self.name)
+        atlas.material_index(Material(name, (1.0, 1.0, 1.0, 1.0), tuple(colors)))
+        atlas._verts.append(verts)
+        atlas._loops.append(loops)
+        atlas._sizes.append(sizes)
+        atlas._uvs.append(loop_uvs)
+        atlas._mats.append(np.zeros(len(sizes), dtype=np.int32))
+        atlas.parts = list(self.parts)
+        atlas.vertex_count = self.vertex_count
+        atlas.face_count = self.face_count
+        return atlas
+
+    def digest(self):
+        """
+        sha1 de la malla (vértices redondeados a 1e-6, caras, UVs, materiales):
+        la misma seed debe dar siempre el mismo digest (ver golden.py).
+        """
+        verts, loops, sizes, uvs, mats = self.arrays()
+        h = hashlib.sha1()
+        h.update((np.round(verts, 6) + 0.0).astype("<f8").tobytes())  # + 0.0: -0.0 -> 0.0
+        for array in (loops, sizes, mats):
+            h.update(array.astype("<i4").tobytes())
+        h.update(np.round(uvs, 6).astype("<f4").tobytes())
+        h.update(repr([(m.name, tuple(m.color), m.palette) for m in self.materials]).encode("utf-8"))
+        return h.hexdigest()
+
+    def arrays(self):
+        """Devuelve (verts, loops, sizes, uvs, mats) concatenados."""
+        def cat(chunks, dtype, shape=(-1,)):
+            if not chunks:
+                return np.zeros(0, dtype=dtype).reshape(shape)
+            return np.concatenate(chunks).astype(dtype, copy=False).reshape(shape)
+
+        return (
+            cat(self._verts, np.float64, (-1, 3)),
+            cat(self._loops, np.int32),
+            cat(self._sizes, np.int32),
+            cat(self._uvs, np.float32),
+            cat(self._mats, np.int32),
+        )
+
+class PartList:
+    """
+    Piezas descritas pero aún no escritas (misma API que Geometry para
+    add_box / add_polygons). build() da la malla fundida; instances() las
+    formas únicas + sus colocaciones, para exportar con mallas enlazadas.
+    """
+
+    def __init__(self, name="Mesh"):
+        self.name = name
+        self.items = []    # ("box", nombre, centro, tamaño, material) | ("poly", nombre, verts, caras, material)
+
+    def add_box(self, location, scale, material, name="Part"):
+        self.items.append(("box", name, tuple(location), tuple(scale), material))
+
+    def add_polygons(self, verts, faces, material, name="Part"):
+        self.items.append(("poly", name, verts, faces, material))
+
+    def build(self):
+        """Una sola Geometry; cada tramo de cubos consecutivos en una llamada a add_boxes."""
+        geo = Geometry(self.name)
+        run = []
+        def flush():
+            if run:
+                geo.add_boxes([p[2] for p in run], [p[3] for p in run],
+                              [p[4] for p in run], [p[1] for p in run])
+                run.clear()
+
+        for item in self.items:
+            if item[0] == "box":
+                run.append(item)
+                continue
+            flush()
+            _, name, verts, faces, material = item
+            geo.add_polygons(verts, faces, material, name)
+        flush()
+        return geo
+
+    def instances(self):
+        """
+        Cubos idénticos (mismo tamaño y material) comparten forma.
+
+        Returns:
+            (shapes, placements): Geometry por forma única (cubos centrados en
+            el origen, polígonos tal cual) y [(índice de forma, nombre, posición)]
+        """
+        shapes, placements, keys = [], [], {}
+        for kind, name, a, b, material in self.items:
+            if kind == "box":
+                key = (b, material.name if material else None)
+                if key not in keys:
+                    keys[key] = len(shapes)
+                    shape = Geometry(f"{self.name}_Shape{len(shapes)}")
+                    shape.add_box((0.0, 0.0, 0.0), b, material, name)
+                    shapes.append(shape)
+                placements.append((keys[key], name, a))
+            else:
+                shape = Geometry(f"{self.name}_Shape{len(shapes)}")
+                shape.add_polygons(a, b, material, name)
+                shapes.append(shape)
+                placements.append((len(shapes) - 1, name, (0.0, 0.0, 0.0)))
+        return shapes, placements
@@ -2,57 +2,64 @@
 humanoid_generator.py - Low Poly Villager Generator v2
 Aldeanos masculinos y femeninos con proporciones correctas y variación visual.
 """
-import bpy
 import random
 
+from .geometry import Geometry, Material, to_hex
+from . import lod
+from . import rig
+from .phases import phase
+
 # ─────────────────────────────────────────────────────────────────
 #  MATERIAL HELPER
+#  Un material por color (Mat_F_RRGGBB), compartido entre todos los
+#  personajes: las paletas son finitas, así que bpy.data y Unity ven
+#  como mucho unas decenas de materiales en vez de ~8 por seed.
 # ─────────────────────────────────────────────────────────────────
-def get_mat(name, color):
-    m = bpy.data.materials.get(name)
-    if m is None:
-        m = bpy.data.materials.new(name=name)
-    m.use_nodes = False
-    m.diffuse_color = (color[0], color[1], color[2], 1.0)
-    return m
+def get_mat(color):
+    return Material(f"Mat_F_{to_hex(color)}", (color[0], color[1], color[2], 1.0))
 
 # ─────────────────────────────────────────────────────────────────
 #  PRIMITIVES — siempre en coordenadas absolutas
+#  No crean objetos: devuelven una descripcion de la pieza que
+#  join_all escribe de golpe en un buffer NumPy (Geometry).
 # ─────────────────────────────────────────────────────────────────
 def box(name, cx, cy, cz, sx, sy, sz, mat):
     """Cubo centrado en (cx,cy,cz) con dimensiones (sx,sy,sz)."""
-    bpy.ops.mesh.primitive_cube_add(size=1, location=(cx, cy, cz))
-    obj = bpy.context.active_object
-    obj.name = name
-    obj.scale = (sx, sy, sz)
-    bpy.ops.object.transform_apply(scale=True)
-    obj.data.materials.clear()
-    obj.data.materials.append(mat)
-    return obj
+    return ("box", name, (cx, cy, cz), (sx, sy, sz), mat)
 
 def cone_hat(name, cx, cy, cz, r_base, height, mat):
     """Cono de 6 caras para sombrero."""
-    bpy.ops.mesh.primitive_cone_add(vertices=6, radius1=r_base, radius2=0.01,
-                                     depth=height, location=(cx, cy, cz))
-    obj = bpy.context.active_object
-    obj.name = name
-    obj.data.materials.clear()
-    obj.data.materials.append(mat)
-    return obj
+    return ("cone", name, (cx, cy, cz), (r_base, 0.01, height), mat)
 
 # ─────────────────────────────────────────────────────────────────
 #  JOIN
 # ─────────────────────────────────────────────────────────────────
 def join_all(parts, final_name):
+    """
+    Construye todas las piezas como una sola malla.
+    Los tramos consecutivos de cubos se añaden con una unica operacion
+    vectorizada; el orden de piezas (y de slots de material) se conserva.
+    """
     valid = [p for p in parts if p is not None]
-    bpy.ops.object.select_all(action='DESELECT')
-    for p in valid:
-        p.select_set(True)
-    bpy.context.view_layer.objects.active = valid[0]
-    bpy.ops.object.join()
-    result = bpy.context.active_object
-    result.name = final_name
-    return result
+    geo = Geometry(final_name)
+
+    run = []
+    def flush():
+        if run:
+            geo.add_boxes([p[2] for p in run], [p[3] for p in run],
+                         [p[4] for p in run], [p[1] for p in run])
+            run.clear()
+
+    for part in valid:
+        if part[0] == "box":
+            run.append(part)
+            continue
+        flush()
+        kind, name, location, (r_base, r_top, height), mat = part
+        geo.add_cone(location, r_base, r_top, height, 6, mat, name)
+    flush()
+
+    return geo
 
 # ─────────────────────────────────────────────────────────────────
 #  PALETAS
@@ -85,19 +92,34 @@ CLOTH_PALETTES = [
     ((0.35, 0.18, 0.48), (0.22, 0.10, 0.32), (0.82, 0.72, 0.52)),  # Púrpura
 ]
 
+# LOD1: fuera los detalles de la cara, cinturón y mechones laterales
+# LOD2: cada brazo y cada pierna -> una caja; fuera accesorios pequeños
+LOD_STEPS = [
+    [lod.drop("Eye_", "Brow_", "Nose", "ChestDetail", "Belt", "HairL", "HairR")],
+    [lod.drop("Bag", "Scarf", "Beard", "ElderBeard", "HatBrim", "HairBack")] + [
+        lod.collapse(f"Arm_{side}", (f"Shoulder_{side}", f"UpperArm_{side}", f"LowerArm_{side}",
+                                     f"Hand_{side}"), f"UpperArm_{side}")
+        for side in "LR"
+    ] + [
+        lod.collapse(f"Leg_{side}", (f"Thigh_{side}", f"Shin_{side}", f"Foot_{side}"), f"Thigh_{side}")
+        for side in "LR"
+    ],
+]
+
 # ─────────────────────────────────────────────────────────────────
-#  GENERADOR PRINCIPAL
+#  PROPORCIONES
 # ─────────────────────────────────────────────────────────────────
-def generate(params):
-    seed  = params.get("seed", 42)
-    style = params.get("style", "villager")
-    rng   = random.Random(seed)
+def body_proportions(style, rng):
+    """
+    Medidas del cuerpo según el estilo (consume rng en el mismo orden de siempre).
 
+    Returns:
+        (H, shoulder_w, hip_w, torso_d, leg_w, arm_w, head_w, head_h, head_d)
+    """
     is_female = "female" in style
     is_elder  = "elder"  in style
     is_guard  = "guard"  in style
 
-    # ── Proporciones ──────────────────────────────────────────────
     # Altura total
     if is_guard:
         H = rng.uniform(1.85, 2.00)
@@ -127,24 +149,139 @@ def generate(params):
     head_w = H * rng.uniform(0.130, 0.155)
     head_h = head_w * rng.uniform(1.10, 1.30)
     head_d = head_w * rng.uniform(0.90, 1.10)
+    return H, shoulder_w, hip_w, torso_d, leg_w, arm_w, head_w, head_h, head_d
 
-    # ── Alturas clave (desde el suelo) ────────────────────────────
+def joint_heights(H, head_h):
+    """Alturas clave desde el suelo (también son las articulaciones del rig)."""
     # Proporciones clásicas: cabeza = H/8, piernas = H*0.47, torso = H*0.35
-    foot_h     = H * 0.040   # Altura del pie
-    leg_total  = H * 0.470   # Desde suelo hasta cadera
-    hip_z      = leg_total                          # Centro de cadera
+    hip_z      = H * 0.470                          # Centro de cadera
     waist_z    = hip_z   + H * 0.060               # Cintura
     chest_z    = waist_z + H * 0.130               # Pecho
-    shoulder_z = chest_z + H * 0.080               # Hombros
-    neck_bot_z = shoulder_z                         # Base del cuello
-    neck_top_z = neck_bot_z + H * 0.045            # Top del cuello
-    head_cz    = neck_top_z + head_h * 0.5         # Centro de la cabeza
+    shoulder_z = chest_z + H * 0.080               # Hombros (= base del cuello)
+    neck_top_z = shoulder_z + H * 0.045            # Top del cuello
+    elbow_z    = shoulder_z - H * 0.130
+    return {
+        "hip": hip_z, "waist": waist_z, "chest": chest_z, "shoulder": shoulder_z,
+        "neck_top": neck_top_z, "head_top": neck_top_z + head_h,
+        "knee": H * 0.230, "ankle": H * 0.055,
+        "elbow": elbow_z, "wrist": elbow_z - H * 0.115,
+    }
+
+# ─────────────────────────────────────────────────────────────────
+#  RIG
+#  Un esqueleto canónico por tipo de cuerpo (centro de los rangos de
+#  body_proportions); los nombres son los que busca HumanoidAnimator.cs.
+#  Cada pieza va entera a un hueso (pesos rígidos).
+# ─────────────────────────────────────────────────────────────────
+PART_BONES = [
+    (("Thigh_L", "Leg_L"), "LeftUpperLeg"), (("Shin_L",), "LeftLowerLeg"), (("Foot_L",), "LeftFoot"),
+    (("Thigh_R", "Leg_R"), "RightUpperLeg"), (("Shin_R",), "RightLowerLeg"), (("Foot_R",), "RightFoot"),
+    (("Shoulder_L", "UpperArm_L", "Arm_L"), "LeftUpperArm"), (("LowerArm_L",), "LeftLowerArm"),
+    (("Hand_L",), "LeftHand"),
+    (("Shoulder_R", "UpperArm_R", "Arm_R"), "RightUpperArm"), (("LowerArm_R",), "RightLowerArm"),
+    (("Hand_R",), "RightHand"),
+    (("Pelvis", "Skirt", "Belt"), "Hips"),
+    (("Torso", "ChestDetail", "Bag"), "Chest"),
+    (("Neck", "Scarf"), "Neck"),
+    (("Head", "Eye_", "Brow_", "Nose", "Hair", "Hat", "Hood", "Beard", "ElderBeard"), "Head"),
+]
 
-    knee_z     = H * 0.230   # Rodilla
-    ankle_z    = H * 0.055   # Tobillo
+class _MidRange:
+    """Sustituto de rng para body_proportions: el centro de cada rango."""
+    def uniform(self, a, b):
+        return (a + b) / 2
+
+def body_tags(style):
+    """("F" | "M", "Elder" | "Guard" | "Villager") del estilo."""
+    gender_tag = "F" if "female" in style else "M"
+    type_tag = "Elder" if "elder" in style else ("Guard" if "guard" in style else "Villager")
+    return gender_tag, type_tag
+
+_skeletons = {}
+
+def skeleton(style):
+    """Esqueleto canónico (rig.Skeleton) del tipo de cuerpo del estilo; uno por tipo."""
+    gender_tag, type_tag = body_tags(style)
+    name = f"Rig_{gender_tag}_{type_tag}"
+    if name in _skeletons:
+        return _skeletons[name]
+
+    H, shoulder_w, hip_w, _, leg_w, arm_w, _, head_h, _ = body_proportions(style, _MidRange())
+    z = joint_heights(H, head_h)
+    bones = [
+        ("Hips", None, (0, 0, z["hip"]), (0, 0, z["waist"])),
+        ("Spine", "Hips", (0, 0, z["waist"]), (0, 0, z["chest"])),
+        ("Chest", "Spine", (0, 0, z["chest"]), (0, 0, z["shoulder"])),
+        ("Neck", "Chest", (0, 0, z["shoulder"]), (0, 0, z["neck_top"])),
+        ("Head", "Neck", (0, 0, z["neck_top"]), (0, 0, z["head_top"])),
+    ]
+    # Izquierda en -X, como las piezas _L
+    for side, sx in (("Left", -1), ("Right", 1)):
+        ax = sx * (shoulder_w * 0.5 + arm_w * 0.45)
+        bones += [
+            (f"{side}UpperArm", "Chest", (ax, 0, z["shoulder"]), (ax, 0, z["elbow"])),
+            (f"{side}LowerArm", f"{side}UpperArm", (ax, 0, z["elbow"]), (ax, 0, z["wrist"])),
+            (f"{side}Hand", f"{side}LowerArm", (ax, 0, z["wrist"]), (ax, 0, z["wrist"] - H * 0.058)),
+        ]
+        lx = sx * hip_w * 0.28
+        bones += [
+            (f"{side}UpperLeg", "Hips", (lx, 0, z["hip"]), (lx, 0, z["knee"])),
+            (f"{side}LowerLeg", f"{side}UpperLeg", (lx, 0, z["knee"]), (lx, 0, z["ankle"])),
+            (f"{side}Foot", f"{side}LowerLeg", (lx, 0, z["ankle"]), (lx, leg_w * 1.2, 0)),
+        ]
+    _skeletons[name] = rig.Skeleton(name, H, bones)
+    return _skeletons[name]
 
-    elbow_z    = shoulder_z - H * 0.130
-    wrist_z    = elbow_z    - H * 0.115
+# ─────────────────────────────────────────────────────────────────
+#  GENERADOR PRINCIPAL
+# ─────────────────────────────────────────────────────────────────
+def generate(params, collection=None):
+    """
+    Personaje atado al rig compartido de su tipo de cuerpo ('rig': false
+    para la malla estática de antes).
+    """
+    # bpy solo para subir la malla: build_geometry funciona sin Blender
+    from . import mesh_builder
+    levels = build_lods(params)
+    if not params.get("rig", True):
+        return mesh_builder.upload_lods(levels, collection=collection)
+
+    skel, scale, weights = build_skin(params, levels)
+    return mesh_builder.upload_skinned(levels, skel, weights, scale, collection=collection)
+
+def build_skin(params, levels):
+    """
+    Returns:
+        (skeleton, scale, weights): rig compartido, altura del personaje /
+        altura del rig y el hueso de cada vértice por nivel
+    """
+    style = params.get("style", "villager")
+    skel = skeleton(style)
+    # H es lo primero que sale del rng del personaje (igual que en build_geometry)
+    height = body_proportions(style, random.Random(params.get("seed", 42)))[0]
+    weights = [rig.vertex_bones(level, skel, PART_BONES) for level in levels]
+    return skel, height / skel.height, weights
+
+def build_lods(params):
+    """LOD0..n del personaje ('lods' niveles, ver LOD_STEPS)."""
+    return lod.chain(build_geometry(params), lod.lod_count(params), LOD_STEPS)
+
+def build_geometry(params):
+    """Personaje completo como una Geometry (sin bpy)."""
+    seed  = params.get("seed", 42)
+    style = params.get("style", "villager")
+    rng   = random.Random(seed)
+
+    is_female = "female" in style
+    is_elder  = "elder"  in style
+
+    H, shoulder_w, hip_w, torso_d, leg_w, arm_w, head_w, head_h, head_d = body_proportions(style, rng)
+    z = joint_heights(H, head_h)
+    hip_z, waist_z, chest_z = z["hip"], z["waist"], z["chest"]
+    shoulder_z, neck_bot_z, neck_top_z = z["shoulder"], z["shoulder"], z["neck_top"]
+    head_cz = neck_top_z + head_h * 0.5         # Centro de la cabeza
+    knee_z, ankle_z = z["knee"], z["ankle"]
+    elbow_z, wrist_z = z["elbow"], z["wrist"]
 
     # ── Colores ───────────────────────────────────────────────────
     skin_col  = SKIN_TONES[rng.randint(0, len(SKIN_TONES)-1)]
@@ -157,21 +294,15 @@ def generate(params):
     sec_col   = palette[1]
     acc_col   = palette[2]
 
-    # Helper para hex
-    def to_hex(c):
-        return "".join([f"{int(x*255):02X}" for x in c])
-
     # ── Materiales (nombre incluye HEX para que Unity lo lea) ─────
-    uid = str(seed)
-    
-    m_skin  = get_mat(f"Mat_F_Skin_{to_hex(skin_col)}_{uid}",  skin_col)
-    m_hair  = get_mat(f"Mat_F_Hair_{to_hex(hair_col)}_{uid}",  hair_col)
-    m_cloth = get_mat(f"Mat_F_Cloth_{to_hex(cloth_col)}_{uid}", cloth_col)
-    m_sec   = get_mat(f"Mat_F_Sec_{to_hex(sec_col)}_{uid}",   sec_col)
-    m_acc   = get_mat(f"Mat_F_Acc_{to_hex(acc_col)}_{uid}",   acc_col)
+    m_skin  = get_mat(skin_col)
+    m_hair  = get_mat(hair_col)
+    m_cloth = get_mat(cloth_col)
+    m_sec   = get_mat(sec_col)
+    m_acc   = get_mat(acc_col)
     
-    m_eye   = get_mat(f"Mat_F_Eye_101015_{uid}",   (0.06, 0.06, 0.08))
-    m_white = get_mat(f"Mat_F_White_EBEBE5_{uid}", (0.92, 0.92, 0.90))
+    m_eye   = get_mat((0.06, 0.06, 0.08))
+    m_white = get_mat((0.92, 0.92, 0.90))
 
     parts = []
 
@@ -266,7 +397,7 @@ def generate(params):
     if rng.random() < 0.6:
         brow_z = eye_z + eye_h * 0.85
         brow_col = tuple(max(0, c - 0.15) for c in skin_col)
-        m_brow = get_mat(f"Mat_F_Brow_{to_hex(brow_col)}_{uid}", brow_col)
+        m_brow = get_mat(brow_col)
         for sx in [-1, 1]:
             parts.append(box(f"Brow_{'L' if sx<0 else 'R'}",
                              sx * eye_x, eye_y, brow_z,
@@ -365,7 +496,7 @@ def generate(params):
         beard_h = head_h * rng.uniform(0.28, 0.45)
         beard_cz = head_cz - head_h * 0.30
         beard_col = tuple(max(0, c - 0.05) for c in hair_col)
-        m_beard = get_mat(f"Mat_F_Beard_{to_hex(beard_col)}_{uid}", beard_col)
+        m_beard = get_mat(beard_col)
         parts.append(box("Beard", 0, head_d * 0.50, beard_cz,
                          head_w * 0.58, H * 0.018, beard_h, m_beard))
 
@@ -387,15 +518,20 @@ def generate(params):
     # Bufanda (20%)
     if rng.random() < 0.20:
         scarf_col = CLOTH_PALETTES[rng.randint(0, len(CLOTH_PALETTES)-1)][2]
-        m_scarf = get_mat(f"Mat_F_Scarf_{to_hex(scarf_col)}_{uid}", scarf_col)
+        m_scarf = get_mat(scarf_col)
         parts.append(box("Scarf", 0, 0, neck_bot_z + neck_h * 0.5,
                          neck_w * 1.6, neck_w * 1.5, neck_h * 0.6, m_scarf))
 
     # ─────────────────────────────────────────────────────────────
     #  JOIN Y RETORNO
     # ─────────────────────────────────────────────────────────────
-    gender_tag = "F" if is_female else "M"
-    type_tag   = "Elder" if is_elder else ("Guard" if is_guard else "Villager")
+    gender_tag, type_tag = body_tags(style)
     final_name = f"Villager_{gender_tag}_{type_tag}_{seed}"
 
-    return join_all(parts, final_name)
+    with phase("geometry"):
+        geo = join_all(parts, final_name)
+    if params.get("palette_atlas"):
+        # Un solo material + textura paleta (una draw call por personaje)
+        with phase("palette"):
+            geo = geo.palette_atlas()
+    return geo
@@ -0,0 +1,66 @@
+"""
+lod.py - Cadenas de LOD por piezas (sin bpy)
+Cada generador describe sus niveles con pasos que entienden sus piezas
+(Geometry.parts): quitar detalles (cristales, molduras, cara) o fundir un
+grupo de piezas en su caja envolvente (brazo, planta de la casa). Nada de
+decimado genérico: los LOD conservan la silueta y los colores.
+
+Los niveles se llaman {nombre}_LOD0..n, que es lo que el importador de FBX
+de Unity reconoce para crear el LODGroup.
+"""
+import numpy as np
+
+from .phases import phase
+
+def lod_count(params):
+    """Número total de niveles pedido ('lods', 1 = solo el original)."""
+    return max(1, int(params.get("lods", 1)))
+
+def drop(*prefixes):
+    """Paso que elimina las piezas cuyo nombre empieza por algún prefijo."""
+    def step(geo):
+        mask = geo.part_mask(prefixes)
+        return geo.subset(~mask) if mask.any() else geo
+    return step
+
+def collapse(name, prefixes, material_from=None):
+    """
+    Paso que sustituye las piezas del grupo por su caja envolvente, con el
+    material de la primera cara de material_from (por defecto, del grupo).
+    """
+    def step(geo):
+        mask = geo.part_mask(prefixes)
+        if not mask.any():
+            return geo
+        low, high = geo.bounds(mask)
+        source = geo.part_mask((material_from,)) if material_from else mask
+        source = source if source.any() else mask
+        material = geo.materials[geo.arrays()[4][np.argmax(source)]] if geo.materials else None
+        out = geo.subset(~mask)
+        out.add_box((low + high) / 2, high - low, material, name)
+        return out
+    return step
+
+def chain(geo, count, steps):
+    """
+    LOD0..LOD{count-1}: el nivel i aplica la lista de pasos steps[i-1] sobre
+    el nivel anterior. Como mucho len(steps) + 1 niveles.
+
+    Returns:
+        lista de Geometry llamadas {geo.name}_LOD{i}; [geo] si count == 1
+    """
+    count = min(count, len(steps) + 1)
+    if count <= 1:
+        return [geo]
+    with phase("lods"):
+        base_name = geo.name
+        levels = [geo]
+        for level_steps in steps[:count - 1]:
+            current = levels[-1]
+            for step in level_steps:
+                current = step(current)
+            levels.append(current)
+
+        # subset() con todas las caras = copia con el nombre del nivel
+        return [level.subset(np.ones(level.face_count, dtype=bool), f"{base_name}_LOD{i}")
+                for i, level in enumerate(levels)]
@@ -0,0 +1,267 @@
+"""
+mesh_builder.py - Sube una Geometry a Blender (sin bpy.ops)
+Escribe vertices, caras, UVs e indices de material con foreach_set en un
+unico Mesh. Es la unica parte de los generadores que necesita bpy; la
+geometria se construye antes en geometry.py.
+"""
+from collections import OrderedDict
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from .phases import phase
+
+class MaterialRegistry:
+    """
+    Materiales de bpy compartidos por nombre (los nombres de geometry ya van
+    por color). El recuento de referencias es material.users: los que se
+    quedan sin usuarios se conservan para los siguientes assets y solo se
+    expulsan (LRU) cuando hay más de MAX_UNUSED.
+    """
+    MAX_UNUSED = 64
+
+    def __init__(self):
+        self._recent = OrderedDict()   # nombre -> None, del menos al más reciente
+
+    def get(self, material):
+        """Material de bpy para un geometry.Material (lo crea si falta)."""
+        mat = bpy.data.materials.get(material.name)
+        if mat is None:
+            mat = bpy.data.materials.new(name=material.name)
+            mat.diffuse_color = material.color
+            if material.palette:
+                setup_palette(mat, material)
+        self._recent[material.name] = None
+        self._recent.move_to_end(material.name)
+        return mat
+
+    def names(self):
+        return set(self._recent)
+
+    def evict(self, max_unused=None):
+        """Elimina los materiales sin usuarios más antiguos; devuelve cuántos."""
+        max_unused = self.MAX_UNUSED if max_unused is None else max_unused
+        unused = []
+        for name in list(self._recent):
+            mat = bpy.data.materials.get(name)
+            if mat is None:
+                del self._recent[name]
+            elif mat.users == 0:
+                unused.append(mat)
+
+        doomed = unused[:max(0, len(unused) - max_unused)]
+        if not doomed:
+            return 0
+        images = {node.image for m in doomed if m.node_tree
+                  for node in m.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image}
+        for mat in doomed:
+            del self._recent[mat.name]
+        bpy.data.batch_remove(doomed)
+        orphans = [img for img in images if img.users == 0]
+        if orphans:
+            bpy.data.batch_remove(orphans)
+        return len(doomed)
+
+registry = MaterialRegistry()
+
+def get_material(material):
+    """Material de bpy para un geometry.Material (se reutiliza por nombre)."""
+    return registry.get(material)
+
+def setup_palette(mat, material):
+    """Textura paleta N x 1 (sin filtrado) conectada al Base Color."""
+    colors = material.palette
+    image = bpy.data.images.get(material.name)
+    if image is None:
+        image = bpy.data.images.new(material.name, width=len(colors), height=1, alpha=True)
+        image.pixels.foreach_set(np.asarray(colors, dtype=np.float32).ravel())
+        # Empaquetada como PNG para que el FBX la incruste
+        image.filepath_raw = f"//{material.name}.png"
+        image.file_format = 'PNG'
+        image.pack()
+
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    bsdf = nodes.get("Principled BSDF")
+    tex = nodes.new("ShaderNodeTexImage")
+    tex.image = image
+    tex.interpolation = 'Closest'
+    mat.node_tree.links.new(tex.outputs["Color"], bsdf.inputs["Base Color"])
+
+def build_mesh(geometry, name):
+    """Datablock Mesh con los buffers de la Geometry (sin objeto)."""
+    verts, loops, sizes, uvs, mats = geometry.arrays()
+    loop_starts = np.zeros(len(sizes), dtype=np.int32)
+    np.cumsum(sizes[:-1], out=loop_starts[1:])
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.add(len(sizes))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        # A partir de 4.0 loop_total se deriva de loop_start (solo lectura)
+        mesh.polygons.foreach_set("loop_total", sizes)
+
+    for material in geometry.materials:
+        mesh.materials.append(get_material(material))
+    mesh.polygons.foreach_set("material_index", mats)
+
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_layer.data.foreach_set("uv", uvs)
+    mesh.update(calc_edges=True)
+    return mesh
+
+def upload(geometry, name=None, collection=None):
+    """
+    Crea el Mesh + Object y lo enlaza a la coleccion (por defecto la activa).
+    El nombre por defecto es geometry.name.
+    """
+    name = name or geometry.name
+    # Escribir la malla unica equivale al join de los generadores con bpy.ops
+    with phase("join"):
+        mesh = build_mesh(geometry, name)
+        obj = bpy.data.objects.new(name, mesh)
+        (collection or bpy.context.collection).objects.link(obj)
+
+        for o in bpy.context.selected_objects:
+            o.select_set(False)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+        return obj
+
+def upload_group(geometries, name, collection=None):
+    """
+    Sube varias Geometry como hijos de un Empty llamado name (export_objects
+    exporta el Empty con todos sus hijos).
+
+    Returns:
+        el Empty raíz
+    """
+    collection = collection or bpy.context.collection
+    root = bpy.data.objects.new(name, None)
+    collection.objects.link(root)
+    for geometry in geometries:
+        upload(geometry, collection=collection).parent = root
+
+    for o in bpy.context.selected_objects:
+        o.select_set(False)
+    root.select_set(True)
+    bpy.context.view_layer.objects.active = root
+    return root
+
+def upload_lods(geometries, collection=None):
+    """
+    Sube una cadena de LOD (lod.chain). Con un solo nivel equivale a upload;
+    con varios, los objetos {nombre}_LODn cuelgan de un Empty con el nombre
+    base, del que Unity crea el LODGroup.
+
+    Returns:
+        el objeto raíz (malla o Empty)
+    """
+    if len(geometries) == 1:
+        return upload(geometries[0], collection=collection)
+    return upload_group(geometries, geometries[0].name.rsplit("_LOD", 1)[0], collection=collection)
+
+def upload_instanced(shapes, placements, name, collection=None):
+    """
+    Un objeto por pieza bajo un Empty llamado name; las piezas con la misma
+    forma enlazan el mismo Mesh (PartList.instances), así que el FBX guarda
+    cada forma una sola vez.
+
+    Returns:
+        el Empty raíz
+    """
+    collection = collection or bpy.context.collection
+    with phase("join"):
+        meshes = [build_mesh(shape, shape.name) for shape in shapes]
+        root = bpy.data.objects.new(name, None)
+        collection.objects.link(root)
+        for shape_index, part_name, location in placements:
+            obj = bpy.data.objects.new(part_name, meshes[shape_index])
+            obj.location = location
+            obj.parent = root
+            collection.objects.link(obj)
+
+        for o in bpy.context.selected_objects:
+            o.select_set(False)
+        root.select_set(True)
+        bpy.context.view_layer.objects.active = root
+        return root
+
+def get_armature(skeleton):
+    """
+    Armature de bpy de un rig.Skeleton, creada una sola vez por nombre. Con
+    use_fake_user sobrevive a scene_manager.clear aunque se borren todos los
+    objetos que la usan, así el siguiente personaje no reconstruye huesos.
+    """
+    armature = bpy.data.armatures.get(skeleton.name)
+    if armature is not None:
+        return armature
+
+    with phase("rig"):
+        armature = bpy.data.armatures.new(skeleton.name)
+        armature.use_fake_user = True
+        # edit_bones solo existe en modo edición: objeto temporal para entrar
+        tmp = bpy.data.objects.new(skeleton.name, armature)
+        bpy.context.scene.collection.objects.link(tmp)
+        bpy.context.view_layer.objects.active = tmp
+        bpy.ops.object.mode_set(mode='EDIT')
+        for name, parent, head, tail in skeleton.bones:
+            bone = armature.edit_bones.new(name)
+            bone.head = head
+            bone.tail = tail
+            if parent:
+                bone.parent = armature.edit_bones[parent]
+        bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.data.objects.remove(tmp)
+    return armature
+
+def upload_skinned(geometries, skeleton, weights, scale=1.0, collection=None):
+    """
+    Sube una cadena de LOD atada al rig compartido: un objeto Armature (con
+    la armature cacheada de get_armature) escalado a la altura del personaje
+    y, como hijos, las mallas con un grupo de vértices por hueso (peso 1) y
+    modificador Armature.
+
+    Args:
+        geometries: niveles de lod.chain (uno o varios)
+        skeleton: rig.Skeleton
+        weights: por nivel, índice de hueso de cada vértice (rig.vertex_bones)
+        scale: altura del personaje / skeleton.height
+
+    Returns:
+        el objeto Armature raíz
+    """
+    collection = collection or bpy.context.collection
+    base = geometries[0].name.rsplit("_LOD", 1)[0]
+    names = skeleton.bone_names()
+    armature = get_armature(skeleton)
+
+    with phase("join"):
+        root = bpy.data.objects.new(base, armature)
+        root.scale = (scale, scale, scale)
+        collection.objects.link(root)
+
+        for geometry, bones in zip(geometries, weights):
+            mesh_name = geometry.name if len(geometries) > 1 else f"{base}_Body"
+            mesh = build_mesh(geometry, mesh_name)
+            # Al espacio del rig canónico; la escala del root la devuelve a su tamaño
+            mesh.transform(Matrix.Scale(1.0 / scale, 4))
+            obj = bpy.data.objects.new(mesh_name, mesh)
+            obj.parent = root
+            collection.objects.link(obj)
+
+            for index in np.unique(bones):
+                group = obj.vertex_groups.new(name=names[index])
+                group.add(np.flatnonzero(bones == index).tolist(), 1.0, 'REPLACE')
+            obj.modifiers.new("Armature", 'ARMATURE').object = root
+
+        for o in bpy.context.selected_objects:
+            o.select_set(False)
+        root.select_set(True)
+        bpy.context.view_layer.objects.active = root
+        return root
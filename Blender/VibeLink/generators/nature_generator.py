@@ -1,134 +1,158 @@
-import bpy
-import bmesh
 import random
 import math
-from mathutils import Vector, Matrix
 
-def create_material(name, color):
-    mat = bpy.data.materials.get(name)
-    if mat is None:
-        mat = bpy.data.materials.new(name=name)
-        mat.diffuse_color = color
-    return mat
+from .geometry import Geometry, Material, coherent_displace, cylinder, icosphere, jitter
+from .scatter import scatter_instances
+from . import lod
 
-def add_icosphere(location, radius, subdivisions, material, name="Part"):
-    bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=subdivisions, radius=radius, location=location)
-    obj = bpy.context.active_object
-    obj.name = name
-    if material:
-        obj.data.materials.append(material)
-    return obj
+def distort(verts, strength, rng, noise):
+    """'white': jitter por vértice; 'coherent': ruido de Perlin radial."""
+    if noise == "coherent":
+        return coherent_displace(verts, strength * 1.5, rng)
+    return jitter(verts, strength, rng)
 
-def add_cylinder(location, radius, depth, material, name="Part"):
-    bpy.ops.mesh.primitive_cylinder_add(radius=radius, depth=depth, location=location)
-    obj = bpy.context.active_object
-    obj.name = name
-    if material:
-        obj.data.materials.append(material)
-    return obj
-
-def distort_mesh(obj, strength=0.2):
-    """Mueve vertices aleatoriamente para dar look organico"""
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(obj.data)
-    
-    for v in bm.verts:
-        offset = Vector((
-            random.uniform(-1, 1),
-            random.uniform(-1, 1),
-            random.uniform(-1, 1)
-        ))
-        v.co += offset * strength
-        
-    bmesh.update_edit_mesh(obj.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-def generate_tree(params):
-    height = params.get("height", 4.0) + random.uniform(-0.5, 0.5)
+def generate_tree(params, rng):
+    height = params.get("height", 4.0) + rng.uniform(-0.5, 0.5)
     width = params.get("width", 1.5)
+    noise = params.get("noise", "white")
     
-    mat_trunk = create_material("Mat_F_Wood", (0.35, 0.25, 0.15, 1.0))
-    mat_leaves = create_material("Mat_F_Grass", (0.1, 0.6, 0.1, 1.0)) # Verde Bosque
+    mat_trunk = Material("Mat_F_Wood", (0.35, 0.25, 0.15, 1.0))
+    mat_leaves = Material("Mat_F_Grass", (0.1, 0.6, 0.1, 1.0)) # Verde Bosque
     
-    objects = []
+    geo = Geometry()
     
     # 1. Tronco (Cilindro Low Poly)
     trunk_h = height * 0.4
-    trunk = add_cylinder((0,0, trunk_h/2), width*0.3, trunk_h, mat_trunk, "Trunk")
-    distort_mesh(trunk, 0.05) # Leve distorsión
-    objects.append(trunk)
+    verts, faces = cylinder((0, 0, trunk_h/2), width*0.3, trunk_h)
+    geo.add_polygons(jitter(verts, 0.05, rng), faces, mat_trunk, "Trunk") # Leve distorsión
     
     # 2. Copa (Varias Icosferas)
-    num_blobs = random.randint(3, 5)
+    num_blobs = rng.randint(3, 5)
     for i in range(num_blobs):
         # Posición relativa a la copa
-        bx = random.uniform(-width/2, width/2)
-        by = random.uniform(-width/2, width/2)
-        bz = trunk_h + random.uniform(0, height - trunk_h)
+        bx = rng.uniform(-width/2, width/2)
+        by = rng.uniform(-width/2, width/2)
+        bz = trunk_h + rng.uniform(0, height - trunk_h)
         
         # Tamaño
-        br = random.uniform(width*0.4, width*0.8)
+        br = rng.uniform(width*0.4, width*0.8)
         
-        blob = add_icosphere((bx, by, bz), br, 1, mat_leaves, f"Leaves_{i}")
-        distort_mesh(blob, 0.15) # Más irregular
-        objects.append(blob)
+        verts, faces = icosphere((bx, by, bz), br, 1)
+        geo.add_polygons(distort(verts, 0.15, rng, noise), faces, mat_leaves, f"Leaves_{i}") # Más irregular
         
-    return objects
+    return geo
 
-def generate_rock(params):
+def generate_rock(params, rng):
     size = params.get("scale", 1.0)
-    mat_stone = create_material("Mat_F_Stone", (0.5, 0.5, 0.55, 1.0))
+    mat_stone = Material("Mat_F_Stone", (0.5, 0.5, 0.55, 1.0))
     
-    # Empezar con un cubo subdividido o Icosfera
     # Icosfera nivel 1 es buena base para rocas low poly
-    rock = add_icosphere((0,0,size/2), size/2, 1, mat_stone, "Rock_Base")
+    center = (0, 0, size/2)
+    verts, faces = icosphere((0, 0, 0), size/2, params.get("subdivisions", 1))
     
-    # Escalar aleatoriamente en ejes para que no sea redonda
-    rock.scale = (
-        random.uniform(0.8, 1.2),
-        random.uniform(0.8, 1.2),
-        random.uniform(0.6, 1.0) # Aplatada
-    )
-    bpy.ops.object.transform_apply(scale=True)
+    # Escalar aleatoriamente en ejes para que no sea redonda (escala sobre
+    # el centro de la roca, como obj.scale + transform_apply)
+    verts = verts * (
+        rng.uniform(0.8, 1.2),
+        rng.uniform(0.8, 1.2),
+        rng.uniform(0.6, 1.0) # Aplatada
+    ) + center
     
     # Distorsión fuerte (Voronoi stylistic)
-    distort_mesh(rock, strength=0.2 * size)
+    verts = distort(verts, 0.2 * size, rng, params.get("noise", "white"))
     
     # Decimate (opcional) para look más afilado? 
     # Mejor Shade Flat (ya es default)
     
-    return [rock] # Lista para mantener consistencia
+    geo = Geometry()
+    geo.add_polygons(verts, faces, mat_stone, "Rock_Base")
+    return geo
+
+def merge_canopy(geo):
+    """Paso de LOD: las icosferas Leaves_* -> un solo elipsoide sobre su caja."""
+    mask = geo.part_mask(("Leaves_",))
+    if not mask.any():
+        return geo
+    low, high = geo.bounds(mask)
+    material = geo.materials[geo.arrays()[4][mask.argmax()]]
+    verts, faces = icosphere((0, 0, 0), 0.5, 1)
+    out = geo.subset(~mask)
+    out.add_polygons(verts * (high - low) + (low + high) / 2, faces, material, "Leaves")
+    return out
 
-def generate(params):
+# Árbol: LOD1 tronco -> caja; LOD2 copa -> un elipsoide. Las rocas ya son una
+# sola icosfera: se quedan en un nivel.
+LOD_STEPS = {
+    "tree": [[lod.collapse("Trunk", ("Trunk",))], [merge_canopy]],
+    "rock": [],
+}
+
+def generate(params, collection=None):
     """
     Entry point.
-    Params: type="tree"|"rock", seed, height/scale
+    Params: type="tree"|"rock", seed, height/scale,
+            noise="white"|"coherent", subdivisions (rocas), lods
     """
+    # bpy solo para subir la malla: build_geometry funciona sin Blender
+    from . import mesh_builder
+    return mesh_builder.upload_lods(build_lods(params), collection=collection)
+
+def build_lods(params):
+    """LOD0..n del árbol o la roca ('lods' niveles, ver LOD_STEPS)."""
+    steps = LOD_STEPS.get(params.get("type", "tree"), [])
+    return lod.chain(build_geometry(params), lod.lod_count(params), steps)
+
+def build_geometry(params):
+    """Árbol o roca como una Geometry (sin bpy)."""
     seed = params.get("seed", 12345)
-    random.seed(seed)
+    # RNG propio por trabajo: el resultado no depende de otros hilos ni del orden
+    rng = random.Random(seed)
     
     gen_type = params.get("type", "tree") # default tree
     
-    created_objects = []
-    
+    if gen_type == "scatter":
+        raise ValueError("type 'scatter' produces instances, use build_scatter")
     if gen_type == "rock":
-        created_objects = generate_rock(params)
+        geo = generate_rock(params, rng)
     else:
-        created_objects = generate_tree(params)
-        
-    # Unir
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in created_objects:
-        obj.select_set(True)
+        geo = generate_tree(params, rng)
     
-    bpy.context.view_layer.objects.active = created_objects[0]
-    bpy.ops.object.join()
-    
-    final_obj = bpy.context.active_object
-    final_obj.name = f"{gen_type.capitalize()}_{seed}"
-    
-    # Reset Origin
-    bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN') 
-    
-    return final_obj
+    # Las piezas ya forman una sola malla en coordenadas absolutas
+    # (equivale a join + origin_set(ORIGIN_CURSOR))
+    geo.name = f"{gen_type.capitalize()}_{seed}"
+    return geo
+
+def build_scatter(params):
+    """
+    Bosque / pedregal: pocas variantes únicas + miles de instancias.
+    Params: seed, width/depth (m, área centrada en el origen), density
+            (instancias por m²), trees/rocks (nº de variantes), rock_ratio,
+            min_distance, noise
+    Sin ninguna variante (trees y rocks a 0) o con un número negativo: ValueError.
+
+    Returns:
+        (variants, instances): lista de Geometry y array scatter.INSTANCE_DTYPE
+    """
+    seed = params.get("seed", 12345)
+    rng = random.Random(seed)
+    tree_count = params.get("trees", 4)
+    rock_count = params.get("rocks", 3)
+    if tree_count < 0 or rock_count < 0 or tree_count + rock_count == 0:
+        raise ValueError(f"Scatter needs at least one variant ('trees': {tree_count}, 'rocks': {rock_count})")
+    rock_ratio = params.get("rock_ratio", 0.3) if tree_count and rock_count else (1.0 if rock_count else 0.0)
+
+    # Variantes = assets normales con seeds derivadas (mismas que un generate_nature suelto)
+    variants, weights = [], []
+    for kind, count, share in (("tree", tree_count, 1.0 - rock_ratio), ("rock", rock_count, rock_ratio)):
+        for i in range(count):
+            variant_params = {"type": kind, "seed": seed * 1000 + len(variants), "noise": params.get("noise", "white")}
+            if kind == "rock":
+                variant_params["scale"] = rng.uniform(0.6, 1.4)
+            variants.append(build_geometry(variant_params))
+            weights.append(share / count)
+
+    instances = scatter_instances(
+        params.get("width", 50.0), params.get("depth", 50.0), params.get("density", 0.05),
+        weights, rng, min_distance=params.get("min_distance"),
+    )
+    return variants, instances
@@ -0,0 +1,47 @@
+"""
+phases.py - Marcas de fase de los generadores (sin bpy)
+Aquí y no en profiling.py para que los generadores sigan importándose
+sueltos (golden.py, benchmark --geometry). profiling.py lo reexporta.
+
+    with phase("layout"):
+        ...
+
+Sin un Profile activo en el hilo phase() no mide nada.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Profile activo por hilo: los builds en otros hilos no se mezclan con el del Main Thread
+_local = threading.local()
+
+class Profile:
+    """Acumula segundos por fase mientras está activo (with Profile() as p)."""
+
+    def __init__(self):
+        self.phases = {}
+        self._previous = None
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def __enter__(self):
+        self._previous = getattr(_local, "active", None)
+        _local.active = self
+        return self
+
+    def __exit__(self, *exc):
+        _local.active = self._previous
+        return False
+
+@contextmanager
+def phase(name):
+    profile = getattr(_local, "active", None)
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
@@ -0,0 +1,49 @@
+"""
+rig.py - Esqueletos compartidos y pesos rígidos (sin bpy)
+Un Skeleton es la definición canónica de un rig: huesos con padre, cabeza
+y cola en coordenadas Blender, a la altura de referencia `height`. Los
+personajes del mismo tipo comparten uno (mesh_builder.get_armature lo crea
+una vez por nombre) y cada uno solo añade su malla escalada a esa altura.
+
+Los pesos son rígidos: cada pieza (Geometry.parts) va entera a un hueso,
+así que basta un grupo de vértices por hueso con peso 1.
+"""
+import numpy as np
+
+class Skeleton:
+    """Huesos [(nombre, padre, cabeza, cola)], padres antes que hijos."""
+
+    def __init__(self, name, height, bones):
+        self.name = name
+        self.height = height
+        self.bones = bones
+
+    def bone_names(self):
+        return [bone[0] for bone in self.bones]
+
+def vertex_bones(geometry, skeleton, part_bones, default=0):
+    """
+    Hueso de cada vértice según la pieza a la que pertenece.
+
+    Args:
+        geometry: Geometry con sus piezas (parts)
+        skeleton: Skeleton al que se ata la malla
+        part_bones: [(prefijos de pieza, nombre de hueso), ...]; gana el primero que encaja
+        default: índice del hueso de las piezas que no encajan con ningún prefijo
+
+    Returns:
+        array (vertex_count,) con el índice (en skeleton.bones) del hueso de cada vértice
+    """
+    _, loops, sizes, _, _ = geometry.arrays()
+    names = skeleton.bone_names()
+    face_bones = np.full(geometry.face_count, default, dtype=np.int32)
+    assigned = np.zeros(geometry.face_count, dtype=bool)
+    for prefixes, bone in part_bones:
+        mask = geometry.part_mask(prefixes) & ~assigned
+        face_bones[mask] = names.index(bone)
+        assigned |= mask
+
+    # Las piezas no comparten vértices: el hueso de cualquier cara del vértice vale
+    bones = np.full(geometry.vertex_count, default, dtype=np.int32)
+    bones[loops] = np.repeat(face_bones, sizes)
+    return bones
@@ -0,0 +1,106 @@
+"""
+scatter.py - Distribución de instancias (Poisson-disk sobre rejilla, sin bpy)
+Un scatter no hornea miles de mallas: unas pocas variantes + un buffer de
+instancias (variante, posición, giro, escala) que Unity dibuja con GPU
+instancing (VibeScatter).
+"""
+import math
+
+import numpy as np
+
+# Registro por instancia (coordenadas Blender, yaw en radianes sobre Z)
+INSTANCE_DTYPE = np.dtype([
+    ("variant", np.uint32),
+    ("position", np.float32, 3),
+    ("yaw", np.float32),
+    ("scale", np.float32),
+])
+
+# Vecindario de 5 x 5 celdas: con celda = r / sqrt(2) cubre la distancia r
+_NEIGHBOURS = np.array([(i, j) for i in range(-2, 3) for j in range(-2, 3)], dtype=np.int64)
+
+def poisson_disk(width, depth, radius, rng, max_rounds=30, min_gain=0.01):
+    """
+    Muestreo Poisson-disk en [0, width] x [0, depth] (dart throwing en paralelo
+    sobre una rejilla).
+
+    Celdas de lado r / sqrt(2): como mucho un punto por celda y basta mirar
+    las 5 x 5 vecinas. Dos celdas separadas 3 o más no pueden chocar, así
+    que en cada fase se lanza a la vez un candidato en todas las celdas
+    vacías de una misma clase (i % 3, j % 3), comprobado con NumPy contra la
+    rejilla. Cada ronda recorre las 9 clases; se para cuando una ronda añade
+    menos de min_gain de los puntos que ya hay (el área está casi saturada).
+
+    Args:
+        rng: np.random.Generator
+
+    Returns:
+        (N, 2) puntos separados al menos radius entre sí
+    """
+    cell = radius / math.sqrt(2)
+    cols, rows = max(1, math.ceil(width / cell)), max(1, math.ceil(depth / cell))
+    # Coordenadas por celda (NaN = vacía), con 2 celdas de margen
+    grid = np.full((cols + 4, rows + 4, 2), np.nan)
+    r2 = radius * radius
+
+    ci, cj = np.meshgrid(np.arange(cols), np.arange(rows), indexing="ij")
+    ci, cj = ci.ravel(), cj.ravel()
+    phases = [(ci[sel], cj[sel]) for sel in ((ci % 3 == a) & (cj % 3 == b) for a in range(3) for b in range(3))]
+
+    total = 0
+    for _ in range(max_rounds):
+        added = 0
+        for pi, pj in phases:
+            empty = np.isnan(grid[pi + 2, pj + 2, 0])
+            pi, pj = pi[empty], pj[empty]
+            cand = (np.stack([pi, pj], axis=1) + rng.random((len(pi), 2))) * cell
+            inside = (cand[:, 0] < width) & (cand[:, 1] < depth)
+            pi, pj, cand = pi[inside], pj[inside], cand[inside]
+
+            near = grid[pi[:, None] + 2 + _NEIGHBOURS[:, 0], pj[:, None] + 2 + _NEIGHBOURS[:, 1]]
+            gaps = ((near - cand[:, None, :]) ** 2).sum(axis=2)
+            ok = ~np.any(gaps < r2, axis=1)   # NaN (vacía) nunca es < r2
+            grid[pi[ok] + 2, pj[ok] + 2] = cand[ok]
+            added += int(ok.sum())
+        total += added
+        if added < min_gain * total:
+            break
+
+    points = grid[2:-2, 2:-2].reshape(-1, 2)
+    return points[~np.isnan(points[:, 0])]
+
+def scatter_instances(width, depth, density, weights, rng, scale_range=(0.8, 1.2), min_distance=None):
+    """
+    Instancias sobre un área centrada en el origen.
+
+    Args:
+        density: instancias por m² (límite superior; Poisson-disk no llena más)
+        weights: peso de cada variante (se elige una por instancia)
+        rng: random.Random del trabajo (siembra el generador NumPy)
+        min_distance: separación mínima; por defecto se deriva de density
+
+    Returns:
+        array INSTANCE_DTYPE
+    """
+    target = int(round(width * depth * density))
+    if target <= 0:
+        return np.zeros(0, dtype=INSTANCE_DTYPE)
+    # El muestreo llega a ~0.63 / r² puntos por m²; sobra un poco y se recorta
+    radius = min_distance or 0.7 / math.sqrt(density)
+    generator = np.random.default_rng(rng.getrandbits(64))
+    points = poisson_disk(width, depth, radius, generator)
+
+    if len(points) > target:
+        points = points[np.sort(generator.permutation(len(points))[:target])]
+    n = len(points)
+
+    probabilities = np.asarray(weights, dtype=np.float64)
+    picks = generator.choice(len(weights), size=n, p=probabilities / probabilities.sum())
+
+    instances = np.zeros(n, dtype=INSTANCE_DTYPE)
+    instances["variant"] = picks
+    instances["position"][:, 0] = points[:, 0] - width / 2
+    instances["position"][:, 1] = points[:, 1] - depth / 2
+    instances["yaw"] = generator.uniform(0.0, 2 * math.pi, n)
+    instances["scale"] = generator.uniform(*scale_range, n)
+    return instances
@@ -0,0 +1,248 @@
+"""
+settlement_generator.py - Pueblo completo en un solo trabajo (sin bpy)
+N casas de niveles mezclados a lo largo de una calle ("road") o en una
+cuadrícula de manzanas ("grid"). Las parcelas se buscan con un índice
+espacial de huellas (casas y calzadas) y la geometría estática se funde por
+chunks de chunk_size metros: un objeto por chunk, listo para streaming, en
+lugar de un FBX por casa. Los materiales Mat_F_* son los de las casas, así
+que todo el pueblo comparte los mismos.
+"""
+import math
+import random
+
+from .geometry import Geometry, Material
+from . import house_generator
+from .phases import phase
+
+MAT_ROAD = Material("Mat_F_Road", (0.45, 0.38, 0.28, 1.0))  # Tierra batida
+ROAD_HEIGHT = 0.05
+
+# Reparto de niveles por defecto: muchas casas bajas, pocas torres
+LEVEL_WEIGHTS = (5, 4, 3, 2, 1)
+
+# Si alguna casa no encuentra parcela, se repite el reparto (misma seed)
+# con una calle más larga o una fila de manzanas más, hasta MAX_GROW veces
+MAX_GROW = 8
+
+class FootprintIndex:
+    """Hash espacial de rectángulos (x0, y0, x1, y1) en celdas de cell metros."""
+
+    def __init__(self, cell=8.0):
+        self.cell = cell
+        self.cells = {}
+
+    def _keys(self, rect):
+        x0, y0, x1, y1 = rect
+        for i in range(math.floor(x0 / self.cell), math.floor(x1 / self.cell) + 1):
+            for j in range(math.floor(y0 / self.cell), math.floor(y1 / self.cell) + 1):
+                yield i, j
+
+    def insert(self, rect):
+        for key in self._keys(rect):
+            self.cells.setdefault(key, []).append(rect)
+
+    def hits(self, rect):
+        """True si rect se solapa con algún rectángulo ya insertado."""
+        x0, y0, x1, y1 = rect
+        for key in self._keys(rect):
+            for a0, b0, a1, b1 in self.cells.get(key, ()):
+                if x0 < a1 and a0 < x1 and y0 < b1 and b0 < y1:
+                    return True
+        return False
+
+def road_layout(count, road_width, lot):
+    """Una calle recta sobre el eje X, con casas a ambos lados."""
+    length = max(lot, math.ceil(count / 2) * lot)
+    return [(-length / 2, -road_width / 2, length / 2, road_width / 2)]
+
+def grid_layout(count, road_width, block, extra=0):
+    """
+    Manzanas de block x block metros separadas por calles (cuadrícula centrada),
+    con extra manzanas más por lado de las que tocan.
+    """
+    # ~8 parcelas por manzana (2 por lado)
+    blocks = max(1, math.ceil(math.sqrt(count / 8))) + extra
+    pitch = block + road_width
+    extent = blocks * pitch + road_width
+    half = extent / 2
+    lines = [-half + k * pitch for k in range(blocks + 1)]
+    # Calles en X de lado a lado; las de Y solo entre ellas (sin cruces solapados)
+    roads = [(-half, y, half, y + road_width) for y in lines]
+    for x in lines:
+        for y0, y1 in zip(lines, lines[1:]):
+            roads.append((x, y0 + road_width, x + road_width, y1))
+    return roads
+
+def frontages(roads):
+    """
+    Lados edificables de cada calle: (rect, eje, normal, yaw). La fachada de
+    una casa (Y negativo en house_generator) mira a la calle.
+    """
+    sides = []
+    for rect in roads:
+        x0, y0, x1, y1 = rect
+        if x1 - x0 >= y1 - y0:
+            sides.append((rect, 0, (0, 1), 0.0))
+            sides.append((rect, 0, (0, -1), math.pi))
+        else:
+            sides.append((rect, 1, (1, 0), -math.pi / 2))
+            sides.append((rect, 1, (-1, 0), math.pi / 2))
+    return sides
+
+def clip_to_chunks(rect, size):
+    """Trozos de rect recortados a la rejilla de chunks: [((i, j), rect), ...]."""
+    x0, y0, x1, y1 = rect
+    pieces = []
+    for i in range(math.floor(x0 / size), math.ceil(x1 / size)):
+        for j in range(math.floor(y0 / size), math.ceil(y1 / size)):
+            piece = (max(x0, i * size), max(y0, j * size), min(x1, (i + 1) * size), min(y1, (j + 1) * size))
+            if piece[2] > piece[0] and piece[3] > piece[1]:
+                pieces.append(((i, j), piece))
+    return pieces
+
+def build_layout(params):
+    """
+    Calles y parcelas del pueblo.
+    Params: seed, houses (N), layout="road"|"grid", max_level, road_width,
+            block (grid), gap (separación mínima entre casas), attempts
+
+    Si una casa no cabe tras attempts intentos, el reparto entero se repite
+    con más calle (ver MAX_GROW); si ni así caben todas, ValueError.
+
+    Returns:
+        (roads, houses): rectángulos de calzada y [(house_params, (x, y), yaw, geo), ...]
+        con geo = la casa ya girada (sin trasladar a (x, y)); len(houses) == houses pedidas
+    """
+    count = params.get("houses", 20)
+    # Las casas (niveles y geometría) se sortean una vez, con su propio rng:
+    # los reintentos solo cambian dónde caen, no qué casa es cada una
+    town = build_houses(params)
+    for grow in range(MAX_GROW + 1):
+        roads, houses = place_houses(params, grow, town)
+        if len(houses) == count:
+            return roads, houses
+    raise ValueError(f"Settlement: only {len(houses)}/{count} houses fit; "
+                     f"raise 'lot' / 'block' or lower 'gap'")
+
+def build_houses(params):
+    """
+    Casas del pueblo, en orden: [(house_params, geo), ...] con el nivel
+    sorteado según LEVEL_WEIGHTS (hasta max_level).
+    """
+    seed = params.get("seed", 12345)
+    rng = random.Random(seed)
+    weights = LEVEL_WEIGHTS[:max(1, min(5, params.get("max_level", 5)))]
+    town = []
+    for k in range(params.get("houses", 20)):
+        level = rng.choices(range(1, len(weights) + 1), weights)[0]
+        house_params = {"level": level, "width": 4 + level, "depth": 4 + level, "seed": seed * 1000 + k}
+        town.append((house_params, house_generator.build_geometry(house_params)))
+    return town
+
+def place_houses(params, grow, town):
+    """
+    Un intento de build_layout con la calle alargada un 25% por grow (road)
+    o grow manzanas más por lado (grid). Se detiene en la primera casa de
+    town (ver build_houses) que no cabe.
+    """
+    seed = params.get("seed", 12345)
+    # rng de parcelas aparte del de niveles (mismo sorteo en cada intento)
+    rng = random.Random(f"{seed}/lots")
+    count = len(town)
+    road_width = params.get("road_width", 4.0)
+    gap = params.get("gap", 1.5)
+    attempts = params.get("attempts", 40)
+
+    if params.get("layout", "road") == "grid":
+        roads = grid_layout(count, road_width, params.get("block", 30.0), grow)
+    else:
+        roads = road_layout(count, road_width, params.get("lot", 14.0) * (1 + 0.25 * grow))
+    sides = frontages(roads)
+
+    index = FootprintIndex()
+    for rect in roads:
+        index.insert(rect)
+
+    houses = []
+    for house_params, house in town:
+        rotated = {}
+        for _ in range(attempts):
+            rect, axis, normal, yaw = rng.choice(sides)
+            if yaw not in rotated:
+                placed = house.placed((0.0, 0.0, 0.0), yaw)
+                rotated[yaw] = placed, *placed.bounds()
+            placed, low, high = rotated[yaw]
+            # Desde la acera: el borde de la casa más cercano a la calle a setback metros
+            setback = rng.uniform(1.0, 3.0)
+            along = rng.uniform(rect[axis], rect[axis + 2])
+            edge = rect[2 + (1 - axis)] if normal[1 - axis] > 0 else rect[1 - axis]
+            near = low[1 - axis] if normal[1 - axis] > 0 else high[1 - axis]
+            origin = [0.0, 0.0]
+            origin[axis] = along
+            origin[1 - axis] = edge + normal[1 - axis] * setback - near
+
+            footprint = (origin[0] + low[0] - gap / 2, origin[1] + low[1] - gap / 2,
+                         origin[0] + high[0] + gap / 2, origin[1] + high[1] + gap / 2)
+            if not index.hits(footprint):
+                index.insert(footprint)
+                houses.append((house_params, (origin[0], origin[1]), yaw, placed))
+                break
+        else:
+            break
+    return roads, houses
+
+def build_chunks(params):
+    """
+    Pueblo como una Geometry por chunk (chunk_size metros, casas asignadas
+    por su origen, calzadas recortadas a la rejilla).
+
+    Returns:
+        lista de Geometry llamadas Settlement_{seed}_C{i}_{j}, en orden estable
+    """
+    seed = params.get("seed", 12345)
+    size = params.get("chunk_size", 32.0)
+    # Nombres propios: dentro de build_layout cada casa marca sus fases layout / geometry
+    with phase("town_layout"):
+        roads, houses = build_layout(params)
+
+    chunks = {}
+    def chunk(key):
+        if key not in chunks:
+            chunks[key] = Geometry()
+        return chunks[key]
+
+    with phase("chunks"):
+        for rect in roads:
+            for key, (x0, y0, x1, y1) in clip_to_chunks(rect, size):
+                chunk(key).add_box(((x0 + x1) / 2, (y0 + y1) / 2, ROAD_HEIGHT / 2),
+                                   (x1 - x0, y1 - y0, ROAD_HEIGHT), MAT_ROAD, "Road")
+        for _, (x, y), _, placed in houses:
+            key = (math.floor(x / size), math.floor(y / size))
+            chunk(key).join(placed.placed((x, y, 0.0)))
+
+    # Índices desde 0 (sin negativos en los nombres)
+    min_i = min(i for i, _ in chunks)
+    min_j = min(j for _, j in chunks)
+    out = []
+    for (i, j) in sorted(chunks):
+        geo = chunks[(i, j)]
+        geo.name = f"Settlement_{seed}_C{i - min_i}_{j - min_j}"
+        out.append(geo)
+    return out
+
+def build_geometry(params):
+    """Pueblo entero en una sola Geometry (golden.py, "format": "vmesh")."""
+    town = Geometry(f"Settlement_{params.get('seed', 12345)}")
+    for geo in build_chunks(params):
+        town.join(geo)
+    return town
+
+def generate(params, collection=None):
+    """
+    Entry point: un objeto por chunk bajo un Empty Settlement_{seed}.
+    Params: ver build_layout + chunk_size
+    """
+    # bpy solo para subir las mallas: build_chunks funciona sin Blender
+    from . import mesh_builder
+    chunks = build_chunks(params)
+    return mesh_builder.upload_group(chunks, f"Settlement_{params.get('seed', 12345)}", collection=collection)
@@ -0,0 +1,89 @@
+"""
+golden.py - Digests de referencia seed -> malla (sin Blender)
+
+    python golden.py               # comprueba contra golden_hashes.json
+    python golden.py --update      # regenera golden_hashes.json
+
+Para cada caso de benchmark.case_matrix() calcula Geometry.digest() de
+build_geometry y lo compara con el fichero. Después repite toda la matriz
+en varios hilos y en orden aleatorio: los digests tienen que coincidir, es
+decir, ningún generador depende de estado global (random.seed, etc).
+
+Un cambio intencionado en un generador se confirma con --update y el diff
+de golden_hashes.json va en el mismo commit.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_hashes.json")
+
+def case_digests(cases, builders):
+    return {case_id: builders[cmd](params).digest() for case_id, cmd, params in cases}
+
+def interleaved_digests(cases, builders, threads=8, rounds=4):
+    """Misma matriz repartida en hilos y barajada; {id: set(digests)}."""
+    jobs = [case for _ in range(rounds) for case in cases]
+    random.Random(0).shuffle(jobs)
+
+    def build(case):
+        case_id, cmd, params = case
+        return case_id, builders[cmd](params).digest()
+
+    seen = {}
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for case_id, digest in pool.map(build, jobs):
+            seen.setdefault(case_id, set()).add(digest)
+    return seen
+
+def main():
+    parser = argparse.ArgumentParser(prog="golden.py")
+    parser.add_argument("--update", action="store_true", help="reescribe golden_hashes.json")
+    parser.add_argument("--path", default=GOLDEN_PATH)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from benchmark import case_matrix
+    from generators import house_generator, nature_generator, humanoid_generator, settlement_generator
+    builders = {
+        "generate_house": house_generator.build_geometry,
+        "generate_nature": nature_generator.build_geometry,
+        "generate_humanoid": humanoid_generator.build_geometry,
+        "generate_settlement": settlement_generator.build_geometry,
+    }
+
+    cases = case_matrix()
+    digests = case_digests(cases, builders)
+
+    if args.update:
+        with open(args.path, "w", encoding="utf-8") as f:
+            json.dump(digests, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"[VibeLink] {len(digests)} golden digests written to {args.path}")
+        return 0
+
+    with open(args.path, encoding="utf-8") as f:
+        golden = json.load(f)
+
+    failures = []
+    for case_id, digest in digests.items():
+        expected = golden.get(case_id)
+        if expected is None:
+            failures.append(f"{case_id}: no golden digest (run --update)")
+        elif digest != expected:
+            failures.append(f"{case_id}: {digest} != golden {expected}")
+
+    for case_id, seen in interleaved_digests(cases, builders).items():
+        if seen != {digests[case_id]}:
+            failures.append(f"{case_id}: not deterministic under threads/reordering ({len(seen)} digests)")
+
+    for failure in failures:
+        print(f"[VibeLink] FAIL {failure}")
+    print(f"[VibeLink] {len(cases) - len({f.split(':')[0] for f in failures})}/{len(cases)} cases match")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+job_queue.py - Cola de trabajos entre la red y el Main Thread (sin bpy)
+Sustituye al queue.Queue FIFO de execution_queue con la misma API para
+MainThreadDispatcher (put / get_nowait / qsize / empty) y además:
+
+- Dos clases de prioridad: "interactive" (por defecto) antes que "bulk"
+  (generate_batch, o "priority": "bulk" en el mensaje).
+- Coalescing: un comando idéntico a otro aún pendiente (mismos cmd/params,
+  sin contar id ni priority) no se encola otra vez; el trabajo pendiente
+  responde también a su id (data["coalesced"], ver server.reply_to). Si el
+  nuevo es de más prioridad (interactive sobre un bulk), el pendiente pasa
+  al final de la cola interactive para no esperar detrás de los bulk.
+- cancel(ids): quita trabajos pendientes (los que ya corren no se paran).
+- Backpressure: como mucho LIMITS[clase] trabajos pendientes por clase; el
+  resto se rechaza y UnityClient contesta error "queue full".
+- Journal opcional (JSON lines): lo encolado y no empezado se recupera al
+  abrirlo tras un cierre o crash. Lo que estaba ejecutándose no se repite
+  (si tumbó Blender, volvería a tumbarlo); Unity lo reencola al desconectar.
+"""
+import collections
+import itertools
+import json
+import os
+import queue
+import threading
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITIES = {"interactive": INTERACTIVE, "bulk": BULK}
+PRIORITY_NAMES = {v: k for k, v in PRIORITIES.items()}
+LIMITS = {INTERACTIVE: 64, BULK: 1024}
+
+QUEUED = "queued"
+COALESCED = "coalesced"
+REJECTED = "rejected"
+
+def priority_of(data):
+    """Clase de prioridad del mensaje ("priority" explícito o por comando)."""
+    explicit = data.get("priority")
+    if explicit in PRIORITIES:
+        return PRIORITIES[explicit]
+    return BULK if data.get("cmd") == "generate_batch" else INTERACTIVE
+
+def coalesce_key(data):
+    """Identidad del trabajo: el mensaje sin id / priority / coalesced (None si no es un comando)."""
+    if "cmd" not in data:
+        return None
+    body = {k: v for k, v in data.items() if k not in ("id", "priority", "coalesced")}
+    return json.dumps(body, sort_keys=True, default=str)
+
+class Job:
+    __slots__ = ("seq", "data", "priority", "key", "ids", "enqueued_at", "cancelled")
+
+    def __init__(self, seq, data, priority, enqueued_at):
+        self.seq = seq
+        self.data = data
+        self.priority = priority
+        self.key = coalesce_key(data)
+        self.ids = [data["id"]] if "id" in data else []
+        self.enqueued_at = enqueued_at
+        self.cancelled = False
+
+class JobQueue:
+    """Cola con prioridad, coalescing, cancelación y journal; thread-safe."""
+
+    def __init__(self, limits=None):
+        self.limits = dict(limits or LIMITS)
+        self._lock = threading.Lock()
+        self._lanes = {p: collections.deque() for p in self.limits}
+        self._pending = {p: 0 for p in self.limits}
+        self._by_key = {}
+        self._by_id = {}
+        self._seq = itertools.count()
+        self._journal = None
+        self.journal_path = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.coalesced = 0
+        self.promoted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.recovered = 0
+
+    # --- API de queue.Queue (MainThreadDispatcher) ---
+
+    def put(self, item):
+        """
+        Encola (enqueued_at, data).
+
+        Returns:
+            QUEUED, COALESCED (se une a un trabajo idéntico pendiente) o REJECTED (cola llena)
+        """
+        enqueued_at, data = item
+        with self._lock:
+            key = coalesce_key(data)
+            twin = self._by_key.get(key) if key is not None else None
+            if twin is not None:
+                priority = priority_of(data)
+                if priority < twin.priority:
+                    if self._pending[priority] >= self.limits[priority]:
+                        self.rejected += 1
+                        return REJECTED
+                    self._promote(twin, priority)
+                job_id = data.get("id")
+                if job_id is not None and job_id not in twin.ids:
+                    twin.ids.append(job_id)
+                    self._by_id[job_id] = twin
+                    self._write({"op": "coalesce", "seq": twin.seq, "id": job_id})
+                self.coalesced += 1
+                return COALESCED
+
+            priority = priority_of(data)
+            if self._pending[priority] >= self.limits[priority]:
+                self.rejected += 1
+                return REJECTED
+
+            job = Job(next(self._seq), data, priority, enqueued_at)
+            self._add(job)
+            self._write({"op": "put", "seq": job.seq, "data": data})
+            return QUEUED
+
+    def get_nowait(self):
+        """Siguiente trabajo (interactive antes que bulk): (enqueued_at, data)."""
+        with self._lock:
+            for priority in sorted(self._lanes):
+                lane = self._lanes[priority]
+                while lane:
+                    job = lane.popleft()
+                    if job.cancelled:
+                        continue
+                    self._forget(job)
+                    self._write({"op": "take", "seq": job.seq})
+                    if not any(self._pending.values()):
+                        self._compact()
+                    return job.enqueued_at, self._message(job)
+            raise queue.Empty
+
+    def qsize(self):
+        with self._lock:
+            return sum(self._pending.values())
+
+    def empty(self):
+        return self.qsize() == 0
+
+    # --- Extras ---
+
+    def cancel(self, ids):
+        """
+        Cancela trabajos pendientes por id. Un trabajo coalescido solo se
+        cancela cuando no le queda ningún id que atender.
+
+        Returns:
+            lista de ids cancelados (los desconocidos o ya empezados no están)
+        """
+        cancelled = []
+        with self._lock:
+            for job_id in ids:
+                job = self._by_id.pop(job_id, None)
+                if job is None:
+                    continue
+                job.ids.remove(job_id)
+                cancelled.append(job_id)
+                self._write({"op": "cancel", "seq": job.seq, "id": job_id})
+                if not job.ids:
+                    job.cancelled = True
+                    self._forget(job)
+            self.cancelled += len(cancelled)
+        return cancelled
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interactive": self._pending[INTERACTIVE],
+                "bulk": self._pending[BULK],
+                "coalesced": self.coalesced,
+                "promoted": self.promoted,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "recovered": self.recovered,
+                "journal": self.journal_path,
+            }
+
+    # --- Journal ---
+
+    def open_journal(self, path, now=0.0):
+        """
+        Activa el journal en path. Si ya existe, recupera lo que quedó
+        encolado sin empezar y lo vuelve a encolar.
+
+        Returns:
+            número de trabajos recuperados
+        """
+        pending = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Última línea a medias (crash escribiendo)
+                    op, seq = entry.get("op"), entry.get("seq")
+                    if op == "put":
+                        pending[seq] = entry["data"]
+                    elif op == "take":
+                        pending.pop(seq, None)
+                    elif op == "promote" and seq in pending:
+                        pending[seq]["priority"] = entry["priority"]
+                    elif op == "coalesce" and seq in pending:
+                        pending[seq].setdefault("coalesced", []).append(entry["id"])
+                    elif op == "cancel" and seq in pending:
+                        pending[seq] = self._without_id(pending[seq], entry["id"])
+                        if pending[seq] is None:
+                            pending.pop(seq)
+
+        with self._lock:
+            self.journal_path = path
+            for seq in sorted(pending):
+                data = dict(pending[seq])
+                extra = data.pop("coalesced", [])
+                job = Job(next(self._seq), data, priority_of(data), now)
+                job.ids += [i for i in extra if i not in job.ids]
+                self._add(job)
+            self.recovered += len(pending)
+            self._compact()
+        return len(pending)
+
+    def close_journal(self):
+        with self._lock:
+            if self._journal:
+                self._journal.close()
+            self._journal = None
+            self.journal_path = None
+
+    # --- Internos (con self._lock tomado) ---
+
+    def _add(self, job):
+        self._lanes[job.priority].append(job)
+        self._pending[job.priority] += 1
+        if job.key is not None:
+            self._by_key[job.key] = job
+        for job_id in job.ids:
+            self._by_id[job_id] = job
+
+    def _promote(self, job, priority):
+        """Pasa un trabajo pendiente al final de la cola de priority."""
+        self._lanes[job.priority].remove(job)
+        self._pending[job.priority] -= 1
+        job.priority = priority
+        # Explícita en el mensaje: así también se recupera del journal con esta prioridad
+        job.data = dict(job.data, priority=PRIORITY_NAMES[priority])
+        self._lanes[priority].append(job)
+        self._pending[priority] += 1
+        self.promoted += 1
+        self._write({"op": "promote", "seq": job.seq, "priority": PRIORITY_NAMES[priority]})
+
+    def _forget(self, job):
+        self._pending[job.priority] -= 1
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        for job_id in job.ids:
+            if self._by_id.get(job_id) is job:
+                del self._by_id[job_id]
+
+    def _message(self, job):
+        data = dict(job.data)
+        data.pop("id", None)
+        if job.ids:
+            data["id"] = job.ids[0]
+        if len(job.ids) > 1:
+            data["coalesced"] = job.ids[1:]
+        return data
+
+    @staticmethod
+    def _without_id(data, job_id):
+        """data sin job_id entre sus ids (None si se queda sin ninguno y tenía)."""
+        ids = ([data["id"]] if "id" in data else []) + data.get("coalesced", [])
+        if job_id not in ids:
+            return data
+        ids.remove(job_id)
+        if not ids:
+            return None
+        data = {k: v for k, v in data.items() if k not in ("id", "coalesced")}
+        data["id"] = ids[0]
+        if len(ids) > 1:
+            data["coalesced"] = ids[1:]
+        return data
+
+    def _write(self, entry):
+        if self._journal:
+            self._journal.write(json.dumps(entry, default=str) + "\n")
+            self._journal.flush()
+
+    def _compact(self):
+        """Reescribe el journal solo con lo pendiente (al vaciarse la cola o al abrirlo)."""
+        if self.journal_path is None:
+            return
+        if self._journal:
+            self._journal.close()
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for priority in sorted(self._lanes):
+                for job in self._lanes[priority]:
+                    if not job.cancelled:
+                        f.write(json.dumps({"op": "put", "seq": job.seq, "data": self._message(job)}, default=str) + "\n")
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
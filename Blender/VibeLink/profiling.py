@@ -0,0 +1,87 @@
+"""
+profiling.py - Medición de fases de generación
+Los generadores marcan sus fases con `with phase("join"):`; sin un Profile
+activo en el hilo (p.ej. build_geometry desde golden.py) phase() no mide nada.
+
+handle_message abre un Profile por trabajo y lo entrega a `tracer`, que
+guarda por fase un histograma en anillo (últimas RING_SIZE muestras,
+p50/p95/p99) y las últimas trazas completas: eso es lo que enseña el panel
+y lo que devuelve el comando "stats".
+"""
+import collections
+import threading
+
+import numpy as np
+
+# Profile y phase viven en generators/phases.py (los generadores no importan este módulo)
+from .generators.phases import Profile, phase
+
+RING_SIZE = 512
+RECENT_JOBS = 32
+
+class RingHistogram:
+    """Últimas size muestras en un array fijo; los percentiles se calculan al consultar."""
+
+    def __init__(self, size=RING_SIZE):
+        self.values = np.zeros(size)
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def summary(self):
+        """{count, p50, p95, p99, max} en ms (count = total histórico, no solo el anillo)."""
+        window = self.values[:min(self.count, len(self.values))].copy()
+        if not len(window):
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(window, (50, 95, 99)) * 1000
+        return {
+            "count": self.count,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(window.max()) * 1000, 3),
+        }
+
+class Tracer:
+    """Histogramas por fase + trazas recientes por trabajo."""
+
+    def __init__(self, ring_size=RING_SIZE, recent=RECENT_JOBS):
+        self.ring_size = ring_size
+        self.histograms = {}
+        self.jobs = collections.deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, RingHistogram(self.ring_size))
+        histogram.add(seconds)
+
+    def record_job(self, cmd, phases, total, **extra):
+        """Una traza: cada fase a su histograma (y a "{cmd}" el total del trabajo)."""
+        for name, seconds in phases.items():
+            self.observe(name, seconds)
+        self.observe(cmd, total)
+        trace = {"cmd": cmd, "total_ms": round(total * 1000, 2),
+                 "phases_ms": {k: round(v * 1000, 2) for k, v in phases.items()}}
+        trace.update(extra)
+        self.jobs.append(trace)
+
+    def summary(self):
+        with self._lock:
+            histograms = dict(self.histograms)
+        return {name: h.summary() for name, h in sorted(histograms.items())}
+
+    def recent(self, count=RECENT_JOBS):
+        # [-0:] sería la lista entera
+        return list(self.jobs)[-count:] if count > 0 else []
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+        self.jobs.clear()
+
+tracer = Tracer()
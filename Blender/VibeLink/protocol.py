@@ -0,0 +1,192 @@
+"""
+protocol.py - Frames WebSocket (RFC 6455) para UnityClient (asyncio)
+Sin dependencias de bpy: se puede usar y medir fuera de Blender.
+
+frame_buffers enmascara el payload de una vez (XOR de enteros o NumPy) y
+devuelve cabecera + payload por separado: UnityClient los pasa a
+StreamWriter.writelines sin reconstruir el frame.
+
+AsyncFrameReader lee frames de un asyncio.StreamReader; el buffer de
+recepción es el del propio StreamReader.
+
+Micro-benchmark de enmascarado:  python protocol.py
+"""
+import asyncio
+import os
+import struct
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+_U16 = struct.Struct(">H")
+_U64 = struct.Struct(">Q")
+
+# Por debajo de este tamaño el XOR de enteros es más rápido que NumPy
+NUMPY_MASK_THRESHOLD = 16 * 1024
+
+# ─────────────────────────────────────────────────────────────────
+#  ESCRITURA
+# ─────────────────────────────────────────────────────────────────
+def mask_payload(payload, mask_key):
+    """XOR del payload con la clave de 4 bytes, sobre todo el buffer a la vez."""
+    n = len(payload)
+    if n == 0:
+        return b""
+
+    if np is not None and n >= NUMPY_MASK_THRESHOLD:
+        words = n // 4
+        out = bytearray(n)
+        key32 = np.frombuffer(mask_key, dtype="<u4")[0]
+        out[:words * 4] = (np.frombuffer(payload, dtype="<u4", count=words) ^ key32).tobytes()
+        for i in range(words * 4, n):
+            out[i] = payload[i] ^ mask_key[i & 3]
+        return out
+
+    key = (mask_key * ((n + 3) // 4))[:n]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(key, "little")).to_bytes(n, "little")
+
+def mask_payload_loop(payload, mask_key):
+    """Implementación byte a byte (referencia para el benchmark)."""
+    masked = bytearray(len(payload))
+    for i in range(len(payload)):
+        masked[i] = payload[i] ^ mask_key[i % 4]
+    return masked
+
+def encode_header(opcode, length, mask_key=None):
+    """Cabecera de frame con FIN; con mask_key se marca el bit de máscara."""
+    mask_bit = 0x80 if mask_key else 0
+    if length <= 125:
+        header = bytes((0x80 | opcode, mask_bit | length))
+    elif length <= 0xFFFF:
+        header = bytes((0x80 | opcode, mask_bit | 126)) + _U16.pack(length)
+    else:
+        header = bytes((0x80 | opcode, mask_bit | 127)) + _U64.pack(length)
+    return header + mask_key if mask_key else header
+
+def frame_buffers(opcode, payload):
+    """[cabecera, payload enmascarado] de un frame cliente -> servidor."""
+    mask_key = os.urandom(4)
+    return [encode_header(opcode, len(payload), mask_key), mask_payload(payload, mask_key)]
+
+
+# ─────────────────────────────────────────────────────────────────
+#  LECTURA
+# ─────────────────────────────────────────────────────────────────
+class AsyncFrameReader:
+    """
+    Lector de mensajes WebSocket sobre un asyncio.StreamReader (el buffer lo
+    gestiona el StreamReader y readexactly resuelve las lecturas cortas).
+
+    - Reensambla mensajes fragmentados (frames de continuacion).
+    - Responde PING con PONG y CLOSE con CLOSE via send_control(opcode, payload),
+      que es una corrutina.
+    - Los control frames pueden llegar intercalados entre fragmentos.
+    """
+
+    def __init__(self, reader, send_control):
+        self.reader = reader
+        self.send_control = send_control
+
+    async def _read_frame(self):
+        """Returns: (fin, opcode, payload) con el payload ya desenmascarado."""
+        b1, b2 = await self.reader.readexactly(2)
+        fin = bool(b1 & 0x80)
+        opcode = b1 & 0x0F
+        length = b2 & 0x7F
+
+        if length == 126:
+            length = _U16.unpack(await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = _U64.unpack(await self.reader.readexactly(8))[0]
+
+        mask_key = await self.reader.readexactly(4) if b2 & 0x80 else None
+        payload = await self.reader.readexactly(length)
+        if mask_key:
+            payload = mask_payload(payload, mask_key)
+        return fin, opcode, payload
+
+    async def read_message(self):
+        """
+        Lee el siguiente mensaje de datos.
+
+        Returns:
+            (opcode, payload): str para OP_TEXT, bytes para OP_BINARY;
+            None si el servidor cerró la conexión
+        """
+        fragments = None
+        message_opcode = None
+
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except asyncio.IncompleteReadError:
+                raise ConnectionError("Socket closed by peer")
+
+            if opcode >= OP_CLOSE:
+                if opcode == OP_PING:
+                    await self.send_control(OP_PONG, payload)
+                elif opcode == OP_CLOSE:
+                    await self.send_control(OP_CLOSE, payload[:2])
+                    return None
+                continue
+
+            if opcode != OP_CONT:
+                message_opcode = opcode
+                if fin:
+                    # Caso común: mensaje de un frame
+                    return opcode, decode_payload(opcode, payload)
+                fragments = bytearray(payload)
+                continue
+
+            if fragments is None:
+                raise ValueError("Continuation frame without initial frame")
+            fragments += payload
+            if fin:
+                return message_opcode, decode_payload(message_opcode, fragments)
+
+def decode_payload(opcode, data):
+    """str para OP_TEXT, bytes para el resto."""
+    if opcode == OP_TEXT:
+        return str(data, "utf-8")
+    return bytes(data)
+
+# ─────────────────────────────────────────────────────────────────
+#  MICRO-BENCHMARK
+# ─────────────────────────────────────────────────────────────────
+def _benchmark(min_time=0.5):
+    """Frames/s de enmascarado + cabecera para payloads de 1 KB, 64 KB y 1 MB."""
+    def rate(fn):
+        count, start = 0, time.perf_counter()
+        while True:
+            fn()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                return count / elapsed
+
+    key = os.urandom(4)
+    print(f"NumPy: {'yes' if np is not None else 'no'}")
+    print(f"{'payload':>8} {'loop fps':>12} {'mask fps':>12} {'frame fps':>12} {'speedup':>8}")
+    for size in (1024, 64 * 1024, 1024 * 1024):
+        payload = os.urandom(size)
+        assert bytes(mask_payload(payload, key)) == bytes(mask_payload_loop(payload, key))
+
+        loop_fps = rate(lambda: mask_payload_loop(payload, key))
+        mask_fps = rate(lambda: mask_payload(payload, key))
+        frame_fps = rate(lambda: frame_buffers(OP_BINARY, payload))
+
+        label = f"{size // 1024} KB" if size < 1024 * 1024 else "1 MB"
+        print(f"{label:>8} {loop_fps:>12.1f} {mask_fps:>12.1f} {frame_fps:>12.1f} {mask_fps / loop_fps:>7.0f}x")
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,127 @@
+"""
+scene_manager.py - Ciclo de vida de la escena de generación
+Cada trabajo genera dentro de la colección VibeLink_Scratch y, al empezar el
+siguiente, solo se borra lo que creó el anterior (con bpy.data, sin bpy.ops):
+los objetos del usuario no se tocan. Cada PURGE_EVERY trabajos se eliminan
+las mallas y materiales huérfanos (users == 0), así bpy.data no crece
+durante sesiones largas.
+"""
+import os
+import sys
+import time
+
+import bpy
+
+from .generators import mesh_builder
+from .profiling import phase
+
+SCRATCH_NAME = "VibeLink_Scratch"
+PURGE_EVERY = 50
+
+def rss_mb():
+    """Memoria residente actual del proceso (pico si no se puede leer; None en Windows)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso (None en Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux en KB, macOS en bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class SceneManager:
+    """Colección scratch por trabajo + purga periódica de datablocks huérfanos."""
+
+    def __init__(self, purge_every=PURGE_EVERY):
+        self.purge_every = purge_every
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.jobs = 0
+        self.removed = 0
+        self.purged = 0
+        self.purges = 0
+        self.purge_total = 0.0
+        self._since_purge = 0
+
+    def collection(self):
+        """Colección scratch (se crea y se enlaza a la escena si falta)."""
+        coll = bpy.data.collections.get(SCRATCH_NAME)
+        if coll is None:
+            coll = bpy.data.collections.new(SCRATCH_NAME)
+        root = bpy.context.scene.collection
+        if root.children.get(SCRATCH_NAME) is None:
+            root.children.link(coll)
+        return coll
+
+    def begin_job(self):
+        """
+        Borra lo que dejó el trabajo anterior y devuelve la colección donde
+        generar el siguiente.
+        """
+        with phase("clear"):
+            coll = self.collection()
+            self.clear(coll)
+            self.jobs += 1
+            self._since_purge += 1
+            if self._since_purge >= self.purge_every:
+                self.purge()
+        return coll
+
+    def clear(self, coll=None):
+        """Elimina los objetos de la colección scratch y sus datos sin otros usuarios."""
+        coll = coll or self.collection()
+        objects = list(coll.all_objects)
+        if not objects:
+            return 0
+        data = {obj.data for obj in objects if obj.data is not None}
+        bpy.data.batch_remove(objects)
+        orphans = [d for d in data if d.users == 0]
+        if orphans:
+            bpy.data.batch_remove(orphans)
+        self.removed += len(objects)
+        return len(objects)
+
+    def purge(self):
+        """
+        Elimina mallas y materiales huérfanos. Blender tampoco los guardaría
+        en el .blend, pero en memoria se acumulan (materiales que ya no usa
+        ninguna malla, restos de exportaciones, etc). Los materiales del
+        registro compartido solo se expulsan por encima de su límite LRU.
+        """
+        start = time.perf_counter()
+        shared = mesh_builder.registry.names()
+        orphans = [m for m in bpy.data.meshes if m.users == 0]
+        orphans += [m for m in bpy.data.materials if m.users == 0 and m.name not in shared]
+        if orphans:
+            bpy.data.batch_remove(orphans)
+        evicted = mesh_builder.registry.evict()
+        self.purged += len(orphans) + evicted
+        self.purges += 1
+        self.purge_total += time.perf_counter() - start
+        self._since_purge = 0
+        return len(orphans) + evicted
+
+    def stats(self):
+        coll = bpy.data.collections.get(SCRATCH_NAME)
+        return {
+            "jobs": self.jobs,
+            "removed_objects": self.removed,
+            "purged_datablocks": self.purged,
+            "purges": self.purges,
+            "purge_ms": round(self.purge_total * 1000, 2),
+            "scratch_objects": len(coll.all_objects) if coll else 0,
+            "objects": len(bpy.data.objects),
+            "meshes": len(bpy.data.meshes),
+            "materials": len(bpy.data.materials),
+            "shared_materials": len(mesh_builder.registry.names()),
+            "rss_mb": rss_mb(),
+        }
@@ -1,65 +1,151 @@
 import bpy
+import asyncio
 import json
+import random
 import threading
 import queue
 import time
-import socket
-import struct
 import os
+import socket
 
-# Cola thread-safe para ejecutar en el Main Thread de Blender
-execution_queue = queue.Queue()
+from . import protocol
+from . import job_queue
+from . import profiling
+
+# Cola thread-safe para ejecutar en el Main Thread de Blender (prioridades,
+# coalescing, cancelación y journal: ver job_queue.py)
+execution_queue = job_queue.JobQueue()
 
 GENERATED_PATH = "" # Se setea dinamicamente
 
+# Cliente conectado actualmente (para responder a Unity desde el Main Thread)
+active_client = None
+
 def log(msg):
     print(f"[VibeLink] {msg}")
 
-# --- WebSocket Client (Raw Socket implementation) ---
+def journal_path():
+    """Journal de execution_queue (configuración de usuario de Blender, sobrevive al reinicio)."""
+    return os.path.join(bpy.utils.user_resource('CONFIG', create=True), "vibelink_queue.jsonl")
+
+def reply(payload):
+    """Envia un evento JSON a Unity (ej: {"event": "batch_manifest", ...})."""
+    if active_client is None:
+        log(f"No client connected, reply dropped: {payload.get('event')}")
+        return
+    active_client.send(json.dumps(payload))
+
+def reply_to(data, payload):
+    """
+    reply() correlacionado: copia el 'id' de la petición (si lo trae). Un
+    trabajo coalescido (job_queue) responde también a cada id de "coalesced".
+    """
+    if "id" in data:
+        payload["id"] = data["id"]
+    reply(payload)
+    for job_id in data.get("coalesced", ()):
+        reply(dict(payload, id=job_id))
+
+def reply_binary(payload):
+    """Envia un frame binario a Unity (malla en streaming, ver vmesh.encode_stream)."""
+    if active_client is None:
+        log("No client connected, binary reply dropped")
+        return
+    active_client.send_bytes(payload)
+
+# --- WebSocket Client (asyncio sobre socket puro) ---
 # Usamos socket puro porque no podemos garantizar que 'websockets' pip package esté instalado en Blender user.
 class UnityClient:
-    def __init__(self, host="127.0.0.1", port=8085):
+    """
+    Cliente WebSocket asyncio con su propio event loop en un hilo aparte.
+
+    - Los mensajes con "id" reciben un ack inmediato desde el hilo de red;
+      el progreso y el resultado los envía handle_message con el mismo id.
+    - send() es thread-safe (se llama desde el Main Thread de Blender).
+    - Reconexión con backoff exponencial + jitter en lugar de una espera fija.
+    - Al conectar se anuncia con un evento hello (capacity): con varios
+      Blender conectados, Unity manda cada trabajo a uno solo (VibeJobDispatcher).
+    """
+    RECONNECT_MIN = 0.25   # Segundos (primer reintento)
+    RECONNECT_MAX = 10.0
+    # Trabajos en vuelo que acepta: uno generándose en el Main Thread y otro
+    # ya en cola, así no hay hueco esperando el viaje de ida y vuelta a Unity
+    CAPACITY = 2
+
+    def __init__(self, host="127.0.0.1", port=8085, capacity=CAPACITY):
         self.host = host
         self.port = port
-        self.socket = None
+        self.capacity = capacity
         self.running = False
-        self.lock = threading.Lock()
         self.thread = None
+        self.loop = None
+        self.task = None
+        self.reader = None
+        self.writer = None
+        # Jitter de reconexión (RNG propio, sin semilla: no debe repetirse entre clientes)
+        self._rng = random.Random()
 
     def start(self):
         if self.running: return
         self.running = True
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self._main())
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
 
     def stop(self):
+        global active_client
         self.running = False
-        if self.socket:
-            try: self.socket.close() 
-            except: pass
+        if active_client is self:
+            active_client = None
+        if self.loop and self.task:
+            self.loop.call_soon_threadsafe(self.task.cancel)
         if self.thread:
             self.thread.join(timeout=1.0)
         log("Client stopped")
 
     def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def reconnect_delay(self, attempt):
+        """Backoff exponencial con jitter: [cap/2, cap], cap = MIN * 2^attempt."""
+        cap = min(self.RECONNECT_MAX, self.RECONNECT_MIN * (2 ** attempt))
+        return cap / 2 + self._rng.uniform(0, cap / 2)
+
+    async def _main(self):
+        attempt = 0
         while self.running:
             try:
-                self._connect()
-                self._listen()
+                await self._connect()
+                attempt = 0
+                await self._listen()
             except Exception as e:
+                # Cualquier fallo reconecta: un error sin capturar acabaría la tarea del loop
                 log(f"Connection lost: {e}")
-                time.sleep(2) # Reconnect delay
+            finally:
+                self._disconnect()
+
+            if not self.running: break
+            delay = self.reconnect_delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
 
-    def _connect(self):
+    async def _connect(self):
+        global active_client
         log(f"Connecting to ws://{self.host}:{self.port}...")
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((self.host, self.port))
-        
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
         # Handshake manual WebSocket (simplificado, si el server es estricto requerirá Sec-WebSocket-Key)
         # Para VibeLinkServer (TcpListener), basta con "GET / HTTP/1.1" y Upgrade headers.
         import base64
         key = base64.b64encode(os.urandom(16)).decode('utf-8')
-        
+
         request = (
             f"GET / HTTP/1.1\r\n"
             f"Host: {self.host}:{self.port}\r\n"
@@ -69,101 +155,262 @@ class UnityClient:
             f"Sec-WebSocket-Version: 13\r\n"
             f"\r\n"
         )
-        self.socket.send(request.encode())
-        
-        # Leer respuesta handshake
-        response = self.socket.recv(4096)
-        if b"101 Switching Protocols" in response:
+        self.writer.write(request.encode())
+        await self.writer.drain()
+
+        # Leer hasta el fin de cabeceras; lo que sobre queda en el StreamReader
+        try:
+            headers = await self.reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Handshake failed")
+
+        if b"101 Switching Protocols" in headers:
+            active_client = self
             log("Connected!")
         else:
-            raise Exception("Handshake failed")
+            raise ConnectionError("Handshake failed")
+
+        await self._send_text(json.dumps(self.hello()))
 
-    def _listen(self):
+    def hello(self):
+        """Anuncio del worker: Unity le asigna como mucho capacity trabajos a la vez."""
+        return {
+            "event": "hello",
+            "role": "worker",
+            "worker": f"{socket.gethostname()}:{os.getpid()}",
+            "capacity": self.capacity,
+            "commands": list(GENERATION_COMMANDS) + ["generate_batch"],
+        }
+
+    def _disconnect(self):
+        global active_client
+        if active_client is self:
+            active_client = None
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def _listen(self):
+        frames = protocol.AsyncFrameReader(self.reader, self._send_frame)
         while self.running:
-            # Leer Frame Header (2 bytes minimos)
-            header = self.socket.recv(2)
-            if not header: break
-            
-            b1, b2 = header
-            fin = b1 & 0x80
-            opcode = b1 & 0x0F
-            if opcode == 8: break # Close frame
-            
-            payload_len = b2 & 0x7F
-            if payload_len == 126:
-                payload_len = struct.unpack(">H", self.socket.recv(2))[0]
-            elif payload_len == 127:
-                payload_len = struct.unpack(">Q", self.socket.recv(8))[0]
-            
-            # Leer payload
-            payload = b""
-            while len(payload) < payload_len:
-                chunk = self.socket.recv(payload_len - len(payload))
-                if not chunk: break
-                payload += chunk
-                
-            msg = payload.decode('utf-8')
-            # Encolar para Main Thread
-            execution_queue.put(msg)
+            message = await frames.read_message()
+            if message is None: break # Close frame
 
-    def send(self, data_str):
-        # Enviar frame texto (0x81) sin mask (cliente -> server debe llevar mask segun RFC, pero VibeLinkServer puede ser permisivo)
-        # Para cumplir RFC, hay que enmascarar.
-        payload = data_str.encode('utf-8')
-        length = len(payload)
-        
-        frame = bytearray([0x81])
-        
-        if length <= 125:
-            frame.append(0x80 | length) # Mask bit set
-        elif length <= 65535:
-            frame.append(0x80 | 126)
-            frame.extend(struct.pack(">H", length))
-        else:
-            frame.append(0x80 | 127)
-            frame.extend(struct.pack(">Q", length))
-            
-        mask_key = os.urandom(4)
-        frame.extend(mask_key)
-        
-        masked_payload = bytearray(length)
-        for i in range(length):
-            masked_payload[i] = payload[i] ^ mask_key[i % 4]
-            
-        frame.extend(masked_payload)
-        
+            opcode, payload = message
+            if opcode != protocol.OP_TEXT: continue
+
+            try:
+                data = json.loads(payload)
+            except ValueError as e:
+                log(f"Invalid JSON dropped: {e}")
+                continue
+
+            if not isinstance(data, dict):
+                continue
+
+            # Un mensaje con campos erróneos no debe cortar la conexión
+            try:
+                await self._handle(data)
+            except (OSError, ConnectionError):
+                raise
+            except Exception as e:
+                log(f"Error processing: {e}")
+                error = {"event": "error", "cmd": data.get("cmd"), "error": str(e)}
+                if "id" in data:
+                    error["id"] = data["id"]
+                await self._send_text(json.dumps(error))
+
+    async def _handle(self, data):
+        """Un mensaje de Unity ya decodificado (hilo de red)."""
+        # Cancelar no espera turno: quita de la cola lo que aún no ha empezado
+        if data.get("cmd") == "cancel":
+            await self._cancel(data)
+            return
+
+        # Stats tampoco: se contesta aquí aunque el Main Thread esté generando
+        if data.get("cmd") == "stats":
+            payload = stats_payload(data.get("recent", STATS_RECENT))
+            if "id" in data:
+                payload["id"] = data["id"]
+            await self._send_text(json.dumps(payload))
+            return
+
+        # Encolar para Main Thread (con timestamp para medir la espera en cola)
+        status = execution_queue.put((time.perf_counter(), data))
+
+        # Ack inmediato (el Main Thread puede estar ocupado con otra generación)
+        if "id" in data:
+            await self._send_text(json.dumps({
+                "event": "ack",
+                "id": data["id"],
+                "cmd": data.get("cmd"),
+                "status": status,
+                "queue_depth": execution_queue.qsize(),
+            }))
+            if status == job_queue.REJECTED:
+                await self._send_text(json.dumps({
+                    "event": "error", "id": data["id"], "cmd": data.get("cmd"), "error": "queue full",
+                }))
+
+    async def _cancel(self, data):
+        """{"cmd": "cancel", "ids": [...]} (o "target": id): un evento cancelled por trabajo quitado."""
+        ids = data.get("ids") or ([data["target"]] if "target" in data else [])
+        # Un str suelto se iteraría letra a letra; el error vuelve como evento (ver _listen)
+        if not isinstance(ids, list) or not all(isinstance(i, (str, int)) and not isinstance(i, bool) for i in ids):
+            raise ValueError("cancel: 'ids' must be a list of job ids (str or int)")
+        cancelled = execution_queue.cancel(ids)
+        for job_id in cancelled:
+            await self._send_text(json.dumps({"event": "cancelled", "id": job_id}))
+        log(f"Cancelled {len(cancelled)}/{len(ids)} queued jobs")
+        if "id" in data:
+            await self._send_text(json.dumps({
+                "event": "cancel_result",
+                "id": data["id"],
+                "cancelled": cancelled,
+                "not_pending": [i for i in ids if i not in cancelled],
+            }))
+
+    async def _send_frame(self, opcode, payload):
+        if self.writer is None:
+            raise ConnectionError("Not connected")
+        # Cliente -> server debe llevar mask segun RFC 6455
+        self.writer.writelines(protocol.frame_buffers(opcode, payload))
+        await self.writer.drain()
+
+    async def _send_text(self, data_str):
         try:
-            with self.lock:
-                self.socket.send(frame)
-        except:
-            pass
+            await self._send_frame(protocol.OP_TEXT, data_str.encode('utf-8'))
+        except (OSError, ConnectionError) as e:
+            log(f"Send failed: {e}")
+            raise
+
+    async def _send_bytes(self, payload):
+        try:
+            await self._send_frame(protocol.OP_BINARY, payload)
+        except (OSError, ConnectionError) as e:
+            log(f"Send failed: {e}")
+            raise
+
+    def send(self, data_str):
+        """
+        Envía un mensaje de texto desde cualquier hilo.
+
+        Returns:
+            concurrent.futures.Future del envío (None si el loop no está activo)
+        """
+        if self.loop is None or not self.loop.is_running():
+            log("Client not running, message dropped")
+            return None
+        return asyncio.run_coroutine_threadsafe(self._send_text(data_str), self.loop)
+
+    def send_bytes(self, payload):
+        """
+        Como send(), pero un frame binario. Sale en orden con los send()
+        posteriores (mismo loop), así asset_ready llega detrás de la malla.
+        """
+        if self.loop is None or not self.loop.is_running():
+            log("Client not running, binary message dropped")
+            return None
+        return asyncio.run_coroutine_threadsafe(self._send_bytes(payload), self.loop)
+
+# --- Blender Main Thread Dispatcher ---
+class MainThreadDispatcher:
+    """
+    Drena execution_queue desde bpy.app.timers con intervalo adaptativo.
+
+    - Con trabajo pendiente vuelve a ejecutarse de inmediato (intervalo 0).
+    - En reposo el intervalo crece exponencialmente hasta MAX_INTERVAL.
+    - Cada tick respeta TICK_BUDGET para no congelar la UI de Blender.
+    """
+    MIN_INTERVAL = 0.005   # Primer intervalo tras quedarse sin trabajo
+    MAX_INTERVAL = 0.1     # Latencia maxima en reposo
+    BACKOFF = 2.0
+    TICK_BUDGET = 0.05     # Segundos de trabajo por tick antes de ceder a la UI
+
+    def __init__(self, work_queue, handler):
+        self.queue = work_queue
+        self.handler = handler
+        self.interval = self.MIN_INTERVAL
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.processed = 0
+        self.ticks = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.busy_total = 0.0
+
+    def tick(self):
+        self.ticks += 1
+        start = time.perf_counter()
+        deadline = start + self.TICK_BUDGET
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+        handled = 0
+        while time.perf_counter() < deadline:
+            try:
+                enqueued_at, msg = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            job_start = time.perf_counter()
+            wait = job_start - enqueued_at
+            profiling.tracer.observe("queue_wait", wait)
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+            self.handler(msg)
+
+            self.busy_total += time.perf_counter() - job_start
+            self.processed += 1
+            handled += 1
+
+        if handled or not self.queue.empty():
+            # Seguir drenando en el siguiente ciclo de eventos
+            self.interval = self.MIN_INTERVAL
+            return 0.0
+
+        interval = self.interval
+        self.interval = min(self.interval * self.BACKOFF, self.MAX_INTERVAL)
+        return interval
+
+    def stats(self):
+        avg_wait = self.wait_total / self.processed if self.processed else 0.0
+        stats = {
+            "queue_depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "ticks": self.ticks,
+            "wait_avg_ms": round(avg_wait * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "busy_ms": round(self.busy_total * 1000, 2),
+            "interval_ms": round(self.interval * 1000, 2),
+        }
+        # JobQueue: pendientes por prioridad, coalescidos, rechazados, cancelados
+        if hasattr(self.queue, "stats"):
+            stats["jobs"] = self.queue.stats()
+        return stats
 
-# --- Blender Main Thread Loop ---
 # Esta función es llamada por el Timer de Blender (bpy.app.timers)
 def process_queue():
-    while not execution_queue.empty():
-        msg = execution_queue.get()
-        handle_message(msg)
-    return 0.5 # Ejecutar cada 0.5 segundos
+    return dispatcher.tick()
 
 from .generators import house_generator
 from .generators import nature_generator
 from .generators import humanoid_generator
+from .generators import settlement_generator
+from . import export_cache
+from . import scene_manager
+from . import vmesh
+from . import workers
 
 
-def export_to_unity(obj, params, prefix="Object"):
+def resolve_export_dir(params):
     """
-    Exporta un objeto de Blender a Unity como FBX.
-    
-    Args:
-        obj: Objeto de Blender a exportar
-        params: Diccionario con 'export_path', 'level', 'seed', 'style'
-        prefix: Prefijo del archivo (ej: "House", "Tree", "Stone")
-    
-    Returns:
-        str: Ruta completa del archivo exportado
+    Resuelve (y crea) la carpeta _Project/Generated/Models de Unity.
+    Usa 'export_path' si viene en params; si no, la ultima ruta recordada.
     """
-    # Resolver ruta de Unity (con persistencia)
     unity_assets_path = params.get("export_path", "")
     
     if unity_assets_path:
@@ -176,100 +423,490 @@ def export_to_unity(obj, params, prefix="Object"):
         import tempfile
         unity_assets_path = tempfile.gettempdir()
     
-    # Construir ruta de exportación
     export_subpath = os.path.join("_Project", "Generated", "Models")
     export_dir = os.path.join(unity_assets_path, export_subpath)
     os.makedirs(export_dir, exist_ok=True)
+    return export_dir
+
+def export_objects(objs, filepath):
+    """Exporta uno o varios objetos raíz (con todos sus hijos) a un único FBX."""
+    # Seleccionar los objetos raíz Y todos sus hijos (ej: armature + mesh)
+    with profiling.phase("select"):
+        bpy.ops.object.select_all(action='DESELECT')
+        def select_recursive(o):
+            o.select_set(True)
+            for child in o.children:
+                select_recursive(child)
+        for obj in objs:
+            select_recursive(obj)
+        bpy.context.view_layer.objects.active = objs[0]
+
+    log(f"Exporting to: {filepath}")
+    
+    # Exportar con configuración optimizada (al cambiarla, subir export_cache.EXPORT_SETTINGS_VERSION)
+    with profiling.phase("export"):
+        bpy.ops.export_scene.fbx(
+            filepath=filepath, 
+            use_selection=True, 
+            axis_forward='-Z', 
+            axis_up='Y',
+            apply_scale_options='FBX_SCALE_ALL',
+            use_mesh_modifiers=True,
+            # Texturas paleta (palette_atlas) dentro del propio FBX
+            path_mode='COPY',
+            embed_textures=True
+        )
     
-    # Generar nombre de archivo
+    log("Export Success!")
+    return filepath
+
+def asset_filename(params, prefix, ext=".fbx"):
+    """
+    Nombre de archivo estable por params: {prefix}_{style}_L{level}_{seed}{ext},
+    con sufijo _LODn / _Inst si el asset sale con LODs o con piezas instanciadas
+    (para que no pisen el FBX de la versión normal, que la cache sigue usando).
+    """
     lvl = params.get("level", 1)
     seed = params.get("seed", 0)
     style = params.get("style", "basic")
-    filename = f"{prefix}_{style}_L{lvl}_{seed}.fbx"
-    filepath = os.path.join(export_dir, filename)
-    
-    # Seleccionar el objeto raíz Y todos sus hijos (ej: armature + mesh)
-    bpy.ops.object.select_all(action='DESELECT')
-    def select_recursive(o):
-        o.select_set(True)
-        for child in o.children:
-            select_recursive(child)
-    select_recursive(obj)
-    bpy.context.view_layer.objects.active = obj
+    variant = ""
+    if params.get("lods", 1) > 1:
+        variant += f"_LOD{params['lods']}"
+    if params.get("parts") == "instanced":
+        variant += "_Inst"
+    return f"{prefix}_{style}_L{lvl}_{seed}{variant}{ext}"
 
-    log(f"Exporting to: {filepath}")
+def export_to_unity(obj, params, prefix="Object"):
+    """
+    Exporta un objeto de Blender a Unity como FBX.
     
-    # Exportar con configuración optimizada
-    bpy.ops.export_scene.fbx(
-        filepath=filepath, 
-        use_selection=True, 
-        axis_forward='-Z', 
-        axis_up='Y',
-        apply_scale_options='FBX_SCALE_ALL',
-        use_mesh_modifiers=True
-    )
+    Args:
+        obj: Objeto de Blender a exportar
+        params: Diccionario con 'export_path', 'level', 'seed', 'style'
+        prefix: Prefijo del archivo (ej: "House", "Tree", "Stone")
     
-    log("Export Success!")
-    return filepath
+    Returns:
+        str: Ruta completa del archivo exportado
+    """
+    filepath = os.path.join(resolve_export_dir(params), asset_filename(params, prefix))
+    return export_objects([obj], filepath)
+
+def export_vmesh(geometry, params, prefix="Object"):
+    """Como export_to_unity, pero escribe la Geometry directamente (.vmesh)."""
+    filepath = os.path.join(resolve_export_dir(params), asset_filename(params, prefix, vmesh.FILE_EXT))
+    log(f"Exporting to: {filepath}")
+    with profiling.phase("export"):
+        return vmesh.write(geometry, filepath)
+
+def export_scatter(variants, instances, params, prefix="Scatter"):
+    """Variantes + buffer de instancias en un único .vscatter (sin escena)."""
+    filepath = os.path.join(resolve_export_dir(params), asset_filename(params, prefix, vmesh.SCATTER_EXT))
+    log(f"Exporting {len(instances)} instances of {len(variants)} variants to: {filepath}")
+    with profiling.phase("export"):
+        return vmesh.write_scatter(variants, instances, filepath)
+
+# --- Comandos de generación ---
+# Cada generación va a la colección scratch; se borra al empezar la siguiente
+scenes = scene_manager.SceneManager()
+
+def parse_params(data):
+    """Params del mensaje + atajos de nivel superior (level/seed/style)."""
+    params = dict(data.get("params", {}))
+    for key in ("level", "seed", "style"):
+        if key in data: params[key] = data[key]
+    return params
+
+GENERATORS = {
+    "generate_house": house_generator,
+    "generate_nature": nature_generator,
+    "generate_humanoid": humanoid_generator,
+    "generate_settlement": settlement_generator,
+}
+
+GENERATION_COMMANDS = tuple(GENERATORS)
+
+def asset_prefix(cmd, params):
+    """Prefijo de archivo del asset (ej: "House", "Tree", "Humanoid_Guard")."""
+    if cmd == "generate_house":
+        return "House"
+
+    if cmd == "generate_nature":
+        # type: "tree" or "rock" -> Prefix: "Tree" or "Rock"
+        return params.get("type", "nature").capitalize()
+
+    if cmd == "generate_humanoid":
+        # style: "villager" | "guard" | "elder"
+        return f"Humanoid_{params.get('style', 'villager').capitalize()}"
+
+    if cmd == "generate_settlement":
+        # layout: "road" | "grid" -> "Settlement_Road" | "Settlement_Grid"
+        return f"Settlement_{params.get('layout', 'road').capitalize()}"
+
+    raise ValueError(f"Unknown generation command: {cmd}")
+
+def generate_asset(cmd, params, collection=None):
+    """
+    Genera un asset en la colección dada (no limpia ni exporta).
+
+    Returns:
+        (obj, prefix): objeto generado y prefijo de archivo para export_to_unity
+    """
+    prefix = asset_prefix(cmd, params)
+    return GENERATORS[cmd].generate(params, collection), prefix
+
+def generate_and_export(cmd, params):
+    """
+    Genera + exporta un asset como un trabajo nuevo de scenes (el FBX sale
+    de la colección scratch, que se vacía antes).
+
+    Con 'format': "vmesh" no se toca la escena: la Geometry del generador se
+    escribe directamente con vmesh.write en lugar de pasar por el FBX.
+    'type': "scatter" (generate_nature) siempre sale como .vscatter.
+
+    Returns:
+        (name, path, timing): timing = {"generate_ms", "export_ms"}
+    """
+    scatter = params.get("type") == "scatter" and hasattr(GENERATORS[cmd], "build_scatter")
+    direct = scatter or params.get("format") == "vmesh"
+    collection = None if direct else scenes.begin_job()
+
+    start = time.perf_counter()
+    prefix = asset_prefix(cmd, params)
+    if scatter:
+        variants, instances = GENERATORS[cmd].build_scatter(params)
+        name = f"Scatter_{params.get('seed', 0)}"
+        export_start = time.perf_counter()
+        path = export_scatter(variants, instances, params, prefix=prefix)
+    elif direct:
+        geometry = GENERATORS[cmd].build_geometry(params)
+        name = geometry.name
+        export_start = time.perf_counter()
+        path = export_vmesh(geometry, params, prefix=prefix)
+    else:
+        obj = GENERATORS[cmd].generate(params, collection)
+        name = obj.name
+        export_start = time.perf_counter()
+        path = export_to_unity(obj, params, prefix=prefix)
+
+    end = time.perf_counter()
+    timing = {
+        "generate_ms": round((export_start - start) * 1000, 2),
+        "export_ms": round((end - export_start) * 1000, 2),
+    }
+    return name, path, timing
+
+def generate_and_stream(cmd, params, data):
+    """
+    'delivery': "stream": la Geometry del generador va a Unity como frame
+    binario (vmesh.encode_stream) en vez de a un archivo; ni escena, ni
+    disco, ni cache. Sale la malla unida (LOD0), como con 'format': "vmesh".
+
+    Returns:
+        (name, byte_count, timing): timing = {"generate_ms", "export_ms"}
+    """
+    if params.get("type") == "scatter":
+        raise ValueError("delivery 'stream' does not support scatter")
+
+    start = time.perf_counter()
+    geometry = GENERATORS[cmd].build_geometry(params)
+    export_start = time.perf_counter()
+
+    ids = ([data["id"]] if "id" in data else []) + list(data.get("coalesced", ()))
+    header = {"cmd": cmd, "name": geometry.name, "ids": ids}
+    if ids:
+        header["id"] = ids[0]
+    with profiling.phase("encode"):
+        payload = vmesh.encode_stream(geometry, header)
+    with profiling.phase("send"):
+        reply_binary(payload)
+
+    end = time.perf_counter()
+    timing = {
+        "generate_ms": round((export_start - start) * 1000, 2),
+        "export_ms": round((end - export_start) * 1000, 2),
+    }
+    return geometry.name, len(payload), timing
+
+def lookup_cached(cmd, params, caches=None):
+    """
+    Consulta la cache de exportación para (cmd, params).
+    'cache': false en params fuerza regenerar (pero se sigue guardando).
+    Con caches (export_cache.CacheSet) se reutiliza la instancia de la
+    carpeta: run_batch guarda después de consultar todos los items y dos
+    instancias distintas se pisarían el índice.
+
+    Returns:
+        (cache, key, path): path es None si hay que generar
+    """
+    export_dir = resolve_export_dir(params)
+    cache = caches.get(export_dir) if caches else export_cache.ExportCache(export_dir)
+    key = export_cache.cache_key(cmd, params)
+    if not params.get("cache", True):
+        return cache, key, None
+    return cache, key, cache.lookup(key)
+
+def batch_manifest(mode, assets, files, start):
+    return {
+        "event": "batch_manifest",
+        "mode": mode,
+        "count": len(assets),
+        "succeeded": sum(1 for a in assets if a["ok"]),
+        "assets": assets,
+        "files": files,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+def batch_item(item, batch_params):
+    """(cmd, params) de un item; hereda export_path del batch."""
+    params = parse_params(item)
+    if "export_path" in batch_params:
+        params.setdefault("export_path", batch_params["export_path"])
+    return item.get("cmd"), params
 
-def handle_message(json_str):
+def run_batch(data, progress=None):
+    """
+    Genera una lista de assets con una sola limpieza de escena.
+
+    Mensaje:
+        {"cmd": "generate_batch",
+         "params": {"export_path": "...", "mode": "separate" | "combined",
+                    "name": "VillagerSet", "spacing": 3.0, "workers": 4},
+         "items": [{"cmd": "generate_humanoid", "params": {...}}, ...]}
+
+    mode "separate": un FBX por asset (mismo nombre que los comandos sueltos).
+    Con 'workers' > 0 (o la opción Workers del panel) los assets no cacheados
+    se reparten entre procesos Blender headless (ver workers.py).
+    mode "combined": todos los assets en un único FBX multi-objeto, separados
+    'spacing' metros en X.
+
+    progress(entry, done, total) se llama cada vez que un item termina.
+
+    Returns:
+        dict: manifiesto con el resultado de cada item y los ficheros escritos
+    """
+    batch_params = data.get("params", {})
+    items = data.get("items", [])
+    mode = batch_params.get("mode", "separate")
+    start = time.perf_counter()
+
+    finished = []
+    def item_done(entry):
+        finished.append(entry)
+        if progress:
+            progress(entry, len(finished), len(items))
+
+    if mode == "combined":
+        manifest = run_combined_batch(items, batch_params, start)
+        succeeded = [a for a in manifest["assets"] if a["ok"]]
+        if progress and succeeded:
+            # Un solo FBX para todos los items: un único aviso
+            progress(succeeded[0], len(items), len(items))
+        return manifest
+
+    # Primero la cache: solo se generan los que falten
+    assets = []
+    misses = []
+    caches = export_cache.CacheSet()
+    for index, item in enumerate(items):
+        cmd, params = batch_item(item, batch_params)
+        entry = {"index": index, "cmd": cmd}
+        assets.append(entry)
+
+        item_cache, key, path = lookup_cached(cmd, params, caches)
+        if path:
+            entry.update(ok=True, cached=True, path=path)
+            item_done(entry)
+        else:
+            misses.append((entry, cmd, params, item_cache, key))
+
+    workers_count = batch_params.get("workers", getattr(bpy.context.scene, "vibelink_workers", 0))
+    if workers_count > 0 and len(misses) > 1:
+        try:
+            run_on_workers(misses, workers_count)
+            for m in misses:
+                if "ok" in m[0]: item_done(m[0])
+            misses = [m for m in misses if "ok" not in m[0]]
+        except Exception as e:
+            log(f"Worker pool failed, generating in-process: {e}")
+
+    for entry, cmd, params, item_cache, key in misses:
+        try:
+            entry["name"], entry["path"], _ = generate_and_export(cmd, params)
+            item_cache.store(key, entry["path"], {"cmd": cmd})
+            entry.update(ok=True, cached=False)
+        except Exception as e:
+            log(f"Batch item {entry['index']} ({cmd}) failed: {e}")
+            entry.update(ok=False, error=str(e))
+        item_done(entry)
+
+    files = [a["path"] for a in assets if a["ok"]]
+    return batch_manifest(mode, assets, files, start)
+
+def run_on_workers(misses, workers_count):
+    """Genera + exporta en el pool de Blender headless y rellena las entradas."""
+    last_path = bpy.context.scene.get("vibelink_last_path", "")
+    jobs = [{"cmd": cmd, "params": dict(params, export_path=params.get("export_path", last_path))}
+            for _, cmd, params, _, _ in misses]
+
+    results = workers.get_pool(workers_count).map(jobs)
+
+    for (entry, cmd, params, item_cache, key), result in zip(misses, results):
+        if result["ok"]:
+            entry.update(ok=True, cached=False, name=result["name"], path=result["path"],
+                         worker=result["worker"])
+            item_cache.store(key, result["path"], {"cmd": cmd})
+        else:
+            log(f"Batch item {entry['index']} ({cmd}) failed on worker: {result['error']}")
+            entry.update(ok=False, error=result["error"], worker=result["worker"])
+
+def run_combined_batch(items, batch_params, start):
+    """Todos los items en la misma escena y un único FBX."""
+    spacing = batch_params.get("spacing", 3.0)
+
+    cache, combined_key, filepath = lookup_cached("generate_batch", dict(batch_params, items=items))
+    if filepath:
+        log(f"Cache hit (generate_batch): {filepath}")
+        assets = [{"index": i, "cmd": item.get("cmd"), "ok": True, "cached": True, "path": filepath}
+                  for i, item in enumerate(items)]
+        return batch_manifest("combined", assets, [filepath], start)
+
+    collection = scenes.begin_job()
+
+    assets = []
+    generated = []
+    for index, item in enumerate(items):
+        cmd, params = batch_item(item, batch_params)
+        entry = {"index": index, "cmd": cmd}
+        try:
+            obj, prefix = generate_asset(cmd, params, collection)
+            obj.location.x += len(generated) * spacing
+            generated.append(obj)
+            entry.update(ok=True, cached=False, name=obj.name)
+        except Exception as e:
+            log(f"Batch item {index} ({cmd}) failed: {e}")
+            entry.update(ok=False, error=str(e))
+        assets.append(entry)
+
+    files = []
+    if generated:
+        import hashlib
+        digest = hashlib.sha1(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+        name = batch_params.get("name", "Set")
+        filepath = os.path.join(resolve_export_dir(batch_params), f"Batch_{name}_{digest}.fbx")
+        files.append(export_objects(generated, filepath))
+        cache.store(combined_key, filepath, {"cmd": "generate_batch"})
+        for entry in assets:
+            if entry["ok"]: entry["path"] = filepath
+
+    return batch_manifest("combined", assets, files, start)
+
+# Última foto de scenes.stats() (bpy solo se lee en el Main Thread; "stats"
+# se contesta desde el hilo de red)
+scene_snapshot = {}
+
+def trace_job(cmd, prof, elapsed, **extra):
+    """Pasa las fases del trabajo a profiling.tracer; devuelve {fase: ms}."""
+    global scene_snapshot
+    profiling.tracer.record_job(cmd, prof.phases, elapsed, **extra)
+    scene_snapshot = scenes.stats()
+    return {name: round(seconds * 1000, 2) for name, seconds in prof.phases.items()}
+
+STATS_RECENT = 8  # Trazas por defecto en la respuesta de "stats"
+
+def stats_payload(recent=STATS_RECENT):
+    """
+    Respuesta del comando "stats": percentiles por fase, cola, escena y últimas trazas.
+
+    Args:
+        recent: trazas a devolver (viene de Unity: se acota a 0..RECENT_JOBS,
+                y si no es un número se usa STATS_RECENT)
+    """
     try:
-        data = json.loads(json_str)
+        recent = max(0, min(profiling.RECENT_JOBS, int(recent)))
+    except (TypeError, ValueError):
+        recent = STATS_RECENT
+    return {
+        "event": "stats",
+        "phases": profiling.tracer.summary(),
+        "dispatcher": dispatcher.stats(),
+        "scene": scene_snapshot,
+        "recent": profiling.tracer.recent(recent),
+    }
+
+def handle_message(message):
+    """
+    Ejecuta un comando en el Main Thread.
+
+    Con "id" en el mensaje, las respuestas lo llevan de vuelta:
+    progress (stage) -> asset_ready / batch_manifest, o error si falla.
+    Con 'delivery': "stream" la malla llega antes como frame binario y
+    asset_ready no trae path.
+    """
+    data = {}
+    try:
+        data = json.loads(message) if isinstance(message, str) else message
         cmd = data.get("cmd")
         
-        if cmd == "generate_house":
-            log(f"Generating House: {data}")
-            
-            # Limpiar escena (Factory Mode)
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.delete()
-            
-            # Parsear parámetros
-            params = data.get("params", {})
-            if "level" in data: params["level"] = data["level"]
-            if "seed" in data: params["seed"] = data["seed"]
-
-            # Generar y exportar
-            house_obj = house_generator.generate(params)
-            export_to_unity(house_obj, params, prefix="House")
-
-        elif cmd == "generate_nature":
-            log(f"Generating Nature: {data}")
-            
-            # Limpiar escena
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.delete()
-            
-            # Parsear parámetros
-            params = data.get("params", {})
-            if "seed" in data: params["seed"] = data["seed"]
-            # type: "tree" or "rock"
-            
-            nature_obj = nature_generator.generate(params)
-            
-            # Prefix: "Tree" or "Rock"
-            type_name = params.get("type", "nature").capitalize()
-            export_to_unity(nature_obj, params, prefix=type_name)
-
-        elif cmd == "generate_humanoid":
-            log(f"Generating Humanoid: {data}")
-
-            # Limpiar escena
-            bpy.ops.object.select_all(action='SELECT')
-            bpy.ops.object.delete()
-
-            # Parsear parámetros
-            params = data.get("params", {})
-            if "seed"  in data: params["seed"]  = data["seed"]
-            if "style" in data: params["style"] = data["style"]
-            # style: "villager" | "guard" | "elder"
-
-            humanoid_obj = humanoid_generator.generate(params)
-
-            style_name = params.get("style", "villager").capitalize()
-            export_to_unity(humanoid_obj, params, prefix=f"Humanoid_{style_name}")
+        if cmd in GENERATION_COMMANDS:
+            start = time.perf_counter()
+            params = parse_params(data)
+            timing = {}
+            streamed = params.get("delivery") == "stream"
+            cached = False
+
+            with profiling.Profile() as prof:
+                if streamed:
+                    log(f"Streaming ({cmd}): {data}")
+                    name, byte_count, timing = generate_and_stream(cmd, params, data)
+                    path = None
+                else:
+                    # Mismo params + mismo código generador -> reutilizar el FBX
+                    with profiling.phase("cache"):
+                        cache, key, path = lookup_cached(cmd, params)
+                    cached = path is not None
+                    if cached:
+                        log(f"Cache hit ({cmd}): {path}")
+                    else:
+                        log(f"Generating ({cmd}): {data}")
+                        reply_to(data, {"event": "progress", "cmd": cmd, "stage": "generating"})
+
+                        # Generar y exportar
+                        _, path, timing = generate_and_export(cmd, params)
+                        cache.store(key, path, {"cmd": cmd})
+
+            elapsed = time.perf_counter() - start
+            timing["phases_ms"] = trace_job(cmd, prof, elapsed, cached=cached, streamed=streamed)
+            result = {
+                "event": "asset_ready",
+                "cmd": cmd,
+                "path": path,
+                "cached": cached,
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "timing": timing,
+            }
+            if streamed:
+                result.update(streamed=True, name=name, bytes=byte_count)
+            reply_to(data, result)
+
+        elif cmd == "generate_batch":
+            log(f"Generating Batch: {len(data.get('items', []))} items")
+
+            def progress(entry, done, total):
+                reply_to(data, {"event": "progress", "cmd": cmd, "stage": "item",
+                                "done": done, "total": total, "item": entry})
+
+            start = time.perf_counter()
+            with profiling.Profile() as prof:
+                manifest = run_batch(data, progress)
+            trace_job(cmd, prof, time.perf_counter() - start, count=manifest["count"])
+            log(f"Batch done: {manifest['succeeded']}/{manifest['count']} in {manifest['elapsed_ms']} ms")
+            reply_to(data, manifest)
 
     except Exception as e:
         log(f"Error processing: {e}")
         import traceback
         traceback.print_exc()
+        if isinstance(data, dict) and "id" in data:
+            reply_to(data, {"event": "error", "cmd": data.get("cmd"), "error": str(e)})
+
+dispatcher = MainThreadDispatcher(execution_queue, handle_message)
@@ -0,0 +1,182 @@
+"""
+vmesh.py - Exportador binario directo (.vmesh) para assets simples
+Escribe una geometry.Geometry tal cual, sin escena ni bpy.ops.export_scene.fbx.
+Unity lo lee con VibeMeshImporter (ScriptedImporter): el bloque de vértices
+y el de índices se copian enteros a la malla (SetVertexBufferData /
+SetIndexBufferData), sin parseo por vértice.
+
+Formato (little-endian):
+    "VMSH", version u32, vertex_count u32, index_count u32, submesh_count u32
+    por submesh: index_start u32, index_count u32, color 4 x f32,
+                 name_len u16, name utf-8,         (un submesh por material)
+                 palette_count u16, palette_count x color 4 x f32
+    relleno hasta múltiplo de 4
+    vértices: vertex_count x (pos 3 x f32, normal 3 x f32, uv 2 x f32)
+    índices: index_count x u32 (triángulos)
+
+write_scatter (.vscatter) guarda varias mallas .vmesh más un buffer de
+instancias para los scatter de nature_generator (ver abajo).
+encode_stream envuelve un bloque .vmesh en un frame binario para mandarlo
+por el socket sin pasar por disco ("delivery": "stream", ver abajo).
+
+Las coordenadas ya van en espacio Unity (Y arriba, mano izquierda), igual
+que el FBX con axis_forward='-Z', axis_up='Y' + bakeAxisConversion. Las
+caras son planas (un vértice por esquina, normal de la cara).
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"VMSH"
+VERSION = 2
+FILE_EXT = ".vmesh"
+
+_HEADER = struct.Struct("<4sIIII")
+_SUBMESH = struct.Struct("<II4fH")
+_PALETTE_COUNT = struct.Struct("<H")
+
+# Blender (x, y, z) -> Unity (-x, z, -y)
+_TO_UNITY = np.array(((-1, 0, 0), (0, 0, 1), (0, -1, 0)), dtype=np.float64)
+
+def triangulate(sizes):
+    """
+    Abanico de triángulos para polígonos convexos (cubos, tapas, tejados).
+
+    Returns:
+        (tri_loops, tri_poly): índices de loop (T, 3) y polígono de cada triángulo
+    """
+    loop_starts = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=loop_starts[1:])
+
+    tris_per_poly = sizes - 2
+    tri_poly = np.repeat(np.arange(len(sizes)), tris_per_poly)
+    # Posición del triángulo dentro de su polígono (0 .. k-3)
+    first_tri = np.repeat(np.cumsum(tris_per_poly) - tris_per_poly, tris_per_poly)
+    local = np.arange(len(tri_poly)) - first_tri
+
+    start = loop_starts[tri_poly]
+    tri_loops = np.stack([start, start + local + 1, start + local + 2], axis=1)
+    return tri_loops, tri_poly
+
+def mesh_buffers(geometry):
+    """
+    Buffers listos para Unity.
+
+    Returns:
+        (vertices, indices, submeshes): vertices (N, 8) float32 intercalados,
+        indices (M,) uint32 agrupados por material, submeshes
+        [(index_start, index_count, material), ...]
+    """
+    verts, loops, sizes, uvs, mats = geometry.arrays()
+    tri_loops, tri_poly = triangulate(sizes)
+
+    # Normal de cada polígono = suma de las normales de su abanico (Newell)
+    corners = verts[loops[tri_loops]]
+    tri_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals = np.zeros((len(sizes), 3))
+    np.add.at(normals, tri_poly, tri_normals)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals /= np.where(lengths > 0, lengths, 1.0)
+
+    # Un vértice por loop: posición, normal de su cara y UV
+    loop_poly = np.repeat(np.arange(len(sizes)), sizes)
+    vertices = np.empty((len(loops), 8), dtype=np.float32)
+    vertices[:, 0:3] = verts[loops] @ _TO_UNITY.T
+    vertices[:, 3:6] = normals[loop_poly] @ _TO_UNITY.T
+    vertices[:, 6:8] = uvs.reshape(-1, 2)
+
+    # El cambio de mano invierte el sentido: (a, b, c) -> (a, c, b)
+    triangles = tri_loops[:, (0, 2, 1)]
+
+    tri_mats = mats[tri_poly]
+    order = np.argsort(tri_mats, kind="stable")
+    indices = triangles[order].astype(np.uint32).ravel()
+
+    counts = np.bincount(tri_mats, minlength=len(geometry.materials) or 1) * 3
+    starts = np.cumsum(counts) - counts
+    materials = geometry.materials or [None]
+    submeshes = [(int(starts[i]), int(counts[i]), materials[i])
+                 for i in range(len(materials)) if counts[i]]
+    return vertices, indices, submeshes
+
+def encode(geometry):
+    """Bloques del archivo .vmesh (lista de bytes, longitud total múltiplo de 4)."""
+    vertices, indices, submeshes = mesh_buffers(geometry)
+
+    chunks = [_HEADER.pack(MAGIC, VERSION, len(vertices), len(indices), len(submeshes))]
+    for start, count, material in submeshes:
+        name = (material.name if material else "Mat_F_Default").encode("utf-8")
+        color = material.color if material else (0.8, 0.8, 0.8, 1.0)
+        palette = material.palette if material and material.palette else ()
+        chunks.append(_SUBMESH.pack(start, count, *color, len(name)) + name)
+        chunks.append(_PALETTE_COUNT.pack(len(palette)))
+        chunks.append(np.asarray(palette, dtype="<f4").tobytes())
+
+    size = sum(len(c) for c in chunks)
+    chunks.append(b"\0" * (-size % 4))
+    chunks.append(vertices.tobytes())
+    chunks.append(indices.tobytes())
+    return chunks
+
+def write(geometry, filepath):
+    """Escribe la geometría en filepath (.vmesh) y devuelve la ruta."""
+    chunks = encode(geometry)
+    with open(filepath, "wb") as f:
+        f.writelines(chunks)
+    return filepath
+
+# ─────────────────────────────────────────────────────────────────
+#  SCATTER (.vscatter): variantes + buffer de instancias
+#    "VSCT", version u32, variant_count u32, instance_count u32
+#    por variante: byte_count u32 + archivo .vmesh completo
+#    instancias: instance_count x (variant u32, posición 3 x f32,
+#                yaw en grados f32, escala f32), ya en espacio Unity
+# ─────────────────────────────────────────────────────────────────
+SCATTER_MAGIC = b"VSCT"
+SCATTER_VERSION = 1
+SCATTER_EXT = ".vscatter"
+
+_SCATTER_HEADER = struct.Struct("<4sIII")
+_BLOCK_SIZE = struct.Struct("<I")
+_INSTANCE = np.dtype([("variant", "<u4"), ("position", "<f4", 3), ("yaw", "<f4"), ("scale", "<f4")])
+
+def instance_buffer(instances):
+    """Instancias de scatter (coordenadas Blender, yaw en radianes) -> registros Unity."""
+    out = np.zeros(len(instances), dtype=_INSTANCE)
+    out["variant"] = instances["variant"]
+    out["position"] = instances["position"] @ _TO_UNITY.T
+    # Rz(θ) en Blender equivale a Ry(-θ) en Unity (cambio de mano)
+    out["yaw"] = -np.degrees(instances["yaw"])
+    out["scale"] = instances["scale"]
+    return out
+
+def write_scatter(variants, instances, filepath):
+    """Escribe las variantes (.vmesh embebidos) y las instancias en filepath."""
+    chunks = [_SCATTER_HEADER.pack(SCATTER_MAGIC, SCATTER_VERSION, len(variants), len(instances))]
+    for geometry in variants:
+        blocks = encode(geometry)
+        chunks.append(_BLOCK_SIZE.pack(sum(len(b) for b in blocks)))
+        chunks.extend(blocks)
+    chunks.append(instance_buffer(instances).tobytes())
+
+    with open(filepath, "wb") as f:
+        f.writelines(chunks)
+    return filepath
+
+# ─────────────────────────────────────────────────────────────────
+#  STREAM: frame binario por el socket ("delivery": "stream")
+#    "VSTR", header_len u32, cabecera JSON utf-8 (id, ids, cmd, name),
+#    relleno hasta múltiplo de 4, bloque .vmesh completo
+#  Unity (VibeLinkServer) construye la malla en memoria con VibeMeshReader.
+# ─────────────────────────────────────────────────────────────────
+STREAM_MAGIC = b"VSTR"
+
+_STREAM_HEADER = struct.Struct("<4sI")
+
+def encode_stream(geometry, header):
+    """Payload del frame binario: cabecera JSON + bloque .vmesh (bytes)."""
+    meta = json.dumps(header).encode("utf-8")
+    chunks = [_STREAM_HEADER.pack(STREAM_MAGIC, len(meta)), meta, b"\0" * (-len(meta) % 4)]
+    chunks.extend(encode(geometry))
+    return b"".join(chunks)
@@ -0,0 +1,53 @@
+"""
+worker.py - Proceso Blender headless para generación en paralelo
+Lanzado por workers.WorkerPool:
+
+    blender -b --factory-startup --python worker.py -- <carpeta_padre_del_addon>
+
+Lee trabajos JSON (uno por línea) de stdin, genera + exporta con los mismos
+generadores que el addon y responde por stdout con líneas marcadas con
+RESULT_PREFIX (Blender también escribe su propio log en stdout).
+"""
+import json
+import sys
+import time
+import traceback
+
+RESULT_PREFIX = "@@VIBELINK@@ "
+
+def emit(payload):
+    sys.stdout.write(RESULT_PREFIX + json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if argv:
+        sys.path.insert(0, argv[0])
+
+    from VibeLink import server
+
+    emit({"event": "ready"})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        if line == "quit":
+            break
+
+        job = json.loads(line)
+        start = time.perf_counter()
+        result = {"event": "done", "job": job.get("job"), "generation": job.get("generation")}
+        try:
+            params = job.get("params", {})
+            result["name"], result["path"], _ = server.generate_and_export(job["cmd"], params)
+            result["ok"] = True
+        except Exception as e:
+            traceback.print_exc()
+            result["ok"] = False
+            result["error"] = str(e)
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        emit(result)
+
+if __name__ == "__main__":
+    main()
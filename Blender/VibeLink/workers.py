@@ -0,0 +1,202 @@
+"""
+workers.py - Pool de procesos Blender headless (modo coordinador)
+Cada worker ejecuta worker.py en su propio `blender -b`, así una tanda de
+generación usa N núcleos en lugar del Main Thread único del addon.
+"""
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from .worker import RESULT_PREFIX
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "worker.py")
+ADDON_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+START_TIMEOUT = 60.0   # Arrancar Blender puede tardar varios segundos
+JOB_TIMEOUT = 300.0
+
+def log(msg):
+    print(f"[VibeLink] {msg}")
+
+
+class BlenderWorker:
+    """Un proceso `blender -b` + hilo lector de su stdout."""
+
+    def __init__(self, index, blender_path, results):
+        self.index = index
+        self.results = results
+        self.busy = False
+        self.ready = threading.Event()
+        self.process = subprocess.Popen(
+            [blender_path, "-b", "--factory-startup", "--python", WORKER_SCRIPT, "--", ADDON_PARENT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def _read_loop(self):
+        for line in self.process.stdout:
+            if not line.startswith(RESULT_PREFIX):
+                continue
+            payload = json.loads(line[len(RESULT_PREFIX):])
+            if payload.get("event") == "ready":
+                self.ready.set()
+            else:
+                self.results.put((self, payload))
+        # Proceso terminado: desbloquear a quien espere
+        self.ready.set()
+        self.results.put((self, None))
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def send(self, job):
+        self.busy = True
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+
+    def stop(self):
+        if self.alive:
+            try:
+                self.process.stdin.write("quit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class WorkerPool:
+    """
+    Reparte trabajos {cmd, params} entre N workers: cada worker libre recibe
+    el siguiente trabajo pendiente. Si un worker muere, su trabajo se reintenta
+    en otro.
+    """
+
+    def __init__(self, size, blender_path=None):
+        if blender_path is None:
+            import bpy
+            blender_path = bpy.app.binary_path
+        self.size = size
+        self.blender_path = blender_path
+        self.results = queue.Queue()
+        self.workers = []
+        # Cada map() numera sus trabajos: lo que llegue de una tanda anterior
+        # (timeout, workers caídos) se descarta
+        self.generation = 0
+
+    def start(self):
+        """Arranca (o repone) workers hasta tener 'size' procesos vivos."""
+        self.workers = [w for w in self.workers if w.alive]
+        missing = self.size - len(self.workers)
+        if missing <= 0:
+            return
+        log(f"Starting {missing} Blender workers...")
+        first = max((w.index for w in self.workers), default=-1) + 1
+        started = [BlenderWorker(first + i, self.blender_path, self.results) for i in range(missing)]
+        deadline = time.monotonic() + START_TIMEOUT
+        for w in started:
+            w.ready.wait(max(0.0, deadline - time.monotonic()))
+            if w.alive and w.ready.is_set():
+                self.workers.append(w)
+            else:
+                w.process.kill()
+        if not self.workers:
+            raise RuntimeError("No Blender worker could be started")
+        log(f"{len(self.workers)} workers ready")
+
+    def stop(self):
+        for w in self.workers:
+            w.stop()
+        self.workers = []
+
+    def map(self, jobs):
+        """
+        Ejecuta todos los trabajos y devuelve los resultados en el mismo orden.
+
+        Args:
+            jobs: lista de {"cmd": ..., "params": {...}}
+
+        Returns:
+            list[dict]: {"ok", "path", "name", "elapsed_ms", "worker"} o {"ok": False, "error"}
+        """
+        self.generation += 1
+        generation = self.generation
+        # Restos de una tanda que acabó en error: nadie espera ya esos resultados
+        for w in self.workers:
+            w.busy = False
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                break
+
+        self.start()
+        pending = list(range(len(jobs)))
+        pending.reverse()
+        results = [None] * len(jobs)
+        assigned = {}   # worker -> índice de trabajo
+        deadline = time.monotonic() + JOB_TIMEOUT * max(1, len(jobs))
+
+        def dispatch():
+            for w in self.workers:
+                if pending and w.alive and not w.busy:
+                    index = pending.pop()
+                    try:
+                        w.send(dict(jobs[index], job=index, generation=generation))
+                        assigned[w] = index
+                    except OSError:
+                        pending.append(index)
+
+        dispatch()
+        while any(r is None for r in results):
+            if not any(w.alive for w in self.workers) and self.results.empty():
+                raise RuntimeError("All Blender workers died")
+            try:
+                worker, payload = self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise RuntimeError("Worker pool timed out")
+
+            if payload is not None and payload.get("generation") != generation:
+                # Resultado tardío de otra tanda: el worker ya tiene un trabajo de esta
+                continue
+
+            index = assigned.pop(worker, None)
+            worker.busy = False
+            if payload is None:
+                # Worker caído: reencolar su trabajo para otro
+                log(f"Worker {worker.index} exited")
+                if index is not None:
+                    pending.append(index)
+            else:
+                payload["worker"] = worker.index
+                results[payload["job"]] = payload
+            dispatch()
+
+        return results
+
+
+_pool = None
+
+def get_pool(size):
+    """Pool compartido; se recrea si cambia el número de workers."""
+    global _pool
+    if _pool is not None and _pool.size != size:
+        _pool.stop()
+        _pool = None
+    if _pool is None:
+        _pool = WorkerPool(size)
+    return _pool
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
@@ -0,0 +1,86 @@
+using UnityEngine;
+using System.Collections.Generic;
+
+/// <summary>
+/// Draws a VibeLink scatter (forest / rock field) with GPU instancing.
+/// The .vscatter importer fills the variant meshes and the compact instance
+/// buffer; no GameObject is created per tree or rock.
+/// </summary>
+[ExecuteAlways]
+public class VibeScatter : MonoBehaviour
+{
+    [System.Serializable]
+    public class Variant
+    {
+        public Mesh mesh;
+        public Material[] materials;
+    }
+
+    [System.Serializable]
+    public struct Instance
+    {
+        public int variant;
+        public Vector3 position;   // Local to this GameObject
+        public float yaw;          // Degrees around Y
+        public float scale;
+    }
+
+    public Variant[] variants = new Variant[0];
+    public Instance[] instances = new Instance[0];
+
+    [Header("Rendering")]
+    public UnityEngine.Rendering.ShadowCastingMode shadows = UnityEngine.Rendering.ShadowCastingMode.On;
+
+    // RenderMeshInstanced dibuja como mucho 1023 instancias por llamada en algunas plataformas
+    const int BatchSize = 1023;
+
+    // Matrices locales por variante (se recalculan si cambian los datos)
+    List<Matrix4x4>[] _local;
+    Matrix4x4[] _batch = new Matrix4x4[BatchSize];
+
+    void OnEnable()  { Rebuild(); }
+    void OnValidate() { _local = null; }
+
+    /// <summary>Groups the instance buffer by variant as local TRS matrices.</summary>
+    public void Rebuild()
+    {
+        _local = new List<Matrix4x4>[variants.Length];
+        for (int v = 0; v < variants.Length; v++) _local[v] = new List<Matrix4x4>();
+
+        foreach (var inst in instances)
+        {
+            if (inst.variant < 0 || inst.variant >= variants.Length) continue;
+            _local[inst.variant].Add(Matrix4x4.TRS(inst.position, Quaternion.Euler(0f, inst.yaw, 0f), Vector3.one * inst.scale));
+        }
+    }
+
+    void Update()
+    {
+        if (_local == null || _local.Length != variants.Length) Rebuild();
+        Matrix4x4 world = transform.localToWorldMatrix;
+
+        for (int v = 0; v < variants.Length; v++)
+        {
+            Variant variant = variants[v];
+            if (variant == null || variant.mesh == null) continue;
+            List<Matrix4x4> local = _local[v];
+
+            for (int first = 0; first < local.Count; first += BatchSize)
+            {
+                int count = Mathf.Min(BatchSize, local.Count - first);
+                for (int i = 0; i < count; i++) _batch[i] = world * local[first + i];
+
+                for (int sub = 0; sub < variant.mesh.subMeshCount && sub < variant.materials.Length; sub++)
+                {
+                    var rp = new RenderParams(variant.materials[sub])
+                    {
+                        shadowCastingMode = shadows,
+                        receiveShadows = true,
+                        layer = gameObject.layer
+                    };
+                    Graphics.RenderMeshInstanced(rp, variant.mesh, sub, _batch, count);
+                }
+            }
+        }
+    }
+}
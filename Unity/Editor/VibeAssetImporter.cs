@@ -23,6 +23,9 @@ public class VibeAssetImporter : AssetPostprocessor
                 {
                     modelImporter.animationType = ModelImporterAnimationType.Generic;
                     modelImporter.bakeAxisConversion = true; // Let Unity handle Blender Z-up → Y-up
+                    // Pesos rígidos (una pieza = un hueso): 1 hueso por vértice abarata el skinning
+                    modelImporter.skinWeights = ModelImporterSkinWeights.Custom;
+                    modelImporter.maxBonesPerVertex = 1;
                 }
                 else
                 {
@@ -44,9 +47,9 @@ public class VibeAssetImporter : AssetPostprocessor
             {
                 if (mat == null) continue;
 
-                // 1. Intentar extraer color HEX del nombre (formato: Mat_..._RRGGBB_...)
-                // Ej: Mat_F_Skin_EAC8A4_12345
-                var hexMatch = System.Text.RegularExpressions.Regex.Match(mat.name, @"_([0-9A-Fa-f]{6})_");
+                // 1. Intentar extraer color HEX del nombre (formato: Mat_..._RRGGBB[_...])
+                // Ej: Mat_F_EAC8A4 (compartido por color), Mat_F_Skin_EAC8A4_12345 (legacy)
+                var hexMatch = System.Text.RegularExpressions.Regex.Match(mat.name, @"_([0-9A-Fa-f]{6})(?:_|$)");
                 if (hexMatch.Success)
                 {
                     if (ColorUtility.TryParseHtmlString("#" + hexMatch.Groups[1].Value, out Color extractedColor))
@@ -76,6 +79,7 @@ public class VibeAssetImporter : AssetPostprocessor
                 else if (mat.name.Contains("Door"))  overrideColor = new Color(0.25f, 0.15f, 0.1f); // Madera Puerta
                 else if (mat.name.Contains("Window")) overrideColor = new Color(0.4f, 0.7f, 0.9f, 0.5f); // Azul Cristal
                 else if (mat.name.Contains("Stone")) overrideColor = new Color(0.5f, 0.5f, 0.55f); // Gris Piedra
+                else if (mat.name.Contains("Road"))  overrideColor = new Color(0.45f, 0.38f, 0.28f); // Tierra batida
                 else if (mat.name.Contains("Grass") || mat.name.Contains("Leaves")) overrideColor = new Color(0.1f, 0.6f, 0.1f); // Verde Bosque
                 else if (mat.name.Contains("Skin"))  overrideColor = new Color(0.85f, 0.65f, 0.5f);  // Piel base
                 else if (mat.name.Contains("Cloth")) overrideColor = new Color(0.3f,  0.45f, 0.6f);  // Tela Azul base
@@ -94,47 +98,94 @@ public class VibeAssetImporter : AssetPostprocessor
     {
         foreach (string str in importedAssets)
         {
-            if (str.Contains("Generated/Models") && str.EndsWith(".fbx"))
+            if (str.Contains("Generated/Models") && (str.EndsWith(".fbx") || str.EndsWith(".vmesh") || str.EndsWith(".vscatter")))
             {
                 Debug.Log($"[VibeLink] Importing & Spawning: {str}");
-                
-                // Cargar el asset recién importado
-                GameObject prefab = AssetDatabase.LoadAssetAtPath<GameObject>(str);
-                if (prefab != null)
-                {
-                    // Instanciar en la escena
-                    GameObject instance = (GameObject)PrefabUtility.InstantiatePrefab(prefab);
-                    instance.name = prefab.name;
-                    
-                    // Posición por tipo de asset
-                    Vector3 spawnPos = Vector3.zero;
-
-                    // Casas evolutivas (L1-L5)
-                    if      (prefab.name.Contains("_L1_")) spawnPos = new Vector3(0,  0, 0);
-                    else if (prefab.name.Contains("_L2_")) spawnPos = new Vector3(12, 0, 0);
-                    else if (prefab.name.Contains("_L3_")) spawnPos = new Vector3(24, 0, 0);
-                    else if (prefab.name.Contains("_L4_")) spawnPos = new Vector3(38, 0, 0);
-                    else if (prefab.name.Contains("_L5_")) spawnPos = new Vector3(54, 0, 0);
-
-                    // Humanoides (por estilo)
-                    else if (prefab.name.Contains("Villager")) spawnPos = new Vector3(0, 0, 10);
-                    else if (prefab.name.Contains("Guard"))    spawnPos = new Vector3(4, 0, 10);
-                    else if (prefab.name.Contains("Elder"))    spawnPos = new Vector3(8, 0, 10);
-
-                    instance.transform.position = spawnPos;
-
-                    // Villagers: posición automática en fila
-                    if (prefab.name.StartsWith("Villager"))
-                    {
-                        instance.transform.rotation = Quaternion.identity;
-                        instance.transform.position = new Vector3(_villagerCount * 3f, 0, 15f);
-                        _villagerCount++;
-                    }
-
-                    Selection.activeGameObject = instance;
-                    SceneView.FrameLastActiveSceneView();
-                }
+                SpawnAsset(str);
             }
         }
     }
+
+    // === EVENTOS DE BLENDER ===
+    // asset_ready y el progress de cada item de un batch traen la ruta del FBX
+    // (o .vmesh / .vscatter, ver VibeMeshImporter y VibeScatterImporter):
+    // - Nuevo: se importa ya (sin esperar al refresco de Unity) y
+    //   OnPostprocessAllAssets lo instancia.
+    // - Cacheado: Blender no reescribe el FBX, así que Unity no lo reimporta:
+    //   se instancia directamente.
+    [InitializeOnLoadMethod]
+    static void HookBlenderEvents()
+    {
+        VibeLinkServer.OnBlenderEvent -= OnBlenderEvent;
+        VibeLinkServer.OnBlenderEvent += OnBlenderEvent;
+    }
+
+    static void OnBlenderEvent(string json)
+    {
+        var eventMatch = System.Text.RegularExpressions.Regex.Match(json, "\"event\": \"(\\w+)\"");
+        string evt = eventMatch.Success ? eventMatch.Groups[1].Value : "";
+
+        // progress de batch: el asset va en el objeto "item"
+        string scope;
+        if (evt == "asset_ready") scope = json;
+        else if (evt == "progress" && json.Contains("\"item\"")) scope = System.Text.RegularExpressions.Regex.Match(json, @"\{[^{}]*\}").Value;
+        else return;
+
+        var pathMatch = System.Text.RegularExpressions.Regex.Match(scope, "\"path\": \"([^\"]+)\"");
+        if (!pathMatch.Success) return;
+
+        string dataPath = Application.dataPath.Replace("\\", "/");
+        string fullPath = pathMatch.Groups[1].Value.Replace("\\\\", "/").Replace("\\", "/");
+        if (!fullPath.StartsWith(dataPath)) return;
+
+        string assetPath = "Assets" + fullPath.Substring(dataPath.Length);
+        if (scope.Contains("\"cached\": true"))
+        {
+            Debug.Log($"[VibeLink] Cached asset, spawning: {assetPath}");
+            SpawnAsset(assetPath);
+        }
+        else
+        {
+            AssetDatabase.ImportAsset(assetPath, ImportAssetOptions.ForceSynchronousImport);
+        }
+    }
+
+    static void SpawnAsset(string str)
+    {
+        // Cargar el asset recién importado
+        GameObject prefab = AssetDatabase.LoadAssetAtPath<GameObject>(str);
+        if (prefab == null) return;
+
+        // Instanciar en la escena
+        GameObject instance = (GameObject)PrefabUtility.InstantiatePrefab(prefab);
+        instance.name = prefab.name;
+        
+        // Posición por tipo de asset
+        Vector3 spawnPos = Vector3.zero;
+
+        // Casas evolutivas (L1-L5)
+        if      (prefab.name.Contains("_L1_")) spawnPos = new Vector3(0,  0, 0);
+        else if (prefab.name.Contains("_L2_")) spawnPos = new Vector3(12, 0, 0);
+        else if (prefab.name.Contains("_L3_")) spawnPos = new Vector3(24, 0, 0);
+        else if (prefab.name.Contains("_L4_")) spawnPos = new Vector3(38, 0, 0);
+        else if (prefab.name.Contains("_L5_")) spawnPos = new Vector3(54, 0, 0);
+
+        // Humanoides (por estilo)
+        else if (prefab.name.Contains("Villager")) spawnPos = new Vector3(0, 0, 10);
+        else if (prefab.name.Contains("Guard"))    spawnPos = new Vector3(4, 0, 10);
+        else if (prefab.name.Contains("Elder"))    spawnPos = new Vector3(8, 0, 10);
+
+        instance.transform.position = spawnPos;
+
+        // Villagers: posición automática en fila
+        if (prefab.name.StartsWith("Villager"))
+        {
+            instance.transform.rotation = Quaternion.identity;
+            instance.transform.position = new Vector3(_villagerCount * 3f, 0, 15f);
+            _villagerCount++;
+        }
+
+        Selection.activeGameObject = instance;
+        SceneView.FrameLastActiveSceneView();
+    }
 }
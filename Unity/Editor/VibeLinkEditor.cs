@@ -30,6 +30,13 @@ public class VibeLinkEditor : EditorWindow
         if (VibeLinkServer.Instance != null)
         {
              GUILayout.Label($"Running on Port: {VibeLinkServer.Instance.port}");
+             GUILayout.Label($"Pending Blender requests: {VibeLinkServer.Instance.PendingRequestCount}");
+             var jobs = VibeLinkServer.Instance.Jobs;
+             if (jobs != null && jobs.WorkerCount > 0)
+                 GUILayout.Label($"Blender workers: {jobs.WorkerCount} (in flight {jobs.InFlightCount}, queued {jobs.QueuedCount})");
+             // Ej: "Evolution" pulsado dos veces -> cancelar lo que aún no ha empezado
+             if (VibeLinkServer.Instance.PendingRequestCount > 0 && GUILayout.Button("✖ Cancel Pending Requests"))
+                 VibeLinkServer.Instance.CancelAllRequests();
              if (GUILayout.Button("Force Restart Server"))
              {
                  VibeLinkServer.Instance.StopServer();
@@ -52,7 +59,7 @@ public class VibeLinkEditor : EditorWindow
             // Enviar ruta absoluta de Assets para que Blender sepa donde guardar
             string path = Application.dataPath.Replace("\\", "/");
             string json = "{\"cmd\": \"generate_house\", \"params\": {\"level\": 1, \"width\": 5, \"depth\": 5, \"seed\": " + Random.Range(0, 9999) + ", \"export_path\": \"" + path + "\"}}";
-            VibeLinkServer.Instance.Broadcast(json);
+            VibeLinkServer.Instance.SendRequest(json);
             Debug.Log($"[VibeLink] Request Sent: {json}");
         }
         
@@ -60,7 +67,15 @@ public class VibeLinkEditor : EditorWindow
         {
             string path = Application.dataPath.Replace("\\", "/");
             string json = "{\"cmd\": \"generate_house\", \"params\": {\"level\": 2, \"width\": 6, \"depth\": 8, \"seed\": " + Random.Range(0, 9999) + ", \"export_path\": \"" + path + "\"}}";
-            VibeLinkServer.Instance.Broadcast(json);
+            VibeLinkServer.Instance.SendRequest(json);
+            Debug.Log($"[VibeLink] Request Sent: {json}");
+        }
+
+        // Sin FBX ni AssetDatabase: la malla llega por el socket y se crea en la escena
+        if (VibeLinkServer.Instance != null && GUILayout.Button("⚡ Stream House Preview (Level 3)"))
+        {
+            string json = "{\"cmd\": \"generate_house\", \"params\": {\"level\": 3, \"seed\": " + Random.Range(0, 9999) + ", \"delivery\": \"stream\"}}";
+            VibeLinkServer.Instance.SendRequest(json);
             Debug.Log($"[VibeLink] Request Sent: {json}");
         }
 
@@ -75,11 +90,24 @@ public class VibeLinkEditor : EditorWindow
                 // Seed fijo o aleatorio? Aleatorio para variedad.
                 int seed = Random.Range(0, 9999);
                 string json = "{\"cmd\": \"generate_house\", \"params\": {\"level\": " + i + ", \"width\": " + w + ", \"depth\": " + d + ", \"seed\": " + seed + ", \"export_path\": \"" + path + "\"}}";
-                VibeLinkServer.Instance.Broadcast(json);
+                VibeLinkServer.Instance.SendRequest(json);
             }
             Debug.Log("[VibeLink] Sent 5 Evolution Requests!");
         }
 
+        GUILayout.Space(5);
+        if (VibeLinkServer.Instance != null && GUILayout.Button("🏘 Generate Town (40 houses)", GUILayout.Height(30)))
+        {
+            string path = Application.dataPath.Replace("\\", "/");
+            int seed = Random.Range(0, 9999);
+
+            // Un solo trabajo: casas L1-L5 en cuadrícula, un objeto por chunk
+            string json = "{\"cmd\": \"generate_settlement\", \"params\": {\"layout\": \"grid\", \"houses\": 40, \"seed\": " + seed + ", \"export_path\": \"" + path + "\"}}";
+            VibeLinkServer.Instance.SendRequest(json);
+
+            Debug.Log("[VibeLink] Sent Settlement Request!");
+        }
+
         GUILayout.Space(5);
         if (VibeLinkServer.Instance != null && GUILayout.Button("🌳 Generate Nature Set (Tree + Rock)", GUILayout.Height(30)))
         {
@@ -88,15 +116,28 @@ public class VibeLinkEditor : EditorWindow
             
             // Tree
             string jsonTree = "{\"cmd\": \"generate_nature\", \"params\": {\"type\": \"tree\", \"height\": 4.0, \"seed\": " + seed + ", \"export_path\": \"" + path + "\"}}";
-            VibeLinkServer.Instance.Broadcast(jsonTree);
+            VibeLinkServer.Instance.SendRequest(jsonTree);
             
             // Rock
             string jsonRock = "{\"cmd\": \"generate_nature\", \"params\": {\"type\": \"rock\", \"scale\": 1.5, \"seed\": " + (seed+1) + ", \"export_path\": \"" + path + "\"}}";
-            VibeLinkServer.Instance.Broadcast(jsonRock);
+            VibeLinkServer.Instance.SendRequest(jsonRock);
             
             Debug.Log("[VibeLink] Sent Nature Requests!");
         }
 
+        GUILayout.Space(5);
+        if (VibeLinkServer.Instance != null && GUILayout.Button("🌲 Generate Forest (Scatter 100x100)", GUILayout.Height(30)))
+        {
+            string path = Application.dataPath.Replace("\\", "/");
+            int seed = Random.Range(0, 9999);
+
+            // Unas pocas variantes + miles de instancias (VibeScatter, GPU instancing)
+            string json = "{\"cmd\": \"generate_nature\", \"params\": {\"type\": \"scatter\", \"width\": 100, \"depth\": 100, \"density\": 0.08, \"seed\": " + seed + ", \"export_path\": \"" + path + "\"}}";
+            VibeLinkServer.Instance.SendRequest(json);
+
+            Debug.Log("[VibeLink] Sent Scatter Request!");
+        }
+
         GUILayout.Space(5);
         if (VibeLinkServer.Instance != null && GUILayout.Button("🧑 Generate Villager Set (6 variants)", GUILayout.Height(30)))
         {
@@ -110,13 +151,16 @@ public class VibeLinkEditor : EditorWindow
                 "female_villager", // Aldeana F (seed distinta)
                 "female_elder",    // Anciana F
             };
+            // Un solo generate_batch: una limpieza de escena y un manifest de respuesta
+            var items = new System.Collections.Generic.List<string>();
             for (int i = 0; i < styles.Length; i++)
             {
                 int seed = Random.Range(0, 99999);
-                string json = $"{{\"cmd\": \"generate_humanoid\", \"params\": {{\"style\": \"{styles[i]}\", \"seed\": {seed}, \"export_path\": \"{path}\"}}}}";
-                VibeLinkServer.Instance.Broadcast(json);
+                items.Add($"{{\"cmd\": \"generate_humanoid\", \"params\": {{\"style\": \"{styles[i]}\", \"seed\": {seed}}}}}");
             }
-            Debug.Log("[VibeLink] Sent 6 Villager Requests!");
+            string json = $"{{\"cmd\": \"generate_batch\", \"params\": {{\"mode\": \"separate\", \"name\": \"VillagerSet\", \"export_path\": \"{path}\"}}, \"items\": [{string.Join(", ", items)}]}}";
+            VibeLinkServer.Instance.SendRequest(json);
+            Debug.Log("[VibeLink] Sent Villager Batch (6 variants)!");
         }
 
 
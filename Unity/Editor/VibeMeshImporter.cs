@@ -0,0 +1,47 @@
+using System.IO;
+using UnityEngine;
+using UnityEditor.AssetImporters;
+
+// === IMPORTADOR .vmesh ===
+// Formato binario que escribe Blender/VibeLink/vmesh.py ('format': "vmesh").
+// La lectura del bloque está en VibeMeshReader (también la usa el streaming
+// por socket de VibeLinkServer); aquí solo se añade el resultado al asset.
+[ScriptedImporter(2, "vmesh")]
+public class VibeMeshImporter : ScriptedImporter
+{
+    public override void OnImportAsset(AssetImportContext ctx)
+    {
+        byte[] bytes = File.ReadAllBytes(ctx.assetPath);
+        string name = Path.GetFileNameWithoutExtension(ctx.assetPath);
+
+        Mesh mesh = ReadMesh(ctx, bytes, 0, name, "", out Material[] materials);
+        if (mesh == null) return;
+
+        var root = new GameObject(name);
+        root.AddComponent<MeshFilter>().sharedMesh = mesh;
+        root.AddComponent<MeshRenderer>().sharedMaterials = materials;
+        ctx.AddObjectToAsset("root", root);
+        ctx.SetMainObject(root);
+    }
+
+    // Lee un bloque .vmesh que empieza en bytes[start] y añade al asset la malla,
+    // sus materiales y paletas (identificadores con el prefijo key).
+    // VibeScatterImporter lo usa para cada variante de un .vscatter.
+    public static Mesh ReadMesh(AssetImportContext ctx, byte[] bytes, int start, string name, string key, out Material[] materials)
+    {
+        Mesh mesh = VibeMeshReader.Read(bytes, start, name, out materials, out Texture2D[] palettes, out string error);
+        if (mesh == null)
+        {
+            ctx.LogImportError($"[VibeLink] {error}: {ctx.assetPath}");
+            return null;
+        }
+
+        ctx.AddObjectToAsset($"{key}mesh", mesh);
+        for (int i = 0; i < materials.Length; i++)
+        {
+            if (palettes[i] != null) ctx.AddObjectToAsset($"{key}palette_{i}", palettes[i]);
+            ctx.AddObjectToAsset($"{key}material_{i}", materials[i]);
+        }
+        return mesh;
+    }
+}
@@ -0,0 +1,70 @@
+using System.IO;
+using System.Text;
+using UnityEngine;
+using UnityEditor.AssetImporters;
+
+// === IMPORTADOR .vscatter ===
+// Scatter de nature_generator ('type': "scatter"): variantes .vmesh embebidas
+// + buffer de instancias (variant u32, posición 3 x f32, yaw f32, escala f32),
+// ya en espacio Unity. El asset es un GameObject con VibeScatter, que dibuja
+// todas las instancias con GPU instancing.
+[ScriptedImporter(1, "vscatter")]
+public class VibeScatterImporter : ScriptedImporter
+{
+    const uint Version = 1;
+    const int InstanceStride = 6 * 4;
+
+    public override void OnImportAsset(AssetImportContext ctx)
+    {
+        byte[] bytes = File.ReadAllBytes(ctx.assetPath);
+        string name = Path.GetFileNameWithoutExtension(ctx.assetPath);
+
+        if (bytes.Length < 16 || Encoding.ASCII.GetString(bytes, 0, 4) != "VSCT")
+        {
+            ctx.LogImportError($"[VibeLink] Not a .vscatter file: {ctx.assetPath}");
+            return;
+        }
+        uint version = System.BitConverter.ToUInt32(bytes, 4);
+        if (version != Version)
+        {
+            ctx.LogImportError($"[VibeLink] Unsupported .vscatter version {version}: {ctx.assetPath}");
+            return;
+        }
+        int variantCount = (int)System.BitConverter.ToUInt32(bytes, 8);
+        int instanceCount = (int)System.BitConverter.ToUInt32(bytes, 12);
+
+        // Variantes: byte_count u32 + bloque .vmesh
+        var variants = new VibeScatter.Variant[variantCount];
+        int offset = 16;
+        for (int v = 0; v < variantCount; v++)
+        {
+            int size = (int)System.BitConverter.ToUInt32(bytes, offset);
+            Mesh mesh = VibeMeshImporter.ReadMesh(ctx, bytes, offset + 4, $"{name}_Variant{v}", $"v{v}_", out Material[] materials);
+            if (mesh == null) return;
+            variants[v] = new VibeScatter.Variant { mesh = mesh, materials = materials };
+            offset += 4 + size;
+        }
+
+        var instances = new VibeScatter.Instance[instanceCount];
+        for (int i = 0; i < instanceCount; i++, offset += InstanceStride)
+        {
+            instances[i] = new VibeScatter.Instance
+            {
+                variant  = (int)System.BitConverter.ToUInt32(bytes, offset),
+                position = new Vector3(System.BitConverter.ToSingle(bytes, offset + 4),
+                                       System.BitConverter.ToSingle(bytes, offset + 8),
+                                       System.BitConverter.ToSingle(bytes, offset + 12)),
+                yaw      = System.BitConverter.ToSingle(bytes, offset + 16),
+                scale    = System.BitConverter.ToSingle(bytes, offset + 20),
+            };
+        }
+
+        var root = new GameObject(name);
+        var scatter = root.AddComponent<VibeScatter>();
+        scatter.variants = variants;
+        scatter.instances = instances;
+
+        ctx.AddObjectToAsset("root", root);
+        ctx.SetMainObject(root);
+    }
+}
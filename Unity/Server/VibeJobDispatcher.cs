@@ -0,0 +1,183 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Net.Sockets;
+using System.Text.RegularExpressions;
+using UnityEngine;
+
+// === REPARTO DE TRABAJOS ENTRE VARIOS BLENDER ===
+// Cada Blender (UnityClient) se anuncia al conectar con
+// {"event": "hello", "capacity": N, "commands": [...]}. Los comandos que
+// anuncia van a una cola central y cada trabajo se envía a UN solo worker:
+// el menos cargado (en vuelo / capacidad) que tenga hueco. Nada se reparte
+// por adelantado: el worker que termina antes coge el siguiente de la cola,
+// así uno lento no retiene trabajo que otro podría hacer.
+// Si un worker se desconecta, sus trabajos en vuelo vuelven al principio de
+// la cola y los hace otro (o él mismo al reconectar). Los trabajos
+// interactivos adelantan a los bulk (generate_batch), como en job_queue.py.
+// Se usa solo desde el Main Thread (ProcessCommand / ProcessQueue).
+public class VibeJobDispatcher
+{
+    class Worker
+    {
+        public string Name;
+        public int Capacity;
+        public HashSet<string> Commands;
+        public Dictionary<string, Job> InFlight = new Dictionary<string, Job>();
+        public float Load => (float)InFlight.Count / Capacity;
+    }
+
+    class Job
+    {
+        public string Id;
+        public string Cmd;
+        public string Json;
+        public bool Bulk;
+        public int Attempts;
+    }
+
+    // Un trabajo que ha tumbado a MaxAttempts workers no se reintenta más
+    const int MaxAttempts = 3;
+
+    readonly LinkedList<Job> queue = new LinkedList<Job>();
+    readonly Dictionary<TcpClient, Worker> workers = new Dictionary<TcpClient, Worker>();
+    readonly Action<TcpClient, string> send;
+
+    public VibeJobDispatcher(Action<TcpClient, string> send)
+    {
+        this.send = send;
+    }
+
+    public int WorkerCount => workers.Count;
+    public int QueuedCount => queue.Count;
+    public int InFlightCount => workers.Values.Sum(w => w.InFlight.Count);
+
+    public static string CommandOf(string json)
+    {
+        Match m = Regex.Match(json, "\"cmd\":\\s*\"(\\w+)\"");
+        return m.Success ? m.Groups[1].Value : "";
+    }
+
+    // ¿Hay algún worker que sepa hacer este comando? (si no, se hace broadcast como antes)
+    public bool Accepts(string json)
+    {
+        string cmd = CommandOf(json);
+        return workers.Values.Any(w => w.Commands.Contains(cmd));
+    }
+
+    public void Register(TcpClient client, string helloJson)
+    {
+        Match capacity = Regex.Match(helloJson, "\"capacity\":\\s*(\\d+)");
+        Match name = Regex.Match(helloJson, "\"worker\":\\s*\"([^\"]*)\"");
+        Match commands = Regex.Match(helloJson, "\"commands\":\\s*\\[([^\\]]*)\\]");
+
+        var worker = new Worker
+        {
+            Name = name.Success ? name.Groups[1].Value : "blender",
+            Capacity = Math.Max(1, capacity.Success ? int.Parse(capacity.Groups[1].Value) : 1),
+            Commands = new HashSet<string>(Regex.Matches(commands.Groups[1].Value, "\"(\\w+)\"")
+                .Cast<Match>().Select(m => m.Groups[1].Value)),
+        };
+        // Reconexión del mismo socket (no debería pasar): lo suyo vuelve a la cola
+        Remove(client);
+        workers[client] = worker;
+        Debug.Log($"[VibeLink] Worker {worker.Name} registered (capacity {worker.Capacity}, {workers.Count} workers)");
+        Dispatch();
+    }
+
+    // Misma regla que job_queue.priority_of en Blender: generate_batch o "priority": "bulk"
+    public static bool IsBulk(string json)
+    {
+        Match m = Regex.Match(json, "\"priority\":\\s*\"(\\w+)\"");
+        if (m.Success) return m.Groups[1].Value == "bulk";
+        return CommandOf(json) == "generate_batch";
+    }
+
+    public void Enqueue(string id, string json)
+    {
+        var job = new Job { Id = id, Cmd = CommandOf(json), Json = json, Bulk = IsBulk(json) };
+        // Interactivos delante de todos los bulk pendientes (FIFO dentro de cada clase)
+        var firstBulk = job.Bulk ? null : queue.First;
+        while (firstBulk != null && !firstBulk.Value.Bulk) firstBulk = firstBulk.Next;
+        if (firstBulk != null) queue.AddBefore(firstBulk, job);
+        else queue.AddLast(job);
+        Dispatch();
+    }
+
+    // Evento final de un trabajo (asset_ready, batch_manifest, error, cancelled): libera el hueco
+    public void Complete(TcpClient client, string id)
+    {
+        if (workers.TryGetValue(client, out Worker worker) && worker.InFlight.Remove(id))
+        {
+            Dispatch();
+        }
+    }
+
+    // Quita un trabajo que aún no ha salido de la cola de Unity
+    public bool CancelQueued(string id)
+    {
+        for (var node = queue.First; node != null; node = node.Next)
+        {
+            if (node.Value.Id != id) continue;
+            queue.Remove(node);
+            return true;
+        }
+        return false;
+    }
+
+    // Worker que tiene el trabajo en vuelo (null si ninguno)
+    public TcpClient OwnerOf(string id)
+    {
+        return workers.FirstOrDefault(kv => kv.Value.InFlight.ContainsKey(id)).Key;
+    }
+
+    public void Remove(TcpClient client)
+    {
+        if (!workers.TryGetValue(client, out Worker worker)) return;
+        workers.Remove(client);
+
+        // Al principio y en el orden original
+        foreach (Job job in worker.InFlight.Values.Reverse())
+        {
+            if (job.Attempts >= MaxAttempts)
+            {
+                Debug.LogWarning($"[VibeLink] Job {job.Id} dropped after {job.Attempts} lost workers: {job.Json}");
+                continue;
+            }
+            queue.AddFirst(job);
+        }
+        if (worker.InFlight.Count > 0)
+        {
+            Debug.LogWarning($"[VibeLink] Worker {worker.Name} lost, {worker.InFlight.Count} jobs requeued");
+        }
+        Dispatch();
+    }
+
+    void Dispatch()
+    {
+        var node = queue.First;
+        while (node != null)
+        {
+            var next = node.Next;
+            Job job = node.Value;
+
+            // Menos cargado entre los que tienen hueco y saben hacer el comando
+            var target = workers
+                .Where(kv => kv.Value.InFlight.Count < kv.Value.Capacity && kv.Value.Commands.Contains(job.Cmd))
+                .OrderBy(kv => kv.Value.Load)
+                .FirstOrDefault();
+            if (target.Key != null)
+            {
+                queue.Remove(node);
+                job.Attempts++;
+                target.Value.InFlight[job.Id] = job;
+                send(target.Key, job.Json);
+            }
+            else if (!workers.Values.Any(w => w.InFlight.Count < w.Capacity))
+            {
+                break; // Todos llenos
+            }
+            node = next;
+        }
+    }
+}
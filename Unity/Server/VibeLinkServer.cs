@@ -27,9 +27,37 @@ public class VibeLinkServer : MonoBehaviour
 
     public static VibeLinkServer Instance { get; private set; }
 
+    /// <summary>
+    /// Eventos enviados por Blender ({"event": "..."}), ej: batch_manifest.
+    /// Se invoca en el Main Thread.
+    /// </summary>
+    public static event Action<string> OnBlenderEvent;
+
+    /// <summary>
+    /// Malla recibida en streaming ('delivery': "stream"): id de la petición y
+    /// el GameObject ya creado en la escena. Llega antes que su asset_ready.
+    /// Se invoca en el Main Thread.
+    /// </summary>
+    public static event Action<string, GameObject> OnMeshStreamed;
+
+    // Mallas en streaming por nombre: regenerar el mismo asset sustituye la anterior
+    private Dictionary<string, GameObject> streamedObjects = new Dictionary<string, GameObject>();
+    private Transform streamedRoot;
+
+    // Peticiones enviadas con SendRequest y aún sin resultado (id -> hora de envío)
+    private Dictionary<string, DateTime> pendingRequests = new Dictionary<string, DateTime>();
+    private int nextRequestId = 0;
+
+    public int PendingRequestCount { get { lock (pendingRequests) return pendingRequests.Count; } }
+
+    // Varios Blender conectados: cada trabajo a uno solo (ver VibeJobDispatcher)
+    private VibeJobDispatcher jobs;
+    public VibeJobDispatcher Jobs => jobs;
+
     void OnEnable()
     {
         if (Instance == null) Instance = this;
+        if (jobs == null) jobs = new VibeJobDispatcher(SendFrame);
         
         if (Application.isPlaying)
         {
@@ -155,11 +183,16 @@ public class VibeLinkServer : MonoBehaviour
             // 2. Read Loop
             while (client.Connected)
             {
-                string msg = ReadFrame(stream);
-                if (msg == null) break; // Connection closed
-                
+                byte[] payload = ReadFrame(stream, out int opcode);
+                if (payload == null) break; // Connection closed
+
                 // Encolar acción en Main Thread
-                string capturedMsg = msg; // Capture for lambda
+                if (opcode == 2)
+                {
+                    mainThreadActions.Enqueue(() => ProcessMeshFrame(payload));
+                    continue;
+                }
+                string capturedMsg = Encoding.UTF8.GetString(payload); // Capture for lambda
                 mainThreadActions.Enqueue(() => ProcessCommand(capturedMsg, client));
             }
         }
@@ -171,6 +204,8 @@ public class VibeLinkServer : MonoBehaviour
         {
             lock(clients) clients.Remove(client);
             client.Close();
+            // Sus trabajos en vuelo vuelven a la cola (en el Main Thread, como todo el dispatcher)
+            mainThreadActions.Enqueue(() => jobs.Remove(client));
             Debug.Log("[VibeLink] Client disconnected");
         }
     }
@@ -204,13 +239,15 @@ public class VibeLinkServer : MonoBehaviour
         return false;
     }
 
-    private string ReadFrame(NetworkStream stream)
+    // Payload de un frame (opcode 1 = texto, 2 = binario); null si se cierra la conexión
+    private byte[] ReadFrame(NetworkStream stream, out int opcode)
     {
+        opcode = 0;
         int b1 = stream.ReadByte(); if (b1 == -1) return null;
         int b2 = stream.ReadByte(); if (b2 == -1) return null;
 
         bool fin = (b1 & 0x80) != 0;
-        int opcode = b1 & 0x0F; // 1 = text, 8 = close
+        opcode = b1 & 0x0F; // 1 = text, 2 = binary, 8 = close
 
         if (opcode == 8) return null; // Close frame
 
@@ -243,7 +280,7 @@ public class VibeLinkServer : MonoBehaviour
         while (totalRead < payloadLen)
         {
             int read = stream.Read(payload, totalRead, (int)payloadLen - totalRead);
-            if (read == -1) return null; // connection lost
+            if (read <= 0) return null; // connection lost
             totalRead += read;
         }
 
@@ -255,7 +292,63 @@ public class VibeLinkServer : MonoBehaviour
             }
         }
 
-        return Encoding.UTF8.GetString(payload);
+        return payload;
+    }
+
+    // Frame binario de Blender (vmesh.encode_stream):
+    // "VSTR", header_len u32, cabecera JSON, relleno hasta 4, bloque .vmesh
+    private void ProcessMeshFrame(byte[] payload)
+    {
+        if (payload.Length < 8 || Encoding.ASCII.GetString(payload, 0, 4) != "VSTR")
+        {
+            Debug.LogWarning($"[VibeLink] Unknown binary frame ({payload.Length} bytes)");
+            return;
+        }
+        int headerLen = (int)BitConverter.ToUInt32(payload, 4);
+        string header = Encoding.UTF8.GetString(payload, 8, headerLen);
+        int start = 8 + headerLen + (4 - headerLen % 4) % 4;
+
+        Match nameMatch = Regex.Match(header, "\"name\":\\s*\"([^\"]+)\"");
+        string name = nameMatch.Success ? nameMatch.Groups[1].Value : "Streamed";
+
+        Mesh mesh = VibeMeshReader.Read(payload, start, name, out Material[] materials, out Texture2D[] palettes, out string error);
+        if (mesh == null)
+        {
+            Debug.LogError($"[VibeLink] Streamed mesh {name}: {error}");
+            return;
+        }
+
+        // Sustituye la versión anterior del mismo asset (y libera su malla y materiales)
+        if (streamedObjects.TryGetValue(name, out GameObject previous) && previous != null)
+        {
+            DestroyStreamed(previous);
+        }
+        if (streamedRoot == null) streamedRoot = new GameObject("VibeLink_Streamed").transform;
+
+        var go = new GameObject(name);
+        go.transform.SetParent(streamedRoot, false);
+        go.AddComponent<MeshFilter>().sharedMesh = mesh;
+        go.AddComponent<MeshRenderer>().sharedMaterials = materials;
+        streamedObjects[name] = go;
+
+        Debug.Log($"[VibeLink] Streamed mesh {name}: {mesh.vertexCount} vertices, {payload.Length} bytes");
+        foreach (Match id in Regex.Matches(Regex.Match(header, "\"ids\":\\s*\\[([^\\]]*)\\]").Groups[1].Value, "\"([^\"]+)\""))
+        {
+            OnMeshStreamed?.Invoke(id.Groups[1].Value, go);
+        }
+    }
+
+    private static void DestroyStreamed(GameObject go)
+    {
+        var renderer = go.GetComponent<MeshRenderer>();
+        foreach (Material mat in renderer.sharedMaterials)
+        {
+            if (mat == null) continue;
+            if (mat.mainTexture != null) DestroyImmediate(mat.mainTexture);
+            DestroyImmediate(mat);
+        }
+        DestroyImmediate(go.GetComponent<MeshFilter>().sharedMesh);
+        DestroyImmediate(go);
     }
 
     public void Broadcast(string message)
@@ -272,6 +365,84 @@ public class VibeLinkServer : MonoBehaviour
         }
     }
 
+    /// <summary>
+    /// Envía un comando a Blender con un "id" de correlación.
+    /// Blender responde ack, progress y asset_ready / batch_manifest / error con ese id,
+    /// así se pueden encadenar muchas peticiones sin esperar a la anterior.
+    /// Con workers registrados (hello) va a uno solo; si no, a todos los clientes.
+    /// Llamar desde el Main Thread.
+    /// </summary>
+    public string SendRequest(string json)
+    {
+        string id = "u" + Interlocked.Increment(ref nextRequestId);
+        string tagged = json.Insert(json.IndexOf('{') + 1, $"\"id\": \"{id}\", ");
+
+        lock (pendingRequests) pendingRequests[id] = DateTime.UtcNow;
+        Route(id, tagged);
+        return id;
+    }
+
+    /// <summary>
+    /// Cancela una petición de SendRequest que aún no ha empezado: si sigue en la
+    /// cola de Unity se quita ahí; si no, se pide {"cmd": "cancel"} a Blender
+    /// (responde "cancelled" si aún estaba en su cola). Llamar desde el Main Thread.
+    /// </summary>
+    public void CancelRequest(string id)
+    {
+        if (jobs.CancelQueued(id))
+        {
+            lock (pendingRequests) pendingRequests.Remove(id);
+            Debug.Log($"[VibeLink] Request {id} cancelled");
+            return;
+        }
+        string json = $"{{\"cmd\": \"cancel\", \"ids\": [\"{id}\"]}}";
+        TcpClient owner = jobs.OwnerOf(id);
+        if (owner != null) SendFrame(owner, json);
+        else Broadcast(json);
+    }
+
+    public void CancelAllRequests()
+    {
+        string[] ids;
+        lock (pendingRequests) ids = pendingRequests.Keys.ToArray();
+        foreach (string id in ids) CancelRequest(id);
+    }
+
+    private void Route(string id, string json)
+    {
+        if (jobs.Accepts(json)) jobs.Enqueue(id, json);
+        else Broadcast(json);
+    }
+
+    private void TrackBlenderEvent(string json)
+    {
+        Match eventMatch = Regex.Match(json, "\"event\": \"(\\w+)\"");
+        string evt = eventMatch.Success ? eventMatch.Groups[1].Value : "";
+
+        // ack y progress son frecuentes: no se loguean
+        if (evt == "ack" || evt == "progress") return;
+
+        Match idMatch = Regex.Match(json, "\"id\": \"([^\"]+)\"");
+        if (!idMatch.Success)
+        {
+            Debug.Log($"[VibeLink] Blender event: {json}");
+            return;
+        }
+
+        string id = idMatch.Groups[1].Value;
+        DateTime sentAt;
+        bool known;
+        lock (pendingRequests)
+        {
+            known = pendingRequests.TryGetValue(id, out sentAt);
+            pendingRequests.Remove(id);
+        }
+
+        string roundTrip = known ? $" ({(DateTime.UtcNow - sentAt).TotalMilliseconds:F0} ms)" : "";
+        if (evt == "error") Debug.LogWarning($"[VibeLink] Request {id} failed{roundTrip}: {json}");
+        else Debug.Log($"[VibeLink] Request {id} {evt}{roundTrip}: {json}");
+    }
+
     public void SendFrame(TcpClient client, string message)
     {
         try
@@ -321,7 +492,25 @@ public class VibeLinkServer : MonoBehaviour
         {
             // Debug.Log($"[VibeLink] Cmd: {json}"); // Loguear todo puede ser ruidoso
             
-            if (json.Contains("dump_hierarchy"))
+            if (json.Contains("\"event\""))
+            {
+                // Respuesta de Blender (ack, progress, manifest...): no se reenvía ni se contesta
+                string evt = Regex.Match(json, "\"event\": \"(\\w+)\"").Groups[1].Value;
+                if (evt == "hello")
+                {
+                    jobs.Register(client, json);
+                    return;
+                }
+                if (evt == "asset_ready" || evt == "batch_manifest" || evt == "error" || evt == "cancelled")
+                {
+                    Match idMatch = Regex.Match(json, "\"id\": \"([^\"]+)\"");
+                    if (idMatch.Success) jobs.Complete(client, idMatch.Groups[1].Value);
+                }
+                TrackBlenderEvent(json);
+                OnBlenderEvent?.Invoke(json);
+                return;
+            }
+            else if (json.Contains("dump_hierarchy"))
             {
                 response = HierarchyDumper.DumpScene();
             }
@@ -332,8 +521,12 @@ public class VibeLinkServer : MonoBehaviour
             else
             {
                 // Relay: Si no es un comando interno de Unity, reenviarlo a los clientes (Blender)
-                // Esto permite que un script externo (Agente) controle Blender a través de Unity
-                Broadcast(json);
+                // Esto permite que un script externo (Agente) controle Blender a través de Unity.
+                // Los trabajos necesitan id para saber cuándo acaban: se añade si no lo trae
+                Match idMatch = Regex.Match(json, "\"id\":\\s*\"([^\"]+)\"");
+                string id = idMatch.Success ? idMatch.Groups[1].Value : "r" + Interlocked.Increment(ref nextRequestId);
+                if (!idMatch.Success && jobs.Accepts(json)) json = json.Insert(json.IndexOf('{') + 1, $"\"id\": \"{id}\", ");
+                Route(id, json);
                 response = "{\"status\": \"relayed\"}";
                 Debug.Log($"[VibeLink] Relayed command: {json}");
             }
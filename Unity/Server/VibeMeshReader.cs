@@ -0,0 +1,121 @@
+using System.IO;
+using System.Text;
+using Unity.Collections;
+using UnityEngine;
+using UnityEngine.Rendering;
+
+// === LECTOR DE BLOQUES .vmesh (runtime) ===
+// Formato binario que escribe Blender/VibeLink/vmesh.py. Los bloques de
+// vértices e índices ya vienen en el layout de Unity (Y arriba, mano
+// izquierda), así que se copian enteros a la malla.
+// Lo usan VibeMeshImporter (archivos .vmesh / .vscatter en el Editor) y
+// VibeLinkServer (mallas en streaming por el socket, también en Play Mode).
+public static class VibeMeshReader
+{
+    public const uint Version = 2;
+    const int VertexStride = 8 * sizeof(float); // pos3 + normal3 + uv2
+
+    // Lee un bloque .vmesh que empieza en bytes[start]. palettes[i] es la
+    // textura paleta del submesh i (null si no tiene). Si el bloque no es
+    // válido devuelve null y error dice por qué.
+    public static Mesh Read(byte[] bytes, int start, string name, out Material[] materials, out Texture2D[] palettes, out string error)
+    {
+        materials = null;
+        palettes = null;
+        error = null;
+        int vertexCount, indexCount, offset;
+        int[] starts, counts;
+        using (var reader = new BinaryReader(new MemoryStream(bytes)))
+        {
+            reader.BaseStream.Position = start;
+            if (Encoding.ASCII.GetString(reader.ReadBytes(4)) != "VMSH")
+            {
+                error = "Not a .vmesh block";
+                return null;
+            }
+            uint version = reader.ReadUInt32();
+            if (version != Version)
+            {
+                error = $"Unsupported .vmesh version {version}";
+                return null;
+            }
+            vertexCount = (int)reader.ReadUInt32();
+            indexCount = (int)reader.ReadUInt32();
+            int submeshCount = (int)reader.ReadUInt32();
+
+            starts = new int[submeshCount];
+            counts = new int[submeshCount];
+            materials = new Material[submeshCount];
+            palettes = new Texture2D[submeshCount];
+            for (int i = 0; i < submeshCount; i++)
+            {
+                starts[i] = (int)reader.ReadUInt32();
+                counts[i] = (int)reader.ReadUInt32();
+                var color = new Color(reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle());
+                string matName = Encoding.UTF8.GetString(reader.ReadBytes(reader.ReadUInt16()));
+                materials[i] = CreateMaterial(matName, color);
+
+                // palette_atlas: textura N x 1, un texel por color
+                int paletteCount = reader.ReadUInt16();
+                if (paletteCount > 0)
+                {
+                    var palette = new Color[paletteCount];
+                    for (int p = 0; p < paletteCount; p++)
+                    {
+                        palette[p] = new Color(reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle());
+                    }
+                    var texture = new Texture2D(paletteCount, 1, TextureFormat.RGBA32, false)
+                    {
+                        name = matName,
+                        filterMode = FilterMode.Point,
+                        wrapMode = TextureWrapMode.Clamp
+                    };
+                    texture.SetPixels(palette);
+                    texture.Apply();
+                    materials[i].mainTexture = texture;
+                    if (materials[i].HasProperty("_BaseMap")) materials[i].SetTexture("_BaseMap", texture);
+                    palettes[i] = texture;
+                }
+            }
+
+            // Los bloques de datos empiezan alineados a 4 bytes (desde el inicio del bloque)
+            offset = (int)reader.BaseStream.Position;
+            offset += (4 - (offset - start) % 4) % 4;
+        }
+
+        var mesh = new Mesh { name = name };
+        mesh.SetVertexBufferParams(vertexCount,
+            new VertexAttributeDescriptor(VertexAttribute.Position, VertexAttributeFormat.Float32, 3),
+            new VertexAttributeDescriptor(VertexAttribute.Normal, VertexAttributeFormat.Float32, 3),
+            new VertexAttributeDescriptor(VertexAttribute.TexCoord0, VertexAttributeFormat.Float32, 2));
+        mesh.SetIndexBufferParams(indexCount, IndexFormat.UInt32);
+
+        int vertexBytes = vertexCount * VertexStride;
+        using (var data = new NativeArray<byte>(bytes, Allocator.Temp))
+        {
+            mesh.SetVertexBufferData(data, offset, 0, vertexBytes);
+            // SetIndexBufferData trabaja en índices, no en bytes
+            mesh.SetIndexBufferData(data.GetSubArray(offset + vertexBytes, indexCount * sizeof(uint)).Reinterpret<uint>(1), 0, 0, indexCount);
+        }
+
+        var flags = MeshUpdateFlags.DontValidateIndices | MeshUpdateFlags.DontRecalculateBounds;
+        mesh.subMeshCount = starts.Length;
+        for (int i = 0; i < starts.Length; i++)
+        {
+            mesh.SetSubMesh(i, new SubMeshDescriptor(starts[i], counts[i]), flags);
+        }
+        mesh.RecalculateBounds();
+        return mesh;
+    }
+
+    // El color viene del material de Blender: no hacen falta las reglas por
+    // nombre de VibeAssetImporter.OnPostprocessModel
+    static Material CreateMaterial(string name, Color color)
+    {
+        var shader = Shader.Find("Universal Render Pipeline/Lit") ?? Shader.Find("Standard");
+        // enableInstancing: las variantes de un scatter se dibujan con RenderMeshInstanced
+        var mat = new Material(shader) { name = name, color = color, enableInstancing = true };
+        if (mat.HasProperty("_BaseColor")) mat.SetColor("_BaseColor", color);
+        return mat;
+    }
+}